@@ -0,0 +1,129 @@
+"""Persistent cache of Gemini replies.
+
+Asking for the same insights, chat answer or report about the same data made
+the same paid round-trip every time. Replies are stored in a SQLite file,
+keyed by the model, the prompt template, the question, the dataset
+fingerprint and a hash of the full prompt text (so any change to what is
+sent, such as a new prompt wording or summary budget, is a different
+entry); they survive restarts and are shared by every session. Entries
+expire after a TTL, and the least recently used are evicted once the stored
+text exceeds a size limit. Failed, timed-out or cancelled requests are
+never stored, and neither are empty replies.
+"""
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+AI_CACHE_PATH = os.getenv('AI_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'ai_bi_dashboard_ai_cache.sqlite3'))
+
+# Replies older than this are treated as missing
+AI_CACHE_TTL_HOURS = float(os.getenv('AI_CACHE_TTL_HOURS', '24'))
+
+# Total size of stored replies before the least recently used are evicted
+AI_CACHE_MB = int(os.getenv('AI_CACHE_MB', '64'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    template TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL,
+    response TEXT NOT NULL
+)
+"""
+
+
+def response_key(model, template, question, fingerprint, prompt):
+    """Cache key of one reply: model id, prompt template name, question text, dataset fingerprint and prompt"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (model, template, question or '', fingerprint or '', prompt):
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def model_id(model):
+    """Identifies the model in cache keys (the offline fake never shares entries with Gemini)"""
+    return f"{type(model).__name__}:{getattr(model, 'model_name', '')}"
+
+
+class AIResponseCache:
+    """SQLite-backed reply cache with TTL expiry and size-bounded LRU eviction
+
+    Hit and miss counters cover this process only.
+    """
+
+    def __init__(self, path, ttl_seconds, max_bytes):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._con = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute(_SCHEMA)
+
+    def get(self, key):
+        """The stored reply for key (marking it recently used), or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._con.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._con.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._con.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response, model='', template=''):
+        """Store a reply, then drop expired entries and the least recently used beyond max_bytes"""
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._con.execute(
+                "INSERT OR REPLACE INTO responses (key, model, template, created, accessed, size, response) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, model, template, now, now, size, response))
+            self._evict(now)
+
+    def _evict(self, now):
+        self._con.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        total = self._con.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._con.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._con.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self):
+        """Drop every stored reply"""
+        with self._lock:
+            self._con.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Hit/miss counters and storage use for display"""
+        with self._lock:
+            entries, used = self._con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        total = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'used_mb': used / 1024**2,
+            'max_mb': self.max_bytes / 1024**2
+        }
@@ -0,0 +1,200 @@
+"""Streaming, cancellable Gemini requests for the AI pages.
+
+generate_content() blocked the Streamlit script thread until the whole reply
+had arrived, with no way to stop a slow request. Here each prompt runs
+through the model's async streaming API (generate_content_async with
+stream=True) on a process-wide event loop in a background thread. Text
+chunks are handed to the script thread as they arrive, so pages can render
+the reply progressively; every request has a timeout and can be cancelled
+(e.g. when a rerun interrupts the page that started it).
+
+FakeGenerativeModel implements the same calls offline, for exercising the
+AI pages without network access or an API key (GEMINI_FAKE_MODEL=1).
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+
+# Longest a single AI request may take before it is abandoned
+AI_TIMEOUT_SECONDS = float(os.getenv('AI_TIMEOUT_SECONDS', '120'))
+
+# Use the offline FakeGenerativeModel instead of Gemini
+GEMINI_FAKE_MODEL = os.getenv('GEMINI_FAKE_MODEL', '0') not in ('', '0')
+
+_DONE = object()
+_loop = None
+_loop_lock = threading.Lock()
+
+
+class AIRequestCancelled(Exception):
+    """The request was cancelled before the reply was complete"""
+
+
+class AIRequestTimeout(TimeoutError):
+    """The reply did not complete within the request's timeout"""
+
+
+def _event_loop():
+    """The event loop every request runs on, started in a daemon thread on first use
+
+    One long-lived loop (rather than asyncio.run per request) because the
+    Gemini async client binds itself to the loop it was first used on.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='ai-event-loop', daemon=True).start()
+        return _loop
+
+
+def _chunk_text(chunk):
+    """Text of one streamed chunk ('' for chunks without text, such as the final metadata)"""
+    try:
+        return chunk.text or ''
+    except ValueError:
+        return ''
+
+
+class AIRequest:
+    """One prompt streamed from a model in the background
+
+    Iterate chunks() on the calling thread to receive text as it arrives;
+    text holds everything received so far. cancel() stops the request at
+    any point and is a no-op once it has finished.
+    """
+
+    def __init__(self, model, prompt, timeout=AI_TIMEOUT_SECONDS):
+        self.model = model
+        self.prompt = prompt
+        self.timeout = timeout
+        self.parts = []
+        self.first_chunk_seconds = None
+        self.elapsed = None
+        self._queue = queue.Queue()
+        self._future = None
+        self._started = None
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+    @property
+    def done(self):
+        return self.elapsed is not None
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), _event_loop())
+        return self
+
+    def cancel(self):
+        if self._future is not None:
+            self._future.cancel()
+
+    async def _stream(self):
+        response = await self.model.generate_content_async(self.prompt, stream=True)
+        async for chunk in response:
+            text = _chunk_text(chunk)
+            if text:
+                self._queue.put(text)
+
+    async def _run(self):
+        error = None
+        try:
+            await asyncio.wait_for(self._stream(), self.timeout)
+        except asyncio.TimeoutError:
+            error = AIRequestTimeout(f"No complete response within {self.timeout:g} seconds")
+        except asyncio.CancelledError:
+            error = AIRequestCancelled("The request was cancelled")
+        except Exception as e:
+            error = e
+        self._queue.put((_DONE, error))
+
+    def chunks(self):
+        """Yield text chunks as they arrive; raises the request's error, if any, at the end"""
+        if self._future is None:
+            self.start()
+        # A little grace past the request timeout, in case the loop itself is stuck
+        deadline = self._started + self.timeout + 5
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                self.cancel()
+                raise AIRequestTimeout(f"No complete response within {self.timeout:g} seconds")
+            if isinstance(item, tuple) and item[0] is _DONE:
+                self.elapsed = time.perf_counter() - self._started
+                if item[1] is not None:
+                    raise item[1]
+                return
+            if self.first_chunk_seconds is None:
+                self.first_chunk_seconds = time.perf_counter() - self._started
+            self.parts.append(item)
+            yield item
+
+
+def generate_text(model, prompt, timeout=AI_TIMEOUT_SECONDS):
+    """Complete reply to prompt (streamed under the hood, so the timeout applies)"""
+    request = AIRequest(model, prompt, timeout)
+    try:
+        for _ in request.chunks():
+            pass
+    finally:
+        request.cancel()
+    return request.text
+
+
+class _FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeStream:
+    """Async iterator over the chunks of a fake reply, one every delay seconds"""
+
+    def __init__(self, chunks, delay):
+        self._chunks = chunks
+        self._delay = delay
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._delay)
+            yield _FakeChunk(chunk)
+
+
+class FakeGenerativeModel:
+    """Offline stand-in for genai.GenerativeModel that streams a canned reply word by word"""
+
+    def __init__(self, model_name='fake-model', reply=None, delay=0.01):
+        self.model_name = model_name
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+
+    def _reply(self, prompt):
+        if self.reply is not None:
+            return self.reply
+        return (f"**Offline reply from {self.model_name}.** The prompt had {len(prompt):,} characters "
+                f"and {len(prompt.split()):,} words. Set a Gemini API key and unset GEMINI_FAKE_MODEL "
+                f"for real analysis.")
+
+    def _chunks(self, prompt):
+        words = self._reply(prompt).split(' ')
+        return [word + ' ' for word in words[:-1]] + words[-1:]
+
+    def generate_content(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        return _FakeChunk(self._reply(prompt))
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        if stream:
+            return _FakeStream(self._chunks(prompt), self.delay)
+        await asyncio.sleep(self.delay)
+        return _FakeChunk(self._reply(prompt))
@@ -11,9 +11,79 @@ import os
 import sys
 import traceback
 from streamlit.components.v1 import html
-import duckdb
 from plotly.subplots import make_subplots
 from io import BytesIO, StringIO
+from data_generators import (
+    generate_sales_data_df,
+    generate_healthcare_data_df,
+    generate_finance_data_df,
+    generate_industry_agnostic_data_df,
+    generate_manufacturing_data_df,
+    generate_operations_data_df,
+    generate_government_data_df,
+    STREAMING_DATASETS,
+    write_sample_data,
+)
+from ingestion import IngestionCache, INGESTION_CACHE_MB, read_upload, ensure_duckdb_upload
+from query_engine import QueryCache, QUERY_CACHE_MB, execute_query
+from result_viewer import render_paginated_table
+from forecasting import (
+    BATCH_METHODS,
+    fit_exponential_smoothing,
+    fit_holt_winters,
+    fit_moving_average,
+    forecast_batch,
+    series_matrix,
+)
+from ai_client import GEMINI_FAKE_MODEL, AIRequest, FakeGenerativeModel
+from ai_cache import AI_CACHE_MB, AI_CACHE_PATH, AI_CACHE_TTL_HOURS, AIResponseCache, model_id, response_key
+from backtesting import BACKTEST_CACHE_ENTRIES, BACKTEST_METHODS, BacktestCache, backtest, series_fingerprint
+from binning import box_figure, histogram_figure, histogram_with_box_figure
+from dataset_summary import AI_SUMMARY_CACHE_ENTRIES, AI_SUMMARY_SAMPLE_ROWS, SummaryCache, summarize_dataset
+from prompt_budget import estimate_tokens, mentioned_columns
+from compaction import COMPACT_DTYPES, compact_frame, text_columns
+from correlation import CORRELATION_METHODS, CORRELATION_SAMPLE_ROWS, correlation_matrix, top_correlations
+from figure_cache import FIGURE_CACHE_MB, FigureCache, cached_figure
+from downsampling import (
+    CHART_POINT_BUDGET,
+    DOWNSAMPLE_MODES,
+    RENDER_MODES,
+    WEBGL_THRESHOLD,
+    downsample,
+    line_trace,
+    use_webgl,
+)
+from timeseries import (
+    AGGREGATIONS,
+    FREQUENCIES,
+    GAP_FILLS,
+    RAW_FREQUENCY,
+    TIMESERIES_CACHE_ENTRIES,
+    TimeSeriesCache,
+    date_columns,
+    parse_dates,
+    prepare_series,
+    season_length_for,
+    sorted_by_date,
+)
+from profiler import (
+    APPROX_PROFILE_ROWS,
+    PROFILE_CACHE_ENTRIES,
+    ProfileCache,
+    dataset_fingerprint,
+    profile_dataframe,
+    profile_table,
+)
+from duckdb_sessions import (
+    DUCKDB_STORAGE,
+    DuckDBConnectionManager,
+    SessionJanitor,
+    check_session_sql,
+    is_session_token,
+    new_session_token,
+    session_id_for_token,
+    touch_session,
+)
 
 # Optional: Load environment variables if dotenv is available
 try:
@@ -22,6 +92,9 @@ try:
 except ImportError:
     pass  # dotenv is not required to run the app
 
+# AI calls kept in each session's log of prompt and reply sizes
+AI_CALL_LOG_ENTRIES = int(os.getenv('AI_CALL_LOG_ENTRIES', '50'))
+
 # Configure error handling
 def handle_error(e: Exception):
     """Handle exceptions and display user-friendly error messages"""
@@ -100,6 +173,10 @@ st.markdown("""
 # Initialize session state
 if 'df' not in st.session_state:
     st.session_state.df = None
+if 'df_compaction' not in st.session_state:
+    st.session_state.df_compaction = None
+if 'active_upload_id' not in st.session_state:
+    st.session_state.active_upload_id = None
 if 'gemini_api_key' not in st.session_state:
     st.session_state.gemini_api_key = None
 if 'show_report' not in st.session_state:
@@ -126,18 +203,89 @@ if 'model_name' not in st.session_state:
     st.session_state.model_name = 'gemini-2.5-flash'  # Set default model
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
-if 'con' not in st.session_state:
-    st.session_state.con = duckdb.connect(':memory:')
+if 'session_id' not in st.session_state:
+    # In disk mode the session's secret token travels in the URL so a reconnect reopens the same
+    # database file; the id that names the database is a hash of it, so a leaked id opens nothing
+    requested_token = st.query_params.get('session')
+    if DUCKDB_STORAGE == 'disk' and is_session_token(requested_token):
+        st.session_state.session_token = requested_token
+    else:
+        st.session_state.session_token = new_session_token()
+    st.session_state.session_id = session_id_for_token(st.session_state.session_token)
 if 'query_history' not in st.session_state:
     st.session_state.query_history = []
-if 'original_df' not in st.session_state:
-    st.session_state.original_df = None
-if 'cleaned_df' not in st.session_state:
-    st.session_state.cleaned_df = None    
+if 'cleaned_result' not in st.session_state:
+    st.session_state.cleaned_result = None
+if 'ai_call_log' not in st.session_state:
+    st.session_state.ai_call_log = []    
+
+@st.cache_resource
+def get_ingestion_cache():
+    """Process-wide cache of parsed uploads, shared by every session"""
+    return IngestionCache(INGESTION_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide cache of SQL Cleaner query results"""
+    return QueryCache(QUERY_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_profile_cache():
+    """Process-wide cache of dataset profiles keyed by dataset fingerprint"""
+    return ProfileCache(PROFILE_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_backtest_cache():
+    """Process-wide cache of forecast backtests keyed by series fingerprint, method and parameters"""
+    return BacktestCache(BACKTEST_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_timeseries_cache():
+    """Process-wide cache of parsed date columns and resampled series"""
+    return TimeSeriesCache(TIMESERIES_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_figure_cache():
+    """Process-wide cache of serialized Visualizations page figures"""
+    return FigureCache(FIGURE_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_ai_cache():
+    """Process-wide handle on the persistent (SQLite) cache of AI replies"""
+    return AIResponseCache(AI_CACHE_PATH, AI_CACHE_TTL_HOURS * 3600, AI_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_summary_cache():
+    """Process-wide cache of the dataset summaries AI prompts are built from"""
+    return SummaryCache(AI_SUMMARY_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_duckdb_manager():
+    """Process-wide manager of the sessions' DuckDB databases (one per session)"""
+    return DuckDBConnectionManager()
+
+@st.cache_resource
+def get_session_janitor():
+    """Background job that releases idle sessions and deletes their database files"""
+    return SessionJanitor(get_duckdb_manager()).start()
+
+# Reopen the session's cursor on first run, or after the janitor released it as idle
+duckdb_manager = get_duckdb_manager()
+if 'con' not in st.session_state or not duckdb_manager.is_open(st.session_state.session_id):
+    st.session_state.con = duckdb_manager.connect(st.session_state.session_id)
+duckdb_manager.touch(st.session_state.session_id)
+get_session_janitor()
+touch_session(st.session_state.session_id, duckdb_manager.spill_dir)
+if DUCKDB_STORAGE == 'disk':
+    st.query_params['session'] = st.session_state.session_token
 
 # Configure Gemini AI
 def configure_gemini(api_key, model_name='gemini-2.5-flash'):
     """Configure Gemini AI with API key"""
+    if GEMINI_FAKE_MODEL:
+        st.info("🧪 GEMINI_FAKE_MODEL is set: using the offline fake model (no network calls)")
+        return FakeGenerativeModel(model_name)
+    
     if not api_key:
         st.error("🔑 Please provide a Gemini API key.")
         st.info("Set GEMINI_API_KEY in:\n- Local: .env file\n- Streamlit Cloud: Secrets management")
@@ -192,8 +340,66 @@ def configure_gemini(api_key, model_name='gemini-2.5-flash'):
         handle_error(e)  # Use our central error handler
         return None
 
+def run_ai_prompt(prompt, placeholder=None, cache_key=None):
+    """Send prompt to the connected model and return the reply
+
+    With a placeholder (st.empty()) the reply is rendered as it streams in and
+    cleared once complete, for the caller to display. A rerun that interrupts
+    the page (e.g. another button press) cancels the request. cache_key is
+    (template, question, dataset fingerprint); replies are then served from
+    and stored in the persistent AI response cache, keyed by it and the full
+    prompt text.
+    """
+    model = st.session_state.gemini_model
+    template = cache_key[0] if cache_key is not None else "uncached"
+    key = None
+    if cache_key is not None:
+        key = response_key(model_id(model), *cache_key, prompt)
+        cached = get_ai_cache().get(key)
+        if cached is not None:
+            log_ai_call(template, prompt, cached, 0.0, True)
+            return cached
+    
+    request = AIRequest(model, prompt).start()
+    try:
+        for _ in request.chunks():
+            if placeholder is not None:
+                placeholder.markdown(request.text + " ▌")
+    finally:
+        request.cancel()
+        if placeholder is not None:
+            placeholder.empty()
+    
+    log_ai_call(template, prompt, request.text, request.elapsed, False)
+    if key is not None and request.text:
+        get_ai_cache().put(key, request.text, model_id(model), template)
+    return request.text
+
+def ai_dataset_summary(df, question=None):
+    """Summary of df for AI prompts, computed once per dataset version (and question columns)"""
+    return summarize_dataset(df, priority=mentioned_columns(df.columns, question),
+                             cache=get_summary_cache(), profile_cache=get_profile_cache())
+
+def log_ai_call(template, prompt, reply, seconds, cached):
+    """Record the prompt and reply sizes of one AI call in the session's call log"""
+    st.session_state.ai_call_log.append({
+        'Time': datetime.now().strftime('%H:%M:%S'),
+        'Prompt': template,
+        'Prompt chars': len(prompt),
+        'Prompt tokens (est.)': estimate_tokens(prompt),
+        'Reply tokens (est.)': estimate_tokens(reply),
+        'Seconds': round(seconds, 2),
+        'Cached': cached
+    })
+    del st.session_state.ai_call_log[:-AI_CALL_LOG_ENTRIES]
+
+def ai_output_area(key):
+    """Stop button and placeholder for a streaming reply; Stop reruns the page, which cancels the request"""
+    st.button("⏹️ Stop", key=f"{key}_stop", help="Cancel the AI request")
+    return st.empty()
+
 # Generate AI insights
-def generate_ai_insights(df, question=None):
+def generate_ai_insights(df, question=None, placeholder=None):
     """Generate insights using Gemini AI"""
     if df is None:
         return "Please upload a dataset first."
@@ -206,23 +412,24 @@ def generate_ai_insights(df, question=None):
             return "The uploaded dataset is empty. Please check your data."
             
         # Prepare data summary for AI
+        data_summary = ai_dataset_summary(df, question)
         summary = f"""
         Dataset Overview:
-        - Total Rows: {len(df)}
-        - Total Columns: {len(df.columns)}
-        - Columns: {', '.join(df.columns.tolist())}
+        - Total Rows: {data_summary.rows}
+        - Total Columns: {len(data_summary.columns)} {data_summary.column_note()}
+        - Columns: {data_summary.column_list()}
         
         Numeric Columns Statistics:
-        {df.describe().to_string()}
+        {data_summary.statistics}
         
         Data Types:
-        {df.dtypes.to_string()}
+        {data_summary.dtypes}
         
         Missing Values:
-        {df.isnull().sum().to_string()}
+        {data_summary.missing}
         
-        Sample Data (first 5 rows):
-        {df.head().to_string()}
+        Sample Data (first {AI_SUMMARY_SAMPLE_ROWS} rows):
+        {data_summary.sample}
         """
         
         if question:
@@ -246,14 +453,13 @@ Dataset Information:
 
 Provide a comprehensive analysis."""
         
-        response = st.session_state.gemini_model.generate_content(prompt)
-        return response.text
+        return run_ai_prompt(prompt, placeholder, ("insights", question, dataset_fingerprint(df)))
     
     except Exception as e:
         return f"Error generating insights: {str(e)}"
 
 # Generate forecast interpretation
-def interpret_forecast(historical_data, forecast_data, method_name):
+def interpret_forecast(historical_data, forecast_data, method_name, placeholder=None):
     """Use AI to interpret forecast results"""
     if st.session_state.gemini_model is None:
         return "AI interpretation not available. Please configure Gemini API key."
@@ -276,8 +482,9 @@ Provide:
 
 Keep the response concise but insightful."""
         
-        response = st.session_state.gemini_model.generate_content(prompt)
-        return response.text
+        series_key = series_fingerprint(np.concatenate([np.asarray(historical_data, dtype='float64'),
+                                                        np.asarray(forecast_data, dtype='float64')]))
+        return run_ai_prompt(prompt, placeholder, ("forecast_interpretation", method_name, series_key))
     except Exception as e:
         return f"Error generating interpretation: {str(e)}"
 
@@ -287,6 +494,7 @@ def generate_full_report(df):
     try:
         report_text = generate_automated_report(df, "comprehensive")
         utc_time = datetime.now(timezone.utc)
+        data_summary = ai_dataset_summary(df)
         
         full_report = f"""
 COMPREHENSIVE AI BUSINESS INTELLIGENCE REPORT
@@ -298,10 +506,10 @@ Generated: {utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')}
 ========================================================
 DATASET STATISTICS
 ========================================================
-Total Records: {len(df)}
-Total Columns: {len(df.columns)}
-Numeric Columns: {', '.join(df.select_dtypes(include=[np.number]).columns)}
-Date Range: {df.iloc[:, 0].min() if len(df) > 0 else 'N/A'} to {df.iloc[:, 0].max() if len(df) > 0 else 'N/A'}
+Total Records: {data_summary.rows}
+Total Columns: {len(data_summary.columns)}
+Numeric Columns: {data_summary.numeric_list(all_columns=True)}
+Date Range: {data_summary.first_min if data_summary.rows > 0 else 'N/A'} to {data_summary.first_max if data_summary.rows > 0 else 'N/A'}
 
 Generated by AI-Powered BI Dashboard
 """
@@ -309,7 +517,7 @@ Generated by AI-Powered BI Dashboard
     except Exception as e:
         raise Exception(f"Error generating full report: {str(e)}")
 
-def generate_automated_report(df, report_type="comprehensive"):
+def generate_automated_report(df, report_type="comprehensive", placeholder=None):
     """Generate comprehensive AI report with accurate timestamps"""
     if st.session_state.gemini_model is None:
         return "Please configure Gemini API key first."
@@ -324,19 +532,7 @@ def generate_automated_report(df, report_type="comprehensive"):
         report_date = utc_now.strftime('%B %d, %Y')  # e.g., "October 07, 2025"
         utc_timestamp = utc_now.strftime('%Y-%m-%d %H:%M:%S UTC')
         
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        # Base dataset information
-        dataset_info = f"""
-        Dataset Overview:
-        - Total Records: {len(df)}
-        - Total Columns: {len(df.columns)}
-        - Numeric Columns: {', '.join(numeric_cols)}
-        - Date Range: {df.iloc[:, 0].min() if len(df) > 0 else 'N/A'} to {df.iloc[:, 0].max() if len(df) > 0 else 'N/A'}
-        
-        Statistical Summary:
-        {df[numeric_cols].describe().to_string() if numeric_cols else 'No numeric columns available'}
-        """
+        data_summary = ai_dataset_summary(df)
         
         report_prompts = {
             "Executive Summary": "Provide a concise executive summary focusing on key insights and recommendations.",
@@ -365,12 +561,12 @@ def generate_automated_report(df, report_type="comprehensive"):
         and use the date "{report_date}" shown above.
         
         Dataset Metrics:
-        - Total Records: {len(df)}
-        - Date Range: {df[df.columns[0]].min()} to {df[df.columns[0]].max() if pd.api.types.is_datetime64_any_dtype(df[df.columns[0]]) else 'N/A'}
-        - Numeric Columns: {', '.join(numeric_cols)}
+        - Total Records: {data_summary.rows}
+        - Date Range: {data_summary.first_min} to {data_summary.first_max if data_summary.first_is_datetime else 'N/A'}
+        - Numeric Columns: {data_summary.numeric_list()} {data_summary.column_note()}
         
         Statistical Summary:
-        {df[numeric_cols].describe().to_string()}
+        {data_summary.statistics}
         
         Please provide:
         1. Executive Summary (2-3 sentences)
@@ -385,12 +581,14 @@ def generate_automated_report(df, report_type="comprehensive"):
         REMEMBER: Use the date {report_date} at the start of your report.
         """
         
-        response = st.session_state.gemini_model.generate_content(report_data)
+        # The report date is part of the prompt, so it is part of the cache key too
+        report_text = run_ai_prompt(report_data, placeholder,
+                                    ("report", f"{report_type} ({report_date})", dataset_fingerprint(df)))
         
         # Store UTC timestamp in session state for display and downloads
         st.session_state.report_generated_utc = utc_now
         
-        return response.text
+        return report_text
     except Exception as e:
         return f"Error generating report: {str(e)}"
 
@@ -556,11 +754,11 @@ def create_visualizations(original_df, cleaned_df=None):
         
         col1, col2 = st.columns(2)
         with col1:
-            fig = px.histogram(original_df, x=selected_col, title=f'Distribution of {selected_col}')
+            fig = histogram_figure(original_df[selected_col], f'Distribution of {selected_col}', x_label=selected_col)
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            fig = px.box(original_df, y=selected_col, title=f'Box Plot of {selected_col}')
+            fig = box_figure(original_df[selected_col], f'Box Plot of {selected_col}', name=selected_col)
             st.plotly_chart(fig, use_container_width=True)
     
     # Comparison if cleaned data exists
@@ -597,573 +795,63 @@ def generate_sample_data():
     
     return df
 
-def generate_sales_data_df(rows):
-    """Generate sales data as DataFrame"""
-    import random
-    
-    products = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Webcam', 'Desk', 'Chair']
-    categories = ['Electronics', 'Accessories', 'Furniture']
-    regions = ['North', 'South', 'East', 'West', 'Central']
-    
-    data = []
-    for i in range(1, rows + 1):
-        product = random.choice(products)
-        category = random.choice(categories)
-        quantity = random.randint(1, 10)
-        price = round(random.uniform(50, 1000), 2)
-        total = round(quantity * price, 2)
-        date = (datetime(2024, 1, 1) + timedelta(days=random.randint(0, 364))).strftime('%Y-%m-%d')
-        customer_id = f"CUST{random.randint(1, 5000):06d}"
-        region = random.choice(regions)
-        
-        data.append([i, date, product, category, quantity, price, total, customer_id, region])
-    
-    return pd.DataFrame(data, columns=['transaction_id', 'date', 'product', 'category', 'quantity', 'price', 'total', 'customer_id', 'region'])
+def time_series_controls(key, default_fill="Linear interpolation", allow_raw=False):
+    """Resampling frequency, aggregation and gap-fill selectors; returns (freq, agg, fill)
 
-def generate_healthcare_data_df(rows):
-    """Generate healthcare data as DataFrame"""
-    import random
-    
-    diagnoses = ['Hypertension', 'Diabetes', 'Asthma', 'Arthritis', 'Pneumonia', 'Bronchitis', 'Fracture', 'Migraine']
-    genders = ['M', 'F', 'Other']
-    insurances = ['Medicare', 'Medicaid', 'Private', 'Uninsured']
-    
-    data = []
-    for i in range(1, rows + 1):
-        patient_id = f"PAT{i:08d}"
-        admission_date = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 364))
-        treatment_days = random.randint(1, 14)
-        discharge_date = admission_date + timedelta(days=treatment_days)
-        diagnosis = random.choice(diagnoses)
-        age = random.randint(18, 98)
-        gender = random.choice(genders)
-        cost = round(random.uniform(1000, 50000), 2)
-        insurance = random.choice(insurances)
-        
-        data.append([
-            patient_id,
-            admission_date.strftime('%Y-%m-%d'),
-            discharge_date.strftime('%Y-%m-%d'),
-            diagnosis,
-            age,
-            gender,
-            treatment_days,
-            cost,
-            insurance
-        ])
-    
-    return pd.DataFrame(data, columns=['patient_id', 'admission_date', 'discharge_date', 'diagnosis', 'age', 'gender', 'treatment_days', 'cost', 'insurance'])
-
-def generate_finance_data_df(rows):
-    """Generate finance data as DataFrame"""
-    import random
-    
-    types = ['Debit', 'Credit', 'Transfer', 'ATM', 'Payment']
-    currencies = ['USD', 'EUR', 'GBP', 'JPY']
-    merchants = ['Amazon', 'Walmart', 'Target', 'Starbucks', 'Shell', 'Restaurant', 'Online Store', 'Grocery']
-    
-    balance = 10000.0
-    data = []
-    
-    for i in range(1, rows + 1):
-        txn_id = f"TXN{i:010d}"
-        timestamp = (datetime(2024, 1, 1) + timedelta(
-            days=random.randint(0, 364),
-            hours=random.randint(0, 23),
-            minutes=random.randint(0, 59),
-            seconds=random.randint(0, 59)
-        )).isoformat()
-        account_id = f"ACC{random.randint(1, 10000):08d}"
-        txn_type = random.choice(types)
-        amount = round(random.uniform(10, 2000), 2)
-        
-        if txn_type in ['Debit', 'ATM', 'Payment']:
-            balance -= amount
-        else:
-            balance += amount
-        
-        currency = random.choice(currencies)
-        merchant = random.choice(merchants)
-        
-        data.append([txn_id, timestamp, account_id, txn_type, amount, round(balance, 2), currency, merchant])
-        
-        if i % 10000 == 0:
-            balance = 10000 + random.uniform(0, 5000)
-    
-    return pd.DataFrame(data, columns=['transaction_id', 'timestamp', 'account_id', 'transaction_type', 'amount', 'balance', 'currency', 'merchant'])
-
-
-def generate_industry_agnostic_data_df(rows):
-    """Generate industry-agnostic business data as DataFrame - complex and messy"""
-    import random
-    
-    departments = ['Sales', 'Marketing', 'IT', 'HR', 'Finance', 'Operations', 'Customer Service', 'R&D', 'Legal', 'Logistics']
-    statuses = ['Active', 'Pending', 'Completed', 'Cancelled', 'On Hold', 'In Progress', 'Review', 'Approved', None, 'ACTIVE', 'active']
-    priorities = ['High', 'Medium', 'Low', 'Critical', 'Normal', None, 'HIGH', 'high']
-    categories = ['Project', 'Task', 'Initiative', 'Request', 'Issue', 'Improvement', 'Maintenance', None]
-    locations = ['New York', 'London', 'Tokyo', 'Singapore', 'Sydney', 'Toronto', 'Berlin', 'Paris', 'Mumbai', 'São Paulo', None, 'NYC', 'N/A']
-    
-    data = []
-    base_date = datetime(2020, 1, 1)
-    
-    for i in range(1, min(rows + 1, 1000001)):  # Cap at 1,000,000
-        record_id = f"REC{i:010d}"
-        
-        # Introduce messy dates
-        if random.random() < 0.05:  # 5% null dates
-            created_date = None
-            updated_date = None
-        else:
-            created_date = (base_date + timedelta(days=random.randint(0, 1825))).strftime('%Y-%m-%d')
-            days_later = random.randint(0, 365)
-            updated_date = (datetime.strptime(created_date, '%Y-%m-%d') + timedelta(days=days_later)).strftime('%Y-%m-%d')
-        
-        department = random.choice(departments)
-        status = random.choice(statuses)
-        priority = random.choice(priorities)
-        category = random.choice(categories)
-        location = random.choice(locations)
-        
-        # Messy numeric data with nulls and inconsistencies
-        budget = round(random.uniform(1000, 500000), 2) if random.random() > 0.08 else None
-        actual_cost = round(random.uniform(500, 600000), 2) if random.random() > 0.1 else None
-        
-        # Messy percentage data
-        completion_pct = round(random.uniform(0, 100), 1) if random.random() > 0.07 else None
-        
-        # Messy employee counts
-        team_size = random.randint(1, 50) if random.random() > 0.06 else None
-        
-        # Rating with inconsistencies
-        rating = round(random.uniform(1, 5), 1) if random.random() > 0.12 else None
-        
-        # Messy text fields
-        notes = random.choice([
-            'Follow up needed',
-            'Waiting for approval',
-            'In progress - see attached',
-            '',
-            None,
-            'TBD',
-            'N/A',
-            'Contact John for details',
-            'URGENT!!!',
-            'na'
-        ])
-        
-        # Owner field with inconsistencies
-        owner = random.choice([
-            f'user{random.randint(1, 500)}@company.com',
-            f'User {random.randint(1, 500)}',
-            None,
-            'TBD',
-            'Unassigned',
-            '',
-            'N/A'
-        ])
-        
-        data.append([
-            record_id, created_date, updated_date, department, category, 
-            status, priority, location, budget, actual_cost, 
-            completion_pct, team_size, rating, owner, notes
-        ])
-        
-        # Add some duplicate records (2% chance)
-        if random.random() < 0.02 and i > 100:
-            data.append(data[-1])
-    
-    df = pd.DataFrame(data, columns=[
-        'record_id', 'created_date', 'updated_date', 'department', 'category',
-        'status', 'priority', 'location', 'budget', 'actual_cost',
-        'completion_percentage', 'team_size', 'rating', 'owner', 'notes'
-    ])
-    
-    return df
+    With allow_raw, a "Raw (every row)" frequency (None) plots rows without aggregating them.
+    """
+    frequencies = list(FREQUENCIES) + ([RAW_FREQUENCY] if allow_raw else [])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        freq_label = st.selectbox("Resample To", frequencies, key=f"{key}_freq")
+    with col2:
+        agg = st.selectbox("Aggregation", AGGREGATIONS, key=f"{key}_agg", disabled=freq_label == RAW_FREQUENCY)
+    with col3:
+        fill_label = st.selectbox("Fill Empty Periods", list(GAP_FILLS), index=list(GAP_FILLS).index(default_fill),
+                                  key=f"{key}_fill", disabled=freq_label == RAW_FREQUENCY)
+    return FREQUENCIES.get(freq_label), agg, GAP_FILLS[fill_label]
 
-def generate_manufacturing_data_df(rows):
-    """Generate manufacturing operations data as DataFrame - complex and messy"""
-    import random
-    
-    plants = ['Plant A', 'Plant B', 'Plant C', 'Plant D', 'Plant E', None, 'PLANT A', 'plant_a']
-    production_lines = ['Line 1', 'Line 2', 'Line 3', 'Line 4', 'Line 5', 'Line 6', None]
-    product_types = ['Widget-A', 'Widget-B', 'Gadget-X', 'Component-12', 'Assembly-Z', 'Part-456', None]
-    shifts = ['Day', 'Night', 'Evening', 'DAY', 'day', None, 'Swing']
-    quality_statuses = ['Pass', 'Fail', 'Pending', 'Rework', 'Scrap', None, 'PASS', 'pass']
-    machine_statuses = ['Running', 'Idle', 'Maintenance', 'Breakdown', 'Setup', None, 'RUNNING']
-    suppliers = ['Supplier-A', 'Supplier-B', 'Supplier-C', 'Supplier-D', 'Supplier-E', None, 'TBD']
-    
-    data = []
-    base_date = datetime(2022, 1, 1)
-    
-    for i in range(1, min(rows + 1, 1000001)):  # Cap at 1,000,000
-        batch_id = f"BATCH{i:012d}"
-        
-        # Messy timestamps
-        if random.random() < 0.04:
-            production_date = None
-            start_time = None
-            end_time = None
-        else:
-            production_date = (base_date + timedelta(days=random.randint(0, 1095))).strftime('%Y-%m-%d')
-            hour = random.randint(0, 23)
-            minute = random.randint(0, 59)
-            start_time = f"{hour:02d}:{minute:02d}:00"
-            duration = random.randint(30, 480)  # 30 min to 8 hours
-            end_hour = (hour + duration // 60) % 24
-            end_minute = (minute + duration % 60) % 60
-            end_time = f"{end_hour:02d}:{end_minute:02d}:00"
-        
-        plant = random.choice(plants)
-        line = random.choice(production_lines)
-        product = random.choice(product_types)
-        shift = random.choice(shifts)
-        
-        # Messy production quantities
-        planned_qty = random.randint(100, 10000) if random.random() > 0.05 else None
-        actual_qty = random.randint(50, 10000) if random.random() > 0.06 else None
-        defect_qty = random.randint(0, 500) if random.random() > 0.08 else None
-        
-        # Calculate yield with inconsistencies
-        if actual_qty and planned_qty and planned_qty > 0:
-            yield_pct = round((actual_qty / planned_qty) * 100, 2)
-            # Add some data errors
-            if random.random() < 0.03:
-                yield_pct = round(random.uniform(100, 150), 2)  # Impossible yield
-        else:
-            yield_pct = None
-        
-        quality_status = random.choice(quality_statuses)
-        machine_status = random.choice(machine_statuses)
-        
-        # Messy machine metrics
-        machine_id = f"MCH{random.randint(1, 200):04d}" if random.random() > 0.04 else None
-        downtime_mins = random.randint(0, 480) if random.random() > 0.1 else None
-        temperature = round(random.uniform(15, 95), 1) if random.random() > 0.09 else None
-        pressure = round(random.uniform(50, 300), 1) if random.random() > 0.09 else None
-        
-        # Cost data with inconsistencies
-        material_cost = round(random.uniform(100, 50000), 2) if random.random() > 0.07 else None
-        labor_cost = round(random.uniform(50, 5000), 2) if random.random() > 0.08 else None
-        
-        supplier = random.choice(suppliers)
-        
-        # Messy operator data
-        operator_id = f"OPR{random.randint(1, 500):05d}" if random.random() > 0.06 else None
-        
-        # Notes with inconsistencies
-        notes = random.choice([
-            'Normal operation',
-            'Machine calibration needed',
-            'Quality issues detected',
-            '',
-            None,
-            'TBD',
-            'SEE SUPERVISOR',
-            'Material shortage',
-            'na',
-            'N/A'
-        ])
-        
-        data.append([
-            batch_id, production_date, start_time, end_time, plant, line,
-            product, shift, planned_qty, actual_qty, defect_qty, yield_pct,
-            quality_status, machine_id, machine_status, downtime_mins,
-            temperature, pressure, material_cost, labor_cost, supplier,
-            operator_id, notes
-        ])
-        
-        # Add duplicate records (1.5% chance)
-        if random.random() < 0.015 and i > 100:
-            data.append(data[-1])
-    
-    df = pd.DataFrame(data, columns=[
-        'batch_id', 'production_date', 'start_time', 'end_time', 'plant', 'production_line',
-        'product_type', 'shift', 'planned_quantity', 'actual_quantity', 'defect_quantity', 'yield_percentage',
-        'quality_status', 'machine_id', 'machine_status', 'downtime_minutes',
-        'temperature_celsius', 'pressure_psi', 'material_cost', 'labor_cost', 'supplier',
-        'operator_id', 'notes'
-    ])
-    
-    return df
+def series_caption(prepared):
+    """One-line description of how a prepared series was built"""
+    if prepared.freq is None:
+        return f"{prepared.raw_rows:,} rows in date order (no resampling)"
+    fill = next(label for label, rule in GAP_FILLS.items() if rule == prepared.fill).lower()
+    return (f"{prepared.raw_rows:,} rows → {len(prepared.data):,} periods ({prepared.agg} per period) · "
+            f"{prepared.gaps:,} empty periods ({fill})")
 
-def generate_operations_data_df(rows):
-    """Generate operations/logistics data as DataFrame - complex and messy"""
-    import random
-    
-    warehouses = ['WH-North', 'WH-South', 'WH-East', 'WH-West', 'WH-Central', None, 'WH-NORTH', 'wh_north']
-    carriers = ['FedEx', 'UPS', 'DHL', 'USPS', 'Local Courier', None, 'TBD', 'fedex']
-    shipment_types = ['Standard', 'Express', 'Overnight', 'Economy', 'Priority', None, 'STANDARD']
-    statuses = ['Delivered', 'In Transit', 'Pending', 'Delayed', 'Cancelled', 'Lost', 'Returned', None, 'DELIVERED']
-    regions = ['Northeast', 'Southeast', 'Midwest', 'Southwest', 'West Coast', 'International', None]
-    order_types = ['B2B', 'B2C', 'Internal', 'Return', 'Exchange', None, 'b2b']
-    
-    data = []
-    base_date = datetime(2021, 1, 1)
-    
-    for i in range(1, min(rows + 1, 1000001)):  # Cap at 1,000,000
-        order_id = f"ORD{i:012d}"
-        shipment_id = f"SHIP{i:012d}" if random.random() > 0.05 else None
-        tracking_num = f"TRK{random.randint(1000000000, 9999999999)}" if random.random() > 0.08 else None
-        
-        # Messy dates
-        if random.random() < 0.04:
-            order_date = None
-            ship_date = None
-            delivery_date = None
-        else:
-            order_date = (base_date + timedelta(days=random.randint(0, 1460))).strftime('%Y-%m-%d')
-            ship_delay = random.randint(0, 14)
-            ship_date = (datetime.strptime(order_date, '%Y-%m-%d') + timedelta(days=ship_delay)).strftime('%Y-%m-%d')
-            
-            # Delivery date (sometimes before ship date - data error)
-            if random.random() < 0.02:
-                delivery_delay = random.randint(-5, 0)  # Data error: delivered before shipped
-            else:
-                delivery_delay = random.randint(1, 21)
-            
-            if random.random() > 0.15:  # 15% no delivery date yet
-                delivery_date = (datetime.strptime(ship_date, '%Y-%m-%d') + timedelta(days=delivery_delay)).strftime('%Y-%m-%d')
-            else:
-                delivery_date = None
-        
-        warehouse = random.choice(warehouses)
-        carrier = random.choice(carriers)
-        shipment_type = random.choice(shipment_types)
-        status = random.choice(statuses)
-        region = random.choice(regions)
-        order_type = random.choice(order_types)
-        
-        # Messy package metrics
-        weight_kg = round(random.uniform(0.1, 500), 2) if random.random() > 0.06 else None
-        
-        # Dimension inconsistencies
-        length_cm = round(random.uniform(5, 200), 1) if random.random() > 0.07 else None
-        width_cm = round(random.uniform(5, 150), 1) if random.random() > 0.07 else None
-        height_cm = round(random.uniform(5, 150), 1) if random.random() > 0.07 else None
-        
-        # Calculate volume with potential errors
-        if length_cm and width_cm and height_cm:
-            volume_cm3 = round(length_cm * width_cm * height_cm, 2)
-        else:
-            volume_cm3 = None
-        
-        # Quantity data
-        items_count = random.randint(1, 100) if random.random() > 0.05 else None
-        
-        # Cost data with inconsistencies
-        shipping_cost = round(random.uniform(5, 500), 2) if random.random() > 0.08 else None
-        insurance_cost = round(random.uniform(0, 100), 2) if random.random() > 0.12 else None
-        
-        # Distance
-        distance_km = round(random.uniform(10, 15000), 1) if random.random() > 0.1 else None
-        
-        # Customer data
-        customer_id = f"CUST{random.randint(1, 50000):08d}" if random.random() > 0.04 else None
-        
-        # Destination
-        destination_zip = f"{random.randint(10000, 99999)}" if random.random() > 0.06 else None
-        
-        # Priority with inconsistencies
-        priority = random.choice(['High', 'Medium', 'Low', 'Critical', None, 'HIGH', 'high'])
-        
-        # Delivery attempts
-        delivery_attempts = random.randint(1, 5) if random.random() > 0.15 else None
-        
-        # Damaged flag with inconsistencies
-        is_damaged = random.choice([True, False, None, 'Yes', 'No', 'TRUE', 'false', 1, 0])
-        
-        # Notes
-        notes = random.choice([
-            'Standard delivery',
-            'Customer not home',
-            'Left at door',
-            'Signature required',
-            '',
-            None,
-            'URGENT',
-            'Handle with care',
-            'na',
-            'N/A',
-            'See tracking for details'
-        ])
-        
-        data.append([
-            order_id, shipment_id, tracking_num, order_date, ship_date, delivery_date,
-            warehouse, carrier, shipment_type, status, region, order_type,
-            weight_kg, length_cm, width_cm, height_cm, volume_cm3, items_count,
-            shipping_cost, insurance_cost, distance_km, customer_id, destination_zip,
-            priority, delivery_attempts, is_damaged, notes
-        ])
-        
-        # Add duplicate records (1% chance)
-        if random.random() < 0.01 and i > 100:
-            data.append(data[-1])
-    
-    df = pd.DataFrame(data, columns=[
-        'order_id', 'shipment_id', 'tracking_number', 'order_date', 'ship_date', 'delivery_date',
-        'warehouse', 'carrier', 'shipment_type', 'status', 'region', 'order_type',
-        'weight_kg', 'length_cm', 'width_cm', 'height_cm', 'volume_cm3', 'items_count',
-        'shipping_cost', 'insurance_cost', 'distance_km', 'customer_id', 'destination_zip',
-        'priority', 'delivery_attempts', 'is_damaged', 'notes'
-    ])
-    
-    return df
+def chart_resolution_controls(key, dates):
+    """Point budget, downsampling mode and visible date range for a time series chart
 
-def generate_government_data_df(rows):
-    """Generate government/public sector data as DataFrame - complex and messy"""
-    import random
-    
-    departments = ['Public Works', 'Education', 'Health Services', 'Transportation', 'Parks & Recreation', 
-                   'Public Safety', 'Housing', 'Environmental', 'Finance', 'Administration', None, 'PUBLIC WORKS']
-    request_types = ['Service Request', 'Permit', 'License', 'Complaint', 'Information', 'Inspection',
-                     'Violation', 'Application', None, 'SERVICE REQUEST']
-    statuses = ['Open', 'Closed', 'In Progress', 'Pending', 'Approved', 'Denied', 'On Hold', 
-                'Under Review', None, 'CLOSED', 'closed']
-    priorities = ['High', 'Medium', 'Low', 'Emergency', 'Routine', None, 'HIGH', 'high']
-    channels = ['Online', 'Phone', 'In-Person', 'Email', 'Mail', 'Mobile App', None, 'ONLINE']
-    districts = ['District 1', 'District 2', 'District 3', 'District 4', 'District 5', 
-                 'District 6', None, 'DISTRICT 1', 'Dist-1']
-    categories = ['Infrastructure', 'Environmental', 'Public Safety', 'Administrative', 
-                  'Health', 'Education', 'Housing', None]
-    
-    data = []
-    base_date = datetime(2019, 1, 1)
-    
-    for i in range(1, min(rows + 1, 1000001)):  # Cap at 1,000,000
-        case_id = f"CASE{i:012d}"
-        reference_num = f"REF{random.randint(100000000, 999999999)}" if random.random() > 0.06 else None
-        
-        # Messy dates
-        if random.random() < 0.05:
-            submitted_date = None
-            assigned_date = None
-            resolved_date = None
-        else:
-            submitted_date = (base_date + timedelta(days=random.randint(0, 2190))).strftime('%Y-%m-%d')
-            
-            if random.random() > 0.1:
-                assign_delay = random.randint(0, 30)
-                assigned_date = (datetime.strptime(submitted_date, '%Y-%m-%d') + timedelta(days=assign_delay)).strftime('%Y-%m-%d')
-            else:
-                assigned_date = None
-            
-            if random.random() > 0.25:  # 25% still open
-                if assigned_date:
-                    resolve_delay = random.randint(1, 365)
-                    resolved_date = (datetime.strptime(assigned_date, '%Y-%m-%d') + timedelta(days=resolve_delay)).strftime('%Y-%m-%d')
-                else:
-                    resolved_date = None
-            else:
-                resolved_date = None
-        
-        department = random.choice(departments)
-        request_type = random.choice(request_types)
-        status = random.choice(statuses)
-        priority = random.choice(priorities)
-        channel = random.choice(channels)
-        district = random.choice(districts)
-        category = random.choice(categories)
-        
-        # Messy location data
-        address = f"{random.randint(1, 9999)} {random.choice(['Main', 'Oak', 'Park', 'Elm', 'Maple'])} {random.choice(['St', 'Ave', 'Blvd', 'Rd', 'Dr'])}" if random.random() > 0.08 else None
-        zip_code = f"{random.randint(10000, 99999)}" if random.random() > 0.07 else None
-        
-        # GPS coordinates with inconsistencies
-        latitude = round(random.uniform(25.0, 49.0), 6) if random.random() > 0.12 else None
-        longitude = round(random.uniform(-125.0, -65.0), 6) if random.random() > 0.12 else None
-        
-        # Citizen data
-        citizen_id = f"CIT{random.randint(1, 500000):010d}" if random.random() > 0.1 else None
-        
-        # Staff assignment
-        assigned_to = random.choice([
-            f'staff{random.randint(1, 200)}@gov.local',
-            f'Employee {random.randint(1, 200)}',
-            None,
-            'Unassigned',
-            'TBD',
-            ''
-        ])
-        
-        # Response time in hours with outliers
-        if submitted_date and resolved_date:
-            days_diff = (datetime.strptime(resolved_date, '%Y-%m-%d') - 
-                        datetime.strptime(submitted_date, '%Y-%m-%d')).days
-            response_time_hrs = days_diff * 24 + random.randint(0, 23)
-            # Add some outliers
-            if random.random() < 0.02:
-                response_time_hrs = random.randint(-100, 0)  # Negative time - data error
-        else:
-            response_time_hrs = None
-        
-        # Cost estimate
-        estimated_cost = round(random.uniform(0, 100000), 2) if random.random() > 0.15 else None
-        actual_cost = round(random.uniform(0, 120000), 2) if random.random() > 0.2 else None
-        
-        # Satisfaction rating
-        satisfaction = random.randint(1, 5) if random.random() > 0.3 else None
-        
-        # Inspection flag
-        requires_inspection = random.choice([True, False, None, 'Yes', 'No', 'TRUE', 1, 0])
-        
-        # Follow-up needed
-        follow_up = random.choice([True, False, None, 'Yes', 'No', 1, 0])
-        
-        # Fiscal year
-        fiscal_year = random.choice(['FY2019', 'FY2020', 'FY2021', 'FY2022', 'FY2023', 'FY2024', None, '2023', 'FY 2023'])
-        
-        # Description
-        description = random.choice([
-            'Pothole repair needed',
-            'Street light out',
-            'Permit application',
-            'Noise complaint',
-            'Park maintenance',
-            'Building inspection required',
-            '',
-            None,
-            'TBD',
-            'See attached documents',
-            'URGENT - immediate attention needed',
-            'na',
-            'N/A'
-        ])
-        
-        # Resolution notes
-        resolution = random.choice([
-            'Completed successfully',
-            'Issue resolved',
-            'Pending additional review',
-            'Referred to another department',
-            '',
-            None,
-            'IN PROGRESS',
-            'Waiting for parts',
-            'na'
-        ]) if status in ['Closed', 'Resolved', 'Completed'] or random.random() < 0.3 else None
-        
-        data.append([
-            case_id, reference_num, submitted_date, assigned_date, resolved_date,
-            department, request_type, status, priority, channel, district, category,
-            address, zip_code, latitude, longitude, citizen_id, assigned_to,
-            response_time_hrs, estimated_cost, actual_cost, satisfaction,
-            requires_inspection, follow_up, fiscal_year, description, resolution
-        ])
-        
-        # Add duplicate records (2% chance)
-        if random.random() < 0.02 and i > 100:
-            data.append(data[-1])
-    
-    df = pd.DataFrame(data, columns=[
-        'case_id', 'reference_number', 'submitted_date', 'assigned_date', 'resolved_date',
-        'department', 'request_type', 'status', 'priority', 'channel', 'district', 'category',
-        'address', 'zip_code', 'latitude', 'longitude', 'citizen_id', 'assigned_to',
-        'response_time_hours', 'estimated_cost', 'actual_cost', 'satisfaction_rating',
-        'requires_inspection', 'follow_up_needed', 'fiscal_year', 'description', 'resolution_notes'
-    ])
-    
-    return df
+    Streamlit does not report Plotly zoom events back to Python, so the visible
+    range is chosen with a slider; a narrow range is re-queried at full resolution.
+    """
+    with st.expander("🔍 Chart Resolution"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mode = st.selectbox("Downsampling", DOWNSAMPLE_MODES, key=f"{key}_mode",
+                                help="LTTB keeps the visual shape of the line; Min/Max keeps every spike")
+        with col2:
+            budget = st.number_input("Point Budget", min_value=100, max_value=100000, value=CHART_POINT_BUDGET,
+                                     step=500, key=f"{key}_budget")
+        with col3:
+            render_mode = st.selectbox("Rendering", RENDER_MODES, key=f"{key}_render",
+                                       help=f"Auto uses WebGL above {WEBGL_THRESHOLD:,} points and SVG below")
+        x_range = None
+        low, high = dates.min(), dates.max()
+        if pd.notna(low) and low < high:
+            low, high = low.to_pydatetime(), high.to_pydatetime()
+            x_range = st.slider("Visible Range", min_value=low, max_value=high, value=(low, high),
+                                step=max(timedelta(seconds=1), (high - low) / 1000), key=f"{key}_range_{low}_{high}",
+                                help="Narrow the range to see it at full resolution")
+    return int(budget), mode, render_mode, x_range
 
+def resolution_caption(shown, total, mode, webgl=False):
+    """Caption saying whether a chart shows every point in range or a downsampled subset, and how it is drawn"""
+    renderer = "WebGL" if webgl else "SVG"
+    if shown < total:
+        return (f"Showing {shown:,} of {total:,} points in range ({mode}, {renderer}); "
+                f"narrow the range for full resolution")
+    return f"Full resolution: {total:,} points ({renderer})"
 
 def calculate_kpis(df, date_col, value_col):
     """Calculate key performance indicators"""
@@ -1189,22 +877,6 @@ def calculate_kpis(df, date_col, value_col):
         'growth_rate': growth_rate
     }
 
-def moving_average_forecast(series, window=7, periods=30):
-    """Simple moving average forecast"""
-    ma = series.rolling(window=window).mean()
-    last_ma = ma.iloc[-1]
-    forecast = [last_ma] * periods
-    return forecast
-
-def exponential_smoothing_forecast(series, alpha=0.3, periods=30):
-    """Exponential smoothing forecast"""
-    result = [series.iloc[0]]
-    for i in range(1, len(series)):
-        result.append(alpha * series.iloc[i] + (1 - alpha) * result[i-1])
-    
-    last_value = result[-1]
-    forecast = [last_value] * periods
-    return forecast
 
 def clear_unused_sample_data(keep_key=None):
     """Clear unused sample datasets from session state to free memory"""
@@ -1218,6 +890,16 @@ def clear_unused_sample_data(keep_key=None):
         if key != keep_key and key in st.session_state:
             st.session_state[key] = None
 
+def activate_dataset(df, upload_id=None):
+    """Compact df's dtypes and make it the active dataset; returns the compacted DataFrame"""
+    compaction = compact_frame(df) if COMPACT_DTYPES else None
+    if compaction is not None:
+        df = compaction.df
+    st.session_state.df = df
+    st.session_state.df_compaction = compaction
+    st.session_state.active_upload_id = upload_id
+    return df
+
 # Sidebar
 with st.sidebar:
     st.markdown("### 🤖 AI BI Dashboard")
@@ -1254,6 +936,13 @@ with st.sidebar:
         if st.session_state.gemini_api_key:
             current_model = st.session_state.get('model_name', 'gemini-2.5-flash')
             st.success(f"🤖 AI: Connected ({current_model})")
+            cache_stats = get_ai_cache().stats()
+            st.caption(f"💾 Response cache: {cache_stats['hits']:,} hits, {cache_stats['misses']:,} misses "
+                       f"({cache_stats['hit_rate']:.0%}) · {cache_stats['entries']:,} replies stored")
+            if st.session_state.ai_call_log:
+                last_call = st.session_state.ai_call_log[-1]
+                st.caption(f"📏 Last call: ~{last_call['Prompt tokens (est.)']:,} prompt tokens → "
+                           f"~{last_call['Reply tokens (est.)']:,} reply tokens")
             if st.button("Disconnect"):
                 st.session_state.gemini_api_key = None
                 st.session_state.gemini_model = None
@@ -1270,6 +959,22 @@ with st.sidebar:
     )
     
     st.markdown("---")
+    if st.session_state.ai_call_log:
+        with st.expander("🧾 AI Call Log"):
+            call_log = pd.DataFrame(st.session_state.ai_call_log)
+            st.dataframe(call_log.iloc[::-1], use_container_width=True, hide_index=True)
+            st.caption(f"{len(call_log)} calls · ~{call_log['Prompt tokens (est.)'].sum():,} prompt tokens, "
+                       f"~{call_log['Reply tokens (est.)'].sum():,} reply tokens (estimated)")
+    with st.expander("🦆 DuckDB Engine"):
+        usage = get_duckdb_manager().utilisation()
+        col1, col2 = st.columns(2)
+        col1.metric("Sessions", usage['sessions'])
+        col2.metric("Threads / session", usage['threads'])
+        col1.metric("Memory", f"{usage['memory_mb']:.1f} MB")
+        col2.metric("Spilled", f"{usage['spilled_mb']:.1f} MB")
+        st.caption(f"Storage: {usage['storage']} · limit {usage['memory_limit']} per session · "
+                   f"{usage['tables']} tables, {usage['rows']:,} rows")
+    
     st.markdown("### About")
     st.info("AI-powered business intelligence with Google Gemini integration for advanced insights and analysis.")
 
@@ -1327,20 +1032,25 @@ elif page == "📁 Data Upload":
     
     with tab1:
         uploaded_file = st.file_uploader(
-            "Upload your CSV or Excel file",
-            type=['csv', 'xlsx', 'xls'],
+            "Upload your CSV, Parquet or Excel file",
+            type=['csv', 'parquet', 'xlsx', 'xls'],
             help="Upload a file containing your business data"
         )
         
         if uploaded_file is not None:
             try:
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
+                # Parse and compact once per upload; reruns reuse the active dataset
+                upload_id = getattr(uploaded_file, 'file_id', uploaded_file.name)
+                if st.session_state.active_upload_id != upload_id or st.session_state.df is None:
+                    df, from_cache = read_upload(uploaded_file, get_ingestion_cache(), con=st.session_state.con,
+                                                   spool_dir=duckdb_manager.files_dir(st.session_state.session_id))
+                    df = activate_dataset(df, upload_id)
                 else:
-                    df = pd.read_excel(uploaded_file)
+                    df, from_cache = st.session_state.df, True
                 
-                st.session_state.df = df
                 st.success(f"✅ File uploaded successfully! Loaded {len(df)} rows and {len(df.columns)} columns.")
+                if from_cache:
+                    st.caption("⚡ Reused the parsed file from the ingestion cache")
                 
                 st.subheader("Data Preview")
                 st.dataframe(df.head(10), use_container_width=True)
@@ -1355,8 +1065,9 @@ elif page == "📁 Data Upload":
                 
                 # AI Quick Insights
                 if st.session_state.gemini_api_key and st.button("🤖 Get AI Quick Insights", type="primary"):
+                    placeholder = ai_output_area("upload_insights")
                     with st.spinner("AI is analyzing your data..."):
-                        insights = generate_ai_insights(df)
+                        insights = generate_ai_insights(df, placeholder=placeholder)
                         st.markdown("<div class='ai-response'>", unsafe_allow_html=True)
                         st.markdown("### 🤖 AI Insights")
                         st.markdown(insights)
@@ -1395,8 +1106,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Sales Data", type="primary", key="gen_sales_sample"):
             with st.spinner("Generating sales data..."):
                 clear_unused_sample_data('sales_df_sample')  # Free memory
-                st.session_state.sales_df_sample = generate_sales_data_df(sales_rows)
-                st.session_state.df = st.session_state.sales_df_sample  # Set as active dataset
+                st.session_state.sales_df_sample = activate_dataset(generate_sales_data_df(sales_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.sales_df_sample):,} sales records!")
             st.rerun()
         
@@ -1424,8 +1134,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Healthcare Data", type="primary", key="gen_healthcare_sample"):
             with st.spinner("Generating healthcare data..."):
                 clear_unused_sample_data('healthcare_df_sample')  # Free memory
-                st.session_state.healthcare_df_sample = generate_healthcare_data_df(healthcare_rows)
-                st.session_state.df = st.session_state.healthcare_df_sample  # Set as active dataset
+                st.session_state.healthcare_df_sample = activate_dataset(generate_healthcare_data_df(healthcare_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.healthcare_df_sample):,} patient records!")
             st.rerun()
         
@@ -1453,8 +1162,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Finance Data", type="primary", key="gen_finance_sample"):
             with st.spinner("Generating finance data..."):
                 clear_unused_sample_data('finance_df_sample')  # Free memory
-                st.session_state.finance_df_sample = generate_finance_data_df(finance_rows)
-                st.session_state.df = st.session_state.finance_df_sample  # Set as active dataset
+                st.session_state.finance_df_sample = activate_dataset(generate_finance_data_df(finance_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.finance_df_sample):,} transactions!")
             st.rerun()
         
@@ -1485,8 +1193,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Industry-Agnostic Data", type="primary", key="gen_agnostic_sample"):
             with st.spinner(f"Generating {agnostic_rows:,} records... This may take a moment for large datasets..."):
                 clear_unused_sample_data('industry_agnostic_df_sample')  # Free memory
-                st.session_state.industry_agnostic_df_sample = generate_industry_agnostic_data_df(agnostic_rows)
-                st.session_state.df = st.session_state.industry_agnostic_df_sample  # Set as active dataset
+                st.session_state.industry_agnostic_df_sample = activate_dataset(generate_industry_agnostic_data_df(agnostic_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.industry_agnostic_df_sample):,} business records!")
             st.rerun()
         
@@ -1527,8 +1234,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Manufacturing Data", type="primary", key="gen_manufacturing_sample"):
             with st.spinner(f"Generating {manufacturing_rows:,} records... This may take a moment for large datasets..."):
                 clear_unused_sample_data('manufacturing_df_sample')  # Free memory
-                st.session_state.manufacturing_df_sample = generate_manufacturing_data_df(manufacturing_rows)
-                st.session_state.df = st.session_state.manufacturing_df_sample  # Set as active dataset
+                st.session_state.manufacturing_df_sample = activate_dataset(generate_manufacturing_data_df(manufacturing_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.manufacturing_df_sample):,} production records!")
             st.rerun()
         
@@ -1569,8 +1275,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Operations Data", type="primary", key="gen_operations_sample"):
             with st.spinner(f"Generating {operations_rows:,} records... This may take a moment for large datasets..."):
                 clear_unused_sample_data('operations_df_sample')  # Free memory
-                st.session_state.operations_df_sample = generate_operations_data_df(operations_rows)
-                st.session_state.df = st.session_state.operations_df_sample  # Set as active dataset
+                st.session_state.operations_df_sample = activate_dataset(generate_operations_data_df(operations_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.operations_df_sample):,} shipment records!")
             st.rerun()
         
@@ -1611,8 +1316,7 @@ elif page == "📁 Data Upload":
         if st.button("Generate Government Data", type="primary", key="gen_government_sample"):
             with st.spinner(f"Generating {government_rows:,} records... This may take a moment for large datasets..."):
                 clear_unused_sample_data('government_df_sample')  # Free memory
-                st.session_state.government_df_sample = generate_government_data_df(government_rows)
-                st.session_state.df = st.session_state.government_df_sample  # Set as active dataset
+                st.session_state.government_df_sample = activate_dataset(generate_government_data_df(government_rows))  # Set as active dataset
             st.success(f"✅ Generated {len(st.session_state.government_df_sample):,} public sector records!")
             st.rerun()
         
@@ -1637,6 +1341,84 @@ elif page == "📁 Data Upload":
                 key="download_government_sample"
             )
         
+        st.markdown("---")
+        
+        # === LARGE DATASET STREAMING ===
+        st.markdown("### 🚀 Stream Large Dataset to Disk")
+        st.write("Generate millions of messy records in fixed-size chunks written straight to CSV or Parquet - memory stays bounded by the chunk size")
+        
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            stream_dataset = st.selectbox(
+                "Dataset",
+                list(STREAMING_DATASETS.keys()),
+                format_func=lambda name: name.replace('_', '-').title(),
+                key="stream_dataset"
+            )
+        with col2:
+            stream_rows = st.number_input("Rows", min_value=100000, max_value=10000000, value=1000000, step=500000, key="stream_rows")
+        with col3:
+            stream_format = st.selectbox("Format", ["Parquet", "CSV"], key="stream_format")
+        
+        if st.button("Stream to Disk", type="primary", key="gen_stream_sample"):
+            file_format = stream_format.lower()
+            # The session's files directory is the only one its DuckDB database may read
+            stream_path = os.path.join(duckdb_manager.files_dir(st.session_state.session_id),
+                                       f"{stream_dataset}_sample.{file_format}")
+            progress = st.progress(0.0, text=f"Streaming {stream_rows:,} records...")
+            try:
+                written = write_sample_data(
+                    stream_dataset, stream_rows, stream_path, file_format,
+                    on_chunk=lambda done: progress.progress(done / stream_rows, text=f"Streamed {done:,} of {stream_rows:,} records")
+                )
+                st.session_state.streamed_sample = {'path': stream_path, 'format': file_format, 'rows': written}
+                st.success(f"✅ Streamed {written:,} records to `{stream_path}`")
+            except Exception as e:
+                handle_error(e)
+        
+        if st.session_state.get('streamed_sample'):
+            streamed = st.session_state.streamed_sample
+            reader = 'read_parquet' if streamed['format'] == 'parquet' else 'read_csv_auto'
+            escaped_path = streamed['path'].replace("'", "''")
+            
+            try:
+                # Lazy view over the file - nothing is loaded until a query needs it
+                st.session_state.con.execute(
+                    f"CREATE OR REPLACE VIEW streamed_sample AS SELECT * FROM {reader}('{escaped_path}')"
+                )
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Records on Disk", f"{streamed['rows']:,}")
+                with col2:
+                    st.metric("File Size", f"{os.path.getsize(streamed['path']) / 1024**2:.1f} MB")
+                with col3:
+                    st.metric("Format", streamed['format'].upper())
+                
+                st.dataframe(st.session_state.con.execute("SELECT * FROM streamed_sample LIMIT 10").fetchdf(), use_container_width=True)
+                st.caption("💡 Available in DuckDB as the `streamed_sample` view without loading it into memory.")
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("📂 Load as Active Dataset", key="load_stream_sample"):
+                        with st.spinner("Loading streamed dataset..."):
+                            clear_unused_sample_data()
+                            activate_dataset(st.session_state.con.execute("SELECT * FROM streamed_sample").fetchdf())
+                        st.rerun()
+                with col2:
+                    with open(streamed['path'], 'rb') as stream_file:
+                        st.download_button(
+                            label=f"📥 Download {streamed['format'].upper()}",
+                            data=stream_file,
+                            file_name=os.path.basename(streamed['path']),
+                            mime="text/csv" if streamed['format'] == 'csv' else "application/octet-stream",
+                            key="download_stream_sample"
+                        )
+            except Exception as e:
+                st.error(f"Error reading streamed file: {str(e)}")
+                st.session_state.streamed_sample = None
+        
+        st.markdown("---")
         st.info("💡 **Tip:** Download these files and place them in `tests/data/` for permanent use")
         st.info("⚠️ **Note:** These datasets contain realistic data quality issues including missing values, duplicates, inconsistent formatting, and data entry errors - perfect for testing data cleaning and validation workflows!")
         st.info("🌐 **Cloud Note:** For Streamlit Community Cloud, datasets ≤25,000 rows recommended to avoid memory issues.")
@@ -1665,21 +1447,24 @@ elif page == "🤖 AI Insights":
             )
         
         with col2:
-            if st.button("🤖 Generate AI Insights", type="primary"):
-                with st.spinner("AI is analyzing your data... This may take a moment."):
-                    
-                    if analysis_type == "Comprehensive Overview":
-                        insights = generate_ai_insights(df)
-                    elif analysis_type == "Trends & Patterns":
-                        insights = generate_ai_insights(df, "What are the key trends and patterns in this data? Identify any seasonal patterns or cyclical behaviors.")
-                    elif analysis_type == "Anomaly Detection":
-                        insights = generate_ai_insights(df, "Identify any anomalies, outliers, or unusual patterns in this data. What could be causing them?")
-                    elif analysis_type == "Performance Analysis":
-                        insights = generate_ai_insights(df, "Analyze the performance metrics in this data. Which areas are performing well and which need improvement?")
-                    else:  # Predictive Insights
-                        insights = generate_ai_insights(df, "Based on historical patterns, what predictions can you make about future trends? What factors should we monitor?")
-                    
-                    st.session_state.last_insights = insights
+            generate_insights = st.button("🤖 Generate AI Insights", type="primary")
+        
+        if generate_insights:
+            placeholder = ai_output_area("insights")
+            with st.spinner("AI is analyzing your data... This may take a moment."):
+                
+                if analysis_type == "Comprehensive Overview":
+                    insights = generate_ai_insights(df, placeholder=placeholder)
+                elif analysis_type == "Trends & Patterns":
+                    insights = generate_ai_insights(df, "What are the key trends and patterns in this data? Identify any seasonal patterns or cyclical behaviors.", placeholder)
+                elif analysis_type == "Anomaly Detection":
+                    insights = generate_ai_insights(df, "Identify any anomalies, outliers, or unusual patterns in this data. What could be causing them?", placeholder)
+                elif analysis_type == "Performance Analysis":
+                    insights = generate_ai_insights(df, "Analyze the performance metrics in this data. Which areas are performing well and which need improvement?", placeholder)
+                else:  # Predictive Insights
+                    insights = generate_ai_insights(df, "Based on historical patterns, what predictions can you make about future trends? What factors should we monitor?", placeholder)
+                
+                st.session_state.last_insights = insights
         
         if 'last_insights' in st.session_state:
             st.markdown("---")
@@ -1737,9 +1522,11 @@ elif page == "💬 AI Chat Assistant":
             # Add user message to history
             st.session_state.chat_history.append(("user", user_question))
             
-            # Generate AI response
+            # Generate AI response, streamed below the conversation
+            with chat_container:
+                placeholder = ai_output_area("chat")
             with st.spinner("🤖 AI is thinking..."):
-                response = generate_ai_insights(df, user_question)
+                response = generate_ai_insights(df, user_question, placeholder)
                 st.session_state.chat_history.append(("ai", response))
             
             st.rerun()
@@ -1757,6 +1544,13 @@ elif page == "🔍 Exploratory Analysis":
     else:
         df = st.session_state.df
         
+        approximate = st.checkbox(
+            "⚡ Approximate profile (HyperLogLog distinct counts, sketch quantiles)",
+            value=len(df) > APPROX_PROFILE_ROWS,
+            help="Much faster on very large datasets; distinct counts and quartiles are estimates"
+        )
+        profile = profile_dataframe(df, approximate=approximate, cache=get_profile_cache())
+        
         tab1, tab2, tab3 = st.tabs(["📋 Data Summary", "🔢 Statistical Analysis", "🧹 Data Quality"])
         
         with tab1:
@@ -1764,27 +1558,36 @@ elif page == "🔍 Exploratory Analysis":
             
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Rows", len(df))
+                st.metric("Rows", profile.rows)
             with col2:
-                st.metric("Columns", len(df.columns))
+                st.metric("Columns", len(profile.columns))
             with col3:
-                st.metric("Numeric Columns", len(df.select_dtypes(include=[np.number]).columns))
+                st.metric("Numeric Columns", profile.kind_counts()['numeric'])
             with col4:
-                st.metric("Memory Usage", f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+                compaction = st.session_state.df_compaction
+                if compaction is not None and compaction.df is df:
+                    st.metric("Memory Usage", f"{profile.memory_mb:.2f} MB",
+                              delta=f"-{compaction.saved_mb:.2f} MB from {compaction.before_mb:.2f} MB",
+                              delta_color="inverse",
+                              help="Before and after dtype compaction (categories and Arrow strings)")
+                else:
+                    st.metric("Memory Usage", f"{profile.memory_mb:.2f} MB")
             
             st.markdown("---")
             
             st.subheader("Column Information")
             
-            col_info = pd.DataFrame({
-                'Column': df.columns,
-                'Data Type': df.dtypes.values,
-                'Non-Null Count': df.count().values,
-                'Null Count': df.isnull().sum().values,
-                'Unique Values': [df[col].nunique() for col in df.columns]
-            })
+            col_info = profile.column_info()[['Column', 'Data Type', 'Non-Null Count', 'Null Count', 'Unique Values']]
             
             st.dataframe(col_info, use_container_width=True)
+            st.caption(f"Profiled in one pass in {profile.elapsed * 1000:.0f} ms"
+                       + (" (approximate)" if profile.approximate else ""))
+            
+            if compaction is not None and compaction.df is df and compaction.conversions:
+                with st.expander(f"🗜️ Dtype Compaction ({len(compaction.conversions)} columns converted)"):
+                    st.dataframe(compaction.summary(), use_container_width=True, hide_index=True)
+                    st.caption(f"{compaction.before_mb:.2f} MB → {compaction.after_mb:.2f} MB "
+                               f"in {compaction.elapsed * 1000:.0f} ms on load")
             
             st.markdown("---")
             st.subheader("Data Sample")
@@ -1796,7 +1599,7 @@ elif page == "🔍 Exploratory Analysis":
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if numeric_cols:
-                st.dataframe(df[numeric_cols].describe(), use_container_width=True)
+                st.dataframe(profile.describe(), use_container_width=True)
                 
                 st.markdown("---")
                 st.subheader("Distribution Analysis")
@@ -1806,15 +1609,13 @@ elif page == "🔍 Exploratory Analysis":
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    fig = px.histogram(df, x=selected_col, nbins=50, 
-                                     title=f"Distribution of {selected_col}",
-                                     color_discrete_sequence=['#1f77b4'])
+                    fig = histogram_figure(df[selected_col], f"Distribution of {selected_col}", bins=50,
+                                           color='#1f77b4', x_label=selected_col)
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
-                    fig = px.box(df, y=selected_col, 
-                               title=f"Box Plot of {selected_col}",
-                               color_discrete_sequence=['#ff7f0e'])
+                    fig = box_figure(df[selected_col], f"Box Plot of {selected_col}",
+                                     color='#ff7f0e', name=selected_col)
                     st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No numeric columns found in the dataset.")
@@ -1822,14 +1623,14 @@ elif page == "🔍 Exploratory Analysis":
         with tab3:
             st.subheader("Data Quality Report")
             
-            missing_data = df.isnull().sum()
-            missing_pct = (missing_data / len(df) * 100).round(2)
+            missing_data = profile.nulls
+            missing_pct = (missing_data / profile.rows * 100).round(2)
             
             quality_df = pd.DataFrame({
-                'Column': df.columns,
+                'Column': profile.columns,
                 'Missing Values': missing_data.values,
                 'Missing %': missing_pct.values,
-                'Data Type': df.dtypes.values
+                'Data Type': profile.dtypes.astype(str).values
             })
             
             quality_df = quality_df[quality_df['Missing Values'] > 0].sort_values('Missing Values', ascending=False)
@@ -1846,7 +1647,7 @@ elif page == "🔍 Exploratory Analysis":
             else:
                 st.success("✅ No missing values detected in the dataset!")
             
-            duplicates = df.duplicated().sum()
+            duplicates = profile.duplicates
             st.metric("Duplicate Rows", duplicates)
             
             if duplicates > 0:
@@ -1866,7 +1667,7 @@ elif page == "📈 Visualizations":
         )
         
         if viz_type == "Time Series Analysis":
-            date_cols = [col for col in df.columns if 'date' in col.lower() or df[col].dtype == 'datetime64[ns]']
+            date_cols = date_columns(df)
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if date_cols and numeric_cols:
@@ -1875,17 +1676,23 @@ elif page == "📈 Visualizations":
                     date_col = st.selectbox("Select Date Column", date_cols)
                 with col2:
                     value_col = st.selectbox("Select Value Column", numeric_cols)
+                freq, agg, fill = time_series_controls("viz_ts", default_fill="Leave gaps", allow_raw=True)
                 
-                df[date_col] = pd.to_datetime(df[date_col])
-                df_sorted = df.sort_values(date_col)
+                prepared = prepare_series(df, date_col, value_col, freq, agg, fill, cache=get_timeseries_cache())
+                budget, mode, render_mode, x_range = chart_resolution_controls("viz_ts_chart", prepared.dates)
+                plot_df, points = downsample(prepared.data, date_col, value_col, budget, mode, x_range)
+                webgl = use_webgl(len(plot_df), render_mode)
                 
-                fig = px.line(df_sorted, x=date_col, y=value_col,
+                fig = px.line(plot_df, x=date_col, y=value_col,
                             title=f"{value_col} Over Time",
-                            labels={date_col: "Date", value_col: "Value"})
+                            labels={date_col: "Date", value_col: "Value"},
+                            render_mode='webgl' if webgl else 'svg')
                 fig.update_layout(height=500)
                 st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{series_caption(prepared)} · {resolution_caption(len(plot_df), points, mode, webgl)}")
                 
-                kpis = calculate_kpis(df_sorted, date_col, value_col)
+                kpis = calculate_kpis(sorted_by_date(df, date_col, [value_col], cache=get_timeseries_cache()),
+                                      date_col, value_col)
                 
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
@@ -1901,7 +1708,7 @@ elif page == "📈 Visualizations":
                 st.info("Please ensure your dataset has date and numeric columns for time series analysis.")
         
         elif viz_type == "Category Analysis":
-            categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
+            categorical_cols = text_columns(df)
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if categorical_cols and numeric_cols:
@@ -1911,20 +1718,26 @@ elif page == "📈 Visualizations":
                 with col2:
                     val_col = st.selectbox("Select Value Column", numeric_cols)
                 
-                grouped = df.groupby(cat_col)[val_col].sum().reset_index()
+                fingerprint = dataset_fingerprint(df)
+                params = {'category': cat_col, 'value': val_col}
+                
+                def category_totals():
+                    return df.groupby(cat_col, observed=True)[val_col].sum().reset_index()
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    fig = px.bar(grouped, x=cat_col, y=val_col,
-                               title=f"{val_col} by {cat_col}",
-                               color=val_col,
-                               color_continuous_scale='Blues')
+                    fig = cached_figure(get_figure_cache(), fingerprint, "category_bar", params,
+                                        lambda: px.bar(category_totals(), x=cat_col, y=val_col,
+                                                       title=f"{val_col} by {cat_col}",
+                                                       color=val_col,
+                                                       color_continuous_scale='Blues'))
                     st.plotly_chart(fig, use_container_width=True)
                 
                 with col2:
-                    fig = px.pie(grouped, values=val_col, names=cat_col,
-                               title=f"{val_col} Distribution by {cat_col}")
+                    fig = cached_figure(get_figure_cache(), fingerprint, "category_pie", params,
+                                        lambda: px.pie(category_totals(), values=val_col, names=cat_col,
+                                                       title=f"{val_col} Distribution by {cat_col}"))
                     st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("Please ensure your dataset has both categorical and numeric columns.")
@@ -1933,30 +1746,44 @@ elif page == "📈 Visualizations":
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if len(numeric_cols) >= 2:
-                corr_matrix = df[numeric_cols].corr()
-                
-                fig = px.imshow(corr_matrix,
-                              labels=dict(color="Correlation"),
-                              x=numeric_cols,
-                              y=numeric_cols,
-                              color_continuous_scale='RdBu_r',
-                              aspect="auto",
-                              title="Correlation Heatmap")
-                fig.update_layout(height=600)
+                col1, col2 = st.columns(2)
+                with col1:
+                    method = st.selectbox("Correlation Method", CORRELATION_METHODS, format_func=str.title,
+                                          key="corr_method",
+                                          help="Spearman correlates ranks, so it also catches monotonic non-linear relationships")
+                with col2:
+                    sample = st.checkbox(f"Estimate from {CORRELATION_SAMPLE_ROWS:,} sampled rows",
+                                         value=len(df) > CORRELATION_SAMPLE_ROWS, key="corr_sample",
+                                         disabled=len(df) <= CORRELATION_SAMPLE_ROWS,
+                                         help="Faster on very tall tables; off computes over every row")
+                sample_rows = CORRELATION_SAMPLE_ROWS if sample else None
+                
+                def correlation_heatmap():
+                    matrix = correlation_matrix(df, numeric_cols, method, sample_rows).matrix
+                    fig = px.imshow(matrix,
+                                  labels=dict(color="Correlation"),
+                                  x=numeric_cols,
+                                  y=numeric_cols,
+                                  color_continuous_scale='RdBu_r',
+                                  zmin=-1,
+                                  zmax=1,
+                                  aspect="auto",
+                                  title=f"{method.title()} Correlation Heatmap")
+                    fig.update_layout(height=600)
+                    return fig, matrix
+                
+                # The matrix is cached with the heatmap, so a hit spares recomputing it for the table too
+                params = {'columns': numeric_cols, 'method': method, 'sample_rows': sample_rows}
+                fig, corr_matrix = cached_figure(get_figure_cache(), dataset_fingerprint(df), "correlation_heatmap",
+                                                 params, correlation_heatmap, with_data=True)
                 st.plotly_chart(fig, use_container_width=True)
+                rows_used = min(len(df), sample_rows or len(df))
+                st.caption(f"{method.title()} correlation over {rows_used:,} of {len(df):,} rows"
+                           + (" (random sample)" if rows_used < len(df) else ""))
                 
                 st.subheader("Strongest Correlations")
                 
-                corr_pairs = []
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(i+1, len(corr_matrix.columns)):
-                        corr_pairs.append({
-                            'Variable 1': corr_matrix.columns[i],
-                            'Variable 2': corr_matrix.columns[j],
-                            'Correlation': corr_matrix.iloc[i, j]
-                        })
-                
-                corr_df = pd.DataFrame(corr_pairs).sort_values('Correlation', key=abs, ascending=False).head(10)
+                corr_df = top_correlations(corr_matrix, k=10)
                 st.dataframe(corr_df, use_container_width=True)
             else:
                 st.info("Need at least 2 numeric columns for correlation analysis.")
@@ -1969,12 +1796,18 @@ elif page == "📈 Visualizations":
                 if numeric_cols:
                     value_col = st.selectbox("Select Value Column", numeric_cols)
                     
-                    grouped = df.groupby(region_col)[value_col].agg(['sum', 'mean', 'count']).reset_index()
+                    def region_bar():
+                        grouped = df.groupby(region_col, observed=True)[value_col].agg(['sum', 'mean', 'count']).reset_index()
+                        return px.bar(grouped, x=region_col, y='sum',
+                                      title=f"Total {value_col} by Region",
+                                      color='sum',
+                                      color_continuous_scale='Viridis',
+                                      hover_data=['mean', 'count']), grouped
                     
-                    fig = px.bar(grouped, x=region_col, y='sum',
-                               title=f"Total {value_col} by Region",
-                               color='sum',
-                               color_continuous_scale='Viridis')
+                    # The totals are cached with the bars, so the table needs no groupby either
+                    fig, grouped = cached_figure(get_figure_cache(), dataset_fingerprint(df), "region_bar",
+                                                 {'region': region_col, 'value': value_col}, region_bar,
+                                                 with_data=True)
                     st.plotly_chart(fig, use_container_width=True)
                     
                     st.dataframe(grouped, use_container_width=True)
@@ -1991,7 +1824,7 @@ elif page == "🔮 AI-Enhanced Forecasting":
     else:
         df = st.session_state.df
         
-        date_cols = [col for col in df.columns if 'date' in col.lower() or df[col].dtype == 'datetime64[ns]']
+        date_cols = date_columns(df)
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         
         if date_cols and numeric_cols:
@@ -2000,12 +1833,10 @@ elif page == "🔮 AI-Enhanced Forecasting":
                 date_col = st.selectbox("Select Date Column", date_cols, key="forecast_date_col")
             with col2:
                 value_col = st.selectbox("Select Value Column to Forecast", numeric_cols, key="forecast_value_col")
-            
-            df[date_col] = pd.to_datetime(df[date_col])
-            df_sorted = df.sort_values(date_col).copy()
+            freq, agg, fill = time_series_controls("forecast")
             
             st.subheader("Forecast Parameters")
-            col1, col2, col3 = st.columns(3)
+            col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 forecast_periods = st.slider("Forecast Periods", 7, 90, 30, key="forecast_periods")
@@ -2013,50 +1844,77 @@ elif page == "🔮 AI-Enhanced Forecasting":
                 ma_window = st.slider("Moving Average Window", 3, 30, 7, key="ma_window")
             with col3:
                 es_alpha = st.slider("Smoothing Factor (α)", 0.1, 0.9, 0.3, 0.1, key="es_alpha")
+                fit_es_alpha = st.checkbox("Fit α automatically", value=False, key="es_alpha_auto",
+                                           help="Pick the α with the lowest one-step-ahead error from a grid of 0.05 to 0.95")
+            with col4:
+                seasonality = st.selectbox("Holt-Winters Seasonality", ["None", "Weekly", "Yearly"], key="hw_seasonality",
+                                           help="None fits level and trend (double smoothing); Weekly and Yearly add an additive seasonal cycle (7 or 365 days, 52 weeks, 12 months)")
+                season_length = season_length_for(freq, seasonality)
+                if seasonality != "None" and season_length is None:
+                    st.caption(f"{seasonality} seasonality needs a finer resampling; using double smoothing")
             
             if st.button("Generate Forecast", type="primary"):
-                ts_data = df_sorted.groupby(date_col)[value_col].mean().reset_index()
+                prepared = prepare_series(df, date_col, value_col, freq, agg, fill, cache=get_timeseries_cache())
+                ts_data = prepared.data
                 
-                ma_forecast = moving_average_forecast(ts_data[value_col], window=ma_window, periods=forecast_periods)
-                es_forecast = exponential_smoothing_forecast(ts_data[value_col], alpha=es_alpha, periods=forecast_periods)
+                ma_result = fit_moving_average(ts_data[value_col], window=ma_window, periods=forecast_periods)
+                es_result = fit_exponential_smoothing(ts_data[value_col], alpha='auto' if fit_es_alpha else es_alpha,
+                                                      periods=forecast_periods)
+                try:
+                    hw_result = fit_holt_winters(ts_data[value_col].dropna(), periods=forecast_periods, season_length=season_length)
+                except ValueError as e:
+                    hw_result = None
+                    st.warning(f"Holt-Winters skipped: {str(e)}")
+                ma_forecast = ma_result.tolist()
+                es_forecast = es_result.tolist()
                 
-                last_date = ts_data[date_col].max()
-                future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=forecast_periods, freq='D')
+                future_dates = prepared.future_dates(forecast_periods)
                 
                 forecast_df = pd.DataFrame({
                     'Date': future_dates,
                     'Moving Average': ma_forecast,
                     'Exponential Smoothing': es_forecast
                 })
+                if hw_result is not None:
+                    forecast_df['Holt-Winters'] = hw_result.values
                 
                 # Store forecast data in session state
                 st.session_state.forecast_data = {
                     'ts_data': ts_data,
+                    'series_caption': series_caption(prepared),
                     'ma_forecast': ma_forecast,
                     'es_forecast': es_forecast,
+                    'hw_forecast': hw_result.tolist() if hw_result is not None else None,
+                    'results': [result for result in (ma_result, es_result, hw_result) if result is not None],
                     'forecast_df': forecast_df,
                     'date_col': date_col,
                     'value_col': value_col,
                     'ma_window': ma_window,
-                    'es_alpha': es_alpha
+                    'es_alpha': es_result.params['alpha'],
+                    'hw_result': hw_result
                 }
             
             # Display forecast if it exists in session state
             if 'forecast_data' in st.session_state:
                 fdata = st.session_state.forecast_data
                 
-                # Plotting
+                # Plotting (history downsampled to the point budget; forecasts are short)
+                budget, mode, render_mode, x_range = chart_resolution_controls("forecast_chart", fdata['ts_data'][fdata['date_col']])
+                history, points = downsample(fdata['ts_data'], fdata['date_col'], fdata['value_col'], budget, mode, x_range)
+                webgl = use_webgl(len(history) + 3 * len(fdata['forecast_df']), render_mode)
                 fig = go.Figure()
                 
-                fig.add_trace(go.Scatter(
-                    x=fdata['ts_data'][fdata['date_col']],
-                    y=fdata['ts_data'][fdata['value_col']],
+                fig.add_trace(line_trace(
+                    webgl,
+                    x=history[fdata['date_col']],
+                    y=history[fdata['value_col']],
                     mode='lines',
                     name='Historical Data',
                     line=dict(color='blue', width=2)
                 ))
                 
-                fig.add_trace(go.Scatter(
+                fig.add_trace(line_trace(
+                    webgl,
                     x=fdata['forecast_df']['Date'],
                     y=fdata['forecast_df']['Moving Average'],
                     mode='lines',
@@ -2064,7 +1922,8 @@ elif page == "🔮 AI-Enhanced Forecasting":
                     line=dict(color='red', width=2, dash='dash')
                 ))
                 
-                fig.add_trace(go.Scatter(
+                fig.add_trace(line_trace(
+                    webgl,
                     x=fdata['forecast_df']['Date'],
                     y=fdata['forecast_df']['Exponential Smoothing'],
                     mode='lines',
@@ -2072,6 +1931,16 @@ elif page == "🔮 AI-Enhanced Forecasting":
                     line=dict(color='green', width=2, dash='dot')
                 ))
                 
+                if fdata.get('hw_result') is not None:
+                    fig.add_trace(line_trace(
+                        webgl,
+                        x=fdata['forecast_df']['Date'],
+                        y=fdata['forecast_df']['Holt-Winters'],
+                        mode='lines',
+                        name=f'{fdata["hw_result"].method} Forecast',
+                        line=dict(color='purple', width=2, dash='dashdot')
+                    ))
+                
                 fig.update_layout(
                     title=f"{fdata['value_col']} Forecast",
                     xaxis_title="Date",
@@ -2081,36 +1950,70 @@ elif page == "🔮 AI-Enhanced Forecasting":
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{fdata['series_caption']} · {resolution_caption(len(history), points, mode, webgl)}")
                 
                 # Forecast summary
                 st.subheader("Forecast Summary")
                 
-                col1, col2 = st.columns(2)
+                summary_cols = st.columns(len(fdata['results']))
                 
-                with col1:
-                    st.markdown("**Moving Average Forecast**")
-                    st.metric("Average Forecast", f"{np.mean(fdata['ma_forecast']):,.2f}")
-                    st.metric("Min Forecast", f"{np.min(fdata['ma_forecast']):,.2f}")
-                    st.metric("Max Forecast", f"{np.max(fdata['ma_forecast']):,.2f}")
+                for summary_col, result in zip(summary_cols, fdata['results']):
+                    with summary_col:
+                        st.markdown(f"**{result.method} Forecast**")
+                        st.metric("Average Forecast", f"{np.mean(result.values):,.2f}")
+                        st.metric("Min Forecast", f"{np.min(result.values):,.2f}")
+                        st.metric("Max Forecast", f"{np.max(result.values):,.2f}")
+                        st.metric("MAPE (one-step, in-sample)", f"{result.mape:.2f}%" if np.isfinite(result.mape) else "N/A")
+                        params = ", ".join(f"{name}={value:g}" for name, value in result.params.items())
+                        st.caption(f"Fit in {result.fit_seconds * 1000:,.1f} ms · RMSE {result.rmse:,.2f} · {params}")
                 
+                # Rolling-origin backtest with the current slider settings (cached per series and parameters)
+                st.subheader("Backtest (Rolling Origin)")
+                col1, col2 = st.columns(2)
+                with col1:
+                    backtest_horizon = st.slider("Backtest Horizon", 1, 30, 7, key="backtest_horizon",
+                                                 help="Points forecast ahead from each cutoff")
                 with col2:
-                    st.markdown("**Exponential Smoothing Forecast**")
-                    st.metric("Average Forecast", f"{np.mean(fdata['es_forecast']):,.2f}")
-                    st.metric("Min Forecast", f"{np.min(fdata['es_forecast']):,.2f}")
-                    st.metric("Max Forecast", f"{np.max(fdata['es_forecast']):,.2f}")
+                    backtest_step = st.slider("Cutoff Every N Points", 1, 30, 1, key="backtest_step")
+                
+                backtest_series = fdata['ts_data'][fdata['value_col']].dropna()
+                backtest_rows = []
+                for method in BACKTEST_METHODS:
+                    try:
+                        bt = backtest(backtest_series, method, horizon=backtest_horizon, step=backtest_step,
+                                      cache=get_backtest_cache(), window=ma_window,
+                                      alpha='auto' if fit_es_alpha else es_alpha, season_length=season_length)
+                    except ValueError as e:
+                        st.caption(f"{method} backtest skipped: {str(e)}")
+                        continue
+                    backtest_rows.append({
+                        'Method': method,
+                        'Cutoffs': len(bt.cutoffs),
+                        'MAE': bt.mae,
+                        'MAPE (%)': bt.mape,
+                        'RMSE': bt.rmse,
+                        'Parameters': ", ".join(f"{name}={value:g}" for name, value in bt.params.items()),
+                        'Time (ms)': bt.elapsed * 1000,
+                        'Cached': bt.from_cache
+                    })
+                if backtest_rows:
+                    st.dataframe(pd.DataFrame(backtest_rows), use_container_width=True)
+                    st.caption(f"Each method forecasts {backtest_horizon} points ahead from every cutoff in the last two "
+                               f"thirds of the series; fitted parameters only see data before the first cutoff.")
                 
                 # AI Interpretation
                 if st.session_state.gemini_api_key:
                     st.markdown("---")
                     st.subheader("🤖 AI Forecast Interpretation")
                     
-                    col1, col2 = st.columns(2)
+                    col1, col2, col3 = st.columns(3)
                     
                     with col1:
                         if st.button("Interpret Moving Average Forecast", key="interpret_ma"):
+                            placeholder = ai_output_area("interpret_ma")
                             with st.spinner("AI is analyzing the forecast..."):
                                 try:
-                                    interpretation = interpret_forecast(fdata['ts_data'][fdata['value_col']], fdata['ma_forecast'], "Moving Average")
+                                    interpretation = interpret_forecast(fdata['ts_data'][fdata['value_col']], fdata['ma_forecast'], "Moving Average", placeholder)
                                     st.session_state.ma_interpretation = interpretation
                                 except Exception as e:
                                     st.error(f"Error generating interpretation: {str(e)}")
@@ -2123,9 +2026,10 @@ elif page == "🔮 AI-Enhanced Forecasting":
                     
                     with col2:
                         if st.button("Interpret Exponential Smoothing Forecast", key="interpret_es"):
+                            placeholder = ai_output_area("interpret_es")
                             with st.spinner("AI is analyzing the forecast..."):
                                 try:
-                                    interpretation = interpret_forecast(fdata['ts_data'][fdata['value_col']], fdata['es_forecast'], "Exponential Smoothing")
+                                    interpretation = interpret_forecast(fdata['ts_data'][fdata['value_col']], fdata['es_forecast'], "Exponential Smoothing", placeholder)
                                     st.session_state.es_interpretation = interpretation
                                 except Exception as e:
                                     st.error(f"Error generating interpretation: {str(e)}")
@@ -2135,6 +2039,22 @@ elif page == "🔮 AI-Enhanced Forecasting":
                             st.markdown("<div class='ai-response'>", unsafe_allow_html=True)
                             st.markdown(st.session_state.es_interpretation)
                             st.markdown("</div>", unsafe_allow_html=True)
+                    
+                    with col3:
+                        if fdata.get('hw_forecast') and st.button("Interpret Holt-Winters Forecast", key="interpret_hw"):
+                            placeholder = ai_output_area("interpret_hw")
+                            with st.spinner("AI is analyzing the forecast..."):
+                                try:
+                                    interpretation = interpret_forecast(fdata['ts_data'][fdata['value_col']], fdata['hw_forecast'], fdata['hw_result'].method, placeholder)
+                                    st.session_state.hw_interpretation = interpretation
+                                except Exception as e:
+                                    st.error(f"Error generating interpretation: {str(e)}")
+                        
+                        # Display interpretation if it exists
+                        if 'hw_interpretation' in st.session_state:
+                            st.markdown("<div class='ai-response'>", unsafe_allow_html=True)
+                            st.markdown(st.session_state.hw_interpretation)
+                            st.markdown("</div>", unsafe_allow_html=True)
                 
                 # Display forecast table
                 st.subheader("Forecast Data")
@@ -2149,7 +2069,66 @@ elif page == "🔮 AI-Enhanced Forecasting":
                         del st.session_state.ma_interpretation
                     if 'es_interpretation' in st.session_state:
                         del st.session_state.es_interpretation
+                    if 'hw_interpretation' in st.session_state:
+                        del st.session_state.hw_interpretation
                     st.rerun()
+            
+            # Batch forecasting: one series per category value, all fitted together
+            st.markdown("---")
+            with st.expander("📦 Batch Forecast by Category", expanded='batch_forecast' in st.session_state):
+                group_cols = [col for col in text_columns(df)
+                              if col not in date_cols and 2 <= df[col].nunique() <= 1000]
+                if not group_cols:
+                    st.info("No categorical column with 2 to 1,000 distinct values to forecast by.")
+                else:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        group_col = st.selectbox("Forecast each value of", group_cols, key="batch_group_col")
+                    with col2:
+                        batch_method = st.selectbox("Method", BATCH_METHODS, key="batch_method",
+                                                    help="Uses the periods, window, α and seasonality chosen above")
+                    
+                    if st.button("Generate Batch Forecast", key="batch_forecast_btn"):
+                        with st.spinner(f"Forecasting every {group_col}..."):
+                            try:
+                                dates, _ = parse_dates(df, date_col, cache=get_timeseries_cache())
+                                wide = series_matrix(df, date_col, value_col, group_col, freq, agg, dates=dates)
+                                st.session_state.batch_forecast = forecast_batch(
+                                    wide, batch_method, periods=forecast_periods,
+                                    season_length=season_length,
+                                    window=ma_window, alpha='auto' if fit_es_alpha else es_alpha, group_col=group_col
+                                )
+                            except ValueError as e:
+                                st.error(f"Batch forecast failed: {str(e)}")
+                    
+                    if 'batch_forecast' in st.session_state:
+                        batch = st.session_state.batch_forecast
+                        long_df = batch.long_table()
+                        
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.metric("Series", f"{batch.series_count:,}")
+                        with col2:
+                            st.metric("Total Time", f"{batch.elapsed:.2f}s")
+                        with col3:
+                            st.metric("Median MAPE", f"{np.nanmedian(batch.metrics['mape']):.2f}%")
+                        st.caption(f"{batch.method} · {batch.mode}")
+                        
+                        shown = st.multiselect("Series to plot", batch.names, default=batch.names[:5], key="batch_plot_series")
+                        if shown:
+                            plotted = long_df[long_df[batch.group_col].isin(shown)]
+                            fig = px.line(plotted, x='Date', y='Forecast',
+                                          color=batch.group_col, title=f"{batch.method} Forecast by {batch.group_col}",
+                                          render_mode='webgl' if use_webgl(len(plotted)) else 'svg')
+                            st.plotly_chart(fig, use_container_width=True)
+                        
+                        tab1, tab2 = st.tabs(["Forecast Table", "Per-Series Timing"])
+                        with tab1:
+                            st.dataframe(long_df, use_container_width=True, height=300)
+                            st.download_button("📥 Download Batch Forecast (CSV)", long_df.to_csv(index=False),
+                                               "batch_forecast.csv", "text/csv", key="batch_download")
+                        with tab2:
+                            st.dataframe(batch.timings(), use_container_width=True, height=300)
                 
         else:
             st.info("Please ensure your dataset has both date and numeric columns for forecasting.")
@@ -2183,15 +2162,14 @@ elif page == "📊 Statistical Analysis":
                     st.dataframe(stats_df, use_container_width=True)
                     
                     for col in selected_cols:
-                        fig = px.histogram(df, x=col, marginal="box",
-                                         title=f"Distribution of {col}",
-                                         color_discrete_sequence=['#636EFA'])
+                        fig = histogram_with_box_figure(df[col], f"Distribution of {col}",
+                                                        color='#636EFA', x_label=col)
                         st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No numeric columns found for statistical analysis.")
         
         elif analysis_type == "Trend Analysis":
-            date_cols = [col for col in df.columns if 'date' in col.lower() or df[col].dtype == 'datetime64[ns]']
+            date_cols = date_columns(df)
             numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
             
             if date_cols and numeric_cols:
@@ -2200,28 +2178,34 @@ elif page == "📊 Statistical Analysis":
                     date_col = st.selectbox("Select Date Column", date_cols)
                 with col2:
                     value_col = st.selectbox("Select Value Column", numeric_cols)
+                freq, agg, fill = time_series_controls("trend", allow_raw=True)
                 
-                df[date_col] = pd.to_datetime(df[date_col])
-                df_sorted = df.sort_values(date_col)
+                prepared = prepare_series(df, date_col, value_col, freq, agg, fill, cache=get_timeseries_cache())
+                df_sorted = prepared.data.copy()
                 
                 df_sorted['Rolling_Mean'] = df_sorted[value_col].rolling(window=7).mean()
                 df_sorted['Rolling_Std'] = df_sorted[value_col].rolling(window=7).std()
+                budget, mode, render_mode, x_range = chart_resolution_controls("trend_chart", prepared.dates)
+                plot_df, points = downsample(df_sorted, date_col, value_col, budget, mode, x_range)
+                webgl = use_webgl(2 * len(plot_df), render_mode)
                 
                 fig = go.Figure()
                 
-                fig.add_trace(go.Scatter(
-                    x=df_sorted[date_col],
-                    y=df_sorted[value_col],
+                fig.add_trace(line_trace(
+                    webgl,
+                    x=plot_df[date_col],
+                    y=plot_df[value_col],
                     mode='lines',
                     name='Original',
                     line=dict(color='lightblue')
                 ))
                 
-                fig.add_trace(go.Scatter(
-                    x=df_sorted[date_col],
-                    y=df_sorted['Rolling_Mean'],
+                fig.add_trace(line_trace(
+                    webgl,
+                    x=plot_df[date_col],
+                    y=plot_df['Rolling_Mean'],
                     mode='lines',
-                    name='7-Day Moving Average',
+                    name='7-Period Moving Average',
                     line=dict(color='red', width=2)
                 ))
                 
@@ -2233,6 +2217,7 @@ elif page == "📊 Statistical Analysis":
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
+                st.caption(f"{series_caption(prepared)} · {resolution_caption(len(plot_df), points, mode, webgl)}")
                 
                 recent_avg = df_sorted[value_col].tail(30).mean()
                 overall_avg = df_sorted[value_col].mean()
@@ -2242,7 +2227,7 @@ elif page == "📊 Statistical Analysis":
                 with col1:
                     st.metric("Overall Average", f"{overall_avg:,.2f}")
                 with col2:
-                    st.metric("Recent Average (30 days)", f"{recent_avg:,.2f}")
+                    st.metric("Recent Average (30 periods)", f"{recent_avg:,.2f}")
                 with col3:
                     st.metric("Trend", f"{trend:+.2f}%", delta=f"{trend:.2f}%")
             else:
@@ -2273,8 +2258,7 @@ elif page == "📊 Statistical Analysis":
                 with col4:
                     st.metric("Outlier %", f"{len(outliers)/len(df)*100:.2f}%")
                 
-                fig = px.box(df, y=selected_col, title=f"Box Plot with Outliers: {selected_col}",
-                           points="outliers")
+                fig = box_figure(df[selected_col], f"Box Plot with Outliers: {selected_col}", name=selected_col)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 if len(outliers) > 0:
@@ -2323,25 +2307,28 @@ elif page == "📄 AI Report Generator":
             include_charts = st.checkbox("Include Key Metrics", value=True)
         
         with col3:
-            if st.button("🤖 Generate AI Report", type="primary"):
-                try:
-                    # Clear all sections first
-                    st.session_state.show_initial_report = False
-                    st.session_state.show_full_report_section = False
+            generate_report = st.button("🤖 Generate AI Report", type="primary")
+        
+        if generate_report:
+            try:
+                # Clear all sections first
+                st.session_state.show_initial_report = False
+                st.session_state.show_full_report_section = False
+                
+                placeholder = ai_output_area("report")
+                with st.spinner("AI is generating your comprehensive report... This may take a minute."):
+                    report = generate_automated_report(df, report_type, placeholder)
+                    st.session_state.generated_report = report
+                    st.session_state.report_type = report_type
+                    st.session_state.current_report_type = report_type
+                    st.session_state.show_metrics = include_charts
+                    st.session_state.show_initial_report = True  # Show initial report section
                     
-                    with st.spinner("AI is generating your comprehensive report... This may take a minute."):
-                        report = generate_automated_report(df, report_type)
-                        st.session_state.generated_report = report
-                        st.session_state.report_type = report_type
-                        st.session_state.current_report_type = report_type
-                        st.session_state.show_metrics = include_charts
-                        st.session_state.show_initial_report = True  # Show initial report section
-                        
-                        st.rerun()
-                except Exception as e:
-                    handle_error(e)
-                    st.session_state.show_initial_report = False
-                    st.session_state.show_full_report_section = False
+                    st.rerun()
+            except Exception as e:
+                handle_error(e)
+                st.session_state.show_initial_report = False
+                st.session_state.show_full_report_section = False
         
         # Initialize session state variables if not exist
         if 'show_initial_report' not in st.session_state:
@@ -2393,18 +2380,22 @@ Generated: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')}
                 # Hide initial report section and show full report section
                 st.session_state.show_initial_report = False
                 st.session_state.show_full_report_section = True
+                st.session_state.full_report = None
                 st.rerun()
         
         # Section 2: Full Report Display (only shown after clicking "Generate Full Report")
         if st.session_state.get('show_full_report_section', False):
             try:
-                with st.spinner("Generating comprehensive report..."):
-                    # Generate the full report with metadata
-                    full_report_text = generate_automated_report(df, "comprehensive")
-                    utc_time = datetime.now(timezone.utc)
-                    
-                    # Create the full report
-                    full_report = f"""
+                # Generate the full report once; reruns (e.g. the download button) reuse it
+                if st.session_state.get('full_report') is None:
+                    with st.spinner("Generating comprehensive report..."):
+                        full_report_text = generate_automated_report(df, "comprehensive", st.empty())
+                        st.session_state.full_report = (full_report_text, datetime.now(timezone.utc))
+                full_report_text, utc_time = st.session_state.full_report
+                data_summary = ai_dataset_summary(df)
+                
+                # Create the full report
+                full_report = f"""
 COMPREHENSIVE AI BUSINESS INTELLIGENCE REPORT
 Generated: {utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')}
 ========================================================
@@ -2414,80 +2405,81 @@ Generated: {utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')}
 ========================================================
 DATASET STATISTICS
 ========================================================
-Total Records: {len(df)}
-Total Columns: {len(df.columns)}
-Numeric Columns: {', '.join(df.select_dtypes(include=[np.number]).columns)}
-Date Range: {df.iloc[:, 0].min() if len(df) > 0 else 'N/A'} to {df.iloc[:, 0].max() if len(df) > 0 else 'N/A'}
+Total Records: {data_summary.rows}
+Total Columns: {len(data_summary.columns)}
+Numeric Columns: {data_summary.numeric_list(all_columns=True)}
+Date Range: {data_summary.first_min if data_summary.rows > 0 else 'N/A'} to {data_summary.first_max if data_summary.rows > 0 else 'N/A'}
 
 Generated by AI-Powered BI Dashboard
 """
-                    st.markdown("---")
-                    st.markdown("### 📄 Comprehensive Report Ready")
-                    
-                    # Download button for full report
-                    st.download_button(
-                        label="📥 Download Full Report (TXT)",
-                        data=full_report,
-                        file_name=f"full_ai_report_{utc_time.strftime('%Y%m%d_%H%M%S')}_UTC.txt",
-                        mime="text/plain",
-                        key="download_full_report_button"
-                    )
-                    
-                    # Display timestamp
-                    st.markdown("---")
-                    st.markdown("### 📅 Report Timestamp")
-                    
-                    utc_iso = utc_time.isoformat()
-                    
-                    html_code = f"""
-                    <div style="padding: 12px; background-color: #e8f4f8; border-left: 4px solid #0066cc; border-radius: 4px; margin: 10px 0;">
-                        <strong>Generated (Your Local Time):</strong> <span id="localTimestamp" style="font-family: monospace;">Loading...</span><br>
-                        <strong>Your Timezone:</strong> <span id="userTimezone" style="font-family: monospace; color: #666;">Detecting...</span>
-                    </div>
-                    <script>
-                        (function() {{
-                            try {{
-                                const utcTime = new Date("{utc_iso}");
-                                const userTimezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
-                                const localTimeString = utcTime.toLocaleString('en-US', {{
-                                    year: 'numeric',
-                                    month: '2-digit',
-                                    day: '2-digit',
-                                    hour: '2-digit',
-                                    minute: '2-digit',
-                                    second: '2-digit',
-                                    hour12: true
-                                }});
-                                
-                                const timestampElement = document.getElementById('localTimestamp');
-                                const timezoneElement = document.getElementById('userTimezone');
-                                
-                                if (timestampElement) {{
-                                    timestampElement.textContent = localTimeString;
-                                }}
-                                if (timezoneElement) {{
-                                    timezoneElement.textContent = userTimezone;
-                                }}
-                            }} catch (error) {{
-                                console.error('Error formatting timestamp:', error);
-                                const timestampElement = document.getElementById('localTimestamp');
-                                if (timestampElement) {{
-                                    timestampElement.textContent = 'Error loading time';
-                                }}
+                st.markdown("---")
+                st.markdown("### 📄 Comprehensive Report Ready")
+                
+                # Download button for full report
+                st.download_button(
+                    label="📥 Download Full Report (TXT)",
+                    data=full_report,
+                    file_name=f"full_ai_report_{utc_time.strftime('%Y%m%d_%H%M%S')}_UTC.txt",
+                    mime="text/plain",
+                    key="download_full_report_button"
+                )
+                
+                # Display timestamp
+                st.markdown("---")
+                st.markdown("### 📅 Report Timestamp")
+                
+                utc_iso = utc_time.isoformat()
+                
+                html_code = f"""
+                <div style="padding: 12px; background-color: #e8f4f8; border-left: 4px solid #0066cc; border-radius: 4px; margin: 10px 0;">
+                    <strong>Generated (Your Local Time):</strong> <span id="localTimestamp" style="font-family: monospace;">Loading...</span><br>
+                    <strong>Your Timezone:</strong> <span id="userTimezone" style="font-family: monospace; color: #666;">Detecting...</span>
+                </div>
+                <script>
+                    (function() {{
+                        try {{
+                            const utcTime = new Date("{utc_iso}");
+                            const userTimezone = Intl.DateTimeFormat().resolvedOptions().timeZone;
+                            const localTimeString = utcTime.toLocaleString('en-US', {{
+                                year: 'numeric',
+                                month: '2-digit',
+                                day: '2-digit',
+                                hour: '2-digit',
+                                minute: '2-digit',
+                                second: '2-digit',
+                                hour12: true
+                            }});
+                            
+                            const timestampElement = document.getElementById('localTimestamp');
+                            const timezoneElement = document.getElementById('userTimezone');
+                            
+                            if (timestampElement) {{
+                                timestampElement.textContent = localTimeString;
                             }}
-                        }})();
-                    </script>
-                    """
-                    
-                    html(html_code, height=80)
-                    
-                    utc_time_str = utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')
-                    st.caption(f"🌍 UTC Time: {utc_time_str}")
-                    
+                            if (timezoneElement) {{
+                                timezoneElement.textContent = userTimezone;
+                            }}
+                        }} catch (error) {{
+                            console.error('Error formatting timestamp:', error);
+                            const timestampElement = document.getElementById('localTimestamp');
+                            if (timestampElement) {{
+                                timestampElement.textContent = 'Error loading time';
+                            }}
+                        }}
+                    }})();
+                </script>
+                """
+                
+                html(html_code, height=80)
+                
+                utc_time_str = utc_time.strftime('%Y-%m-%d %H:%M:%S UTC')
+                st.caption(f"🌍 UTC Time: {utc_time_str}")
+                
             except Exception as e:
                 handle_error(e)
                 st.warning("⚠️ Failed to generate report. Please try again.")
                 st.session_state.show_full_report_section = False
+                st.session_state.full_report = None
 
 elif page == "📥 Export":
     st.header("📥 Export Data & Reports")
@@ -2550,30 +2542,50 @@ elif page == "🧹 SQL Cleaner":
     
     # Upload section
     st.markdown("### 📁 Upload CSV File")
-    uploaded_file_cleaner = st.file_uploader("Choose a CSV file to clean", type=['csv'], key="cleaner_upload")
+    uploaded_file_cleaner = st.file_uploader("Choose a CSV or Parquet file to clean", type=['csv', 'parquet'], key="cleaner_upload")
     
     if uploaded_file_cleaner is not None:
         try:
-            # Load the data
-            df_cleaner = pd.read_csv(uploaded_file_cleaner)
-            st.session_state.original_df = df_cleaner
-            
-            # Register with DuckDB
-            st.session_state.con.register('uploaded_data', df_cleaner)
+            # Load straight into the DuckDB table 'uploaded_data' (only when the file changed)
+            upload = ensure_duckdb_upload(
+                st.session_state.con,
+                uploaded_file_cleaner,
+                current=st.session_state.get('cleaner_upload'),
+                cache=get_ingestion_cache(),
+                spool_dir=duckdb_manager.files_dir(st.session_state.session_id)
+            )
+            previous_upload = st.session_state.get('cleaner_upload')
+            if previous_upload is not None and previous_upload.fingerprint != upload.fingerprint:
+                # Results computed from the replaced file can never be hit again
+                get_query_cache().invalidate(previous_upload.data_key)
+                st.session_state.cleaned_result = None
+            st.session_state.cleaner_upload = upload
+            overview = upload.overview()
             
             # Show success message
-            st.success(f"✅ Successfully loaded {len(df_cleaner):,} rows and {len(df_cleaner.columns)} columns")
+            st.success(f"✅ Successfully loaded {overview['rows']:,} rows and {overview['columns']} columns")
             
             # Show metrics
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Total Rows", f"{len(df_cleaner):,}")
+                st.metric("Total Rows", f"{overview['rows']:,}")
             with col2:
-                st.metric("Total Columns", len(df_cleaner.columns))
+                st.metric("Total Columns", overview['columns'])
             with col3:
-                st.metric("Missing Values", f"{df_cleaner.isnull().sum().sum():,}")
+                st.metric("Missing Values", f"{overview['missing']:,}")
             with col4:
-                st.metric("Duplicates", f"{df_cleaner.duplicated().sum():,}")
+                st.metric("Duplicates", f"{overview['duplicates']:,}")
+            
+            # Templates only need the column names and dtypes; statistics are computed in DuckDB
+            cleaner_schema = upload.schema_frame()
+            cleaner_profile = profile_table(
+                st.session_state.con,
+                upload.table_name,
+                cleaner_schema,
+                approximate=overview['rows'] > APPROX_PROFILE_ROWS,
+                cache=get_profile_cache(),
+                fingerprint=upload.data_key
+            )
             
             st.markdown("---")
             
@@ -2617,13 +2629,13 @@ elif page == "🧹 SQL Cleaner":
                         with col1:
                             dup_cols = st.multiselect(
                                 "Select columns to check for duplicates:",
-                                df_cleaner.columns.tolist(),
+                                cleaner_schema.columns.tolist(),
                                 help="Choose which columns define a duplicate"
                             )
                         with col2:
                             order_col = st.selectbox(
                                 "Order by column:",
-                                df_cleaner.columns.tolist(),
+                                cleaner_schema.columns.tolist(),
                                 help="Choose which row to keep when duplicates found"
                             )
                         
@@ -2634,7 +2646,7 @@ elif page == "🧹 SQL Cleaner":
                     elif 'Null Rows (Specific' in template_name:
                         null_cols = st.multiselect(
                             "Select columns to check for nulls:",
-                            df_cleaner.columns.tolist(),
+                            cleaner_schema.columns.tolist(),
                             help="Rows with NULL in these columns will be removed"
                         )
                         if null_cols:
@@ -2642,7 +2654,7 @@ elif page == "🧹 SQL Cleaner":
                             sql_query = sql_query.replace('{columns_not_null}', ' AND '.join(null_checks))
                     
                     elif 'Outliers' in template_name:
-                        numeric_cols = df_cleaner.select_dtypes(include=[np.number]).columns.tolist()
+                        numeric_cols = cleaner_schema.select_dtypes(include=[np.number]).columns.tolist()
                         if numeric_cols:
                             outlier_col = st.selectbox(
                                 "Select numeric column for outlier detection:",
@@ -2654,7 +2666,7 @@ elif page == "🧹 SQL Cleaner":
                             st.warning("No numeric columns found for outlier detection")
                     
                     elif 'Email Validation' in template_name:
-                        text_cols = df_cleaner.select_dtypes(include=['object']).columns.tolist()
+                        text_cols = cleaner_schema.select_dtypes(include=['object']).columns.tolist()
                         if text_cols:
                             email_col = st.selectbox(
                                 "Select email column:",
@@ -2664,7 +2676,7 @@ elif page == "🧹 SQL Cleaner":
                             sql_query = sql_query.replace('{email_column}', email_col)
                     
                     elif 'Phone Number' in template_name:
-                        text_cols = df_cleaner.select_dtypes(include=['object']).columns.tolist()
+                        text_cols = cleaner_schema.select_dtypes(include=['object']).columns.tolist()
                         if text_cols:
                             phone_col = st.selectbox(
                                 "Select phone number column:",
@@ -2674,7 +2686,7 @@ elif page == "🧹 SQL Cleaner":
                             sql_query = sql_query.replace('{phone_column}', phone_col)
                 
                 elif template.get('dynamic'):
-                    sql_query = generate_dynamic_sql(template_name, df_cleaner)
+                    sql_query = generate_dynamic_sql(template_name, cleaner_schema)
                 
                 # SQL Editor
                 st.markdown("#### ✏️ SQL Query Editor")
@@ -2702,8 +2714,14 @@ elif page == "🧹 SQL Cleaner":
                     try:
                         with st.spinner("Executing query..."):
                             # Execute the SQL query
-                            result = st.session_state.con.execute(sql_query).fetchdf()
-                            st.session_state.cleaned_df = result
+                            # Refuse SQL that reaches outside this session's own database and files
+                            check_session_sql(st.session_state.con, sql_query, st.session_state.session_id)
+                            result = execute_query(st.session_state.con, sql_query, upload.data_key, get_query_cache())
+                            st.session_state.cleaned_result = result
+                            if result.modified_data:
+                                # uploaded_data may have changed: results cached for its old contents no longer apply
+                                get_query_cache().invalidate(upload.data_key)
+                                upload.mark_modified()
                             
                             # Add to query history
                             if sql_query not in st.session_state.query_history:
@@ -2711,6 +2729,11 @@ elif page == "🧹 SQL Cleaner":
                             
                             # Show success message
                             st.success(f"✅ Query executed successfully!")
+                            if result.from_cache:
+                                st.caption(f"⚡ Cache hit: served in {result.lookup_seconds * 1000:.1f} ms "
+                                           f"(the query took {result.elapsed * 1000:.0f} ms when it ran)")
+                            else:
+                                st.caption(f"⏱️ Cache miss: query ran in {result.elapsed * 1000:.0f} ms")
                             
                             # Show before/after metrics
                             st.markdown("#### 📊 Cleaning Results")
@@ -2720,21 +2743,21 @@ elif page == "🧹 SQL Cleaner":
                             with col1:
                                 st.metric(
                                     "Original Rows",
-                                    f"{len(df_cleaner):,}",
+                                    f"{overview['rows']:,}",
                                     help="Number of rows before cleaning"
                                 )
                             
                             with col2:
-                                rows_change = len(result) - len(df_cleaner)
+                                rows_change = result.num_rows - overview['rows']
                                 st.metric(
                                     "Cleaned Rows",
-                                    f"{len(result):,}",
+                                    f"{result.num_rows:,}",
                                     delta=f"{rows_change:,}",
                                     help="Number of rows after cleaning"
                                 )
                             
                             with col3:
-                                pct_change = (rows_change / len(df_cleaner) * 100) if len(df_cleaner) > 0 else 0
+                                pct_change = (rows_change / overview['rows'] * 100) if overview['rows'] > 0 else 0
                                 st.metric(
                                     "Change %",
                                     f"{pct_change:.1f}%",
@@ -2742,7 +2765,7 @@ elif page == "🧹 SQL Cleaner":
                                 )
                             
                             with col4:
-                                nulls_removed = df_cleaner.isnull().sum().sum() - result.isnull().sum().sum()
+                                nulls_removed = overview['missing'] - result.null_count
                                 st.metric(
                                     "Nulls Removed",
                                     f"{nulls_removed:,}",
@@ -2750,10 +2773,6 @@ elif page == "🧹 SQL Cleaner":
                                     help="Number of NULL values removed"
                                 )
                             
-                            # Display cleaned data
-                            st.markdown("#### 🎯 Cleaned Data Preview")
-                            st.dataframe(result, use_container_width=True, height=400)
-                            
                             # Download section
                             st.markdown("---")
                             st.markdown("#### 💾 Download Cleaned Data")
@@ -2761,7 +2780,7 @@ elif page == "🧹 SQL Cleaner":
                             col1, col2, col3, col4 = st.columns(4)
                             
                             with col1:
-                                csv_data = result.to_csv(index=False)
+                                csv_data = result.to_csv()
                                 st.download_button(
                                     label="📥 CSV",
                                     data=csv_data,
@@ -2774,8 +2793,8 @@ elif page == "🧹 SQL Cleaner":
                             with col2:
                                 buffer = BytesIO()
                                 with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                                    result.to_excel(writer, index=False, sheet_name='Cleaned Data')
-                                    df_cleaner.to_excel(writer, index=False, sheet_name='Original Data')
+                                    result.to_pandas().to_excel(writer, index=False, sheet_name='Cleaned Data')
+                                    upload.to_pandas(keep=False).to_excel(writer, index=False, sheet_name='Original Data')
                                 
                                 st.download_button(
                                     label="📥 Excel",
@@ -2797,7 +2816,7 @@ elif page == "🧹 SQL Cleaner":
                                 )
                             
                             with col4:
-                                json_data = result.to_json(orient='records', indent=2)
+                                json_data = result.to_json()
                                 st.download_button(
                                     label="📥 JSON",
                                     data=json_data,
@@ -2817,31 +2836,36 @@ elif page == "🧹 SQL Cleaner":
                         
                         with st.expander("📋 Show Full Error Details"):
                             st.code(traceback.format_exc())
+                
+                # Browse the latest result page by page (survives reruns triggered by the pager)
+                if st.session_state.cleaned_result is not None:
+                    st.markdown("#### 🎯 Cleaned Data Preview")
+                    render_paginated_table(
+                        st.session_state.con,
+                        arrow_table=st.session_state.cleaned_result.table,
+                        key="cleaned_rows"
+                    )
             
             with tab2:
-                # Visualizations
-                if st.session_state.cleaned_df is not None:
-                    create_visualizations(st.session_state.original_df, st.session_state.cleaned_df)
+                # Visualizations (the only view that needs the upload as a DataFrame, so it is opt-in)
+                if st.toggle("Load data for charts", key="cleaner_charts",
+                             help=f"Copies the {overview['rows']:,} uploaded rows from DuckDB into pandas"):
+                    if st.session_state.cleaned_result is not None:
+                        create_visualizations(upload.to_pandas(), st.session_state.cleaned_result.to_pandas())
+                    else:
+                        create_visualizations(upload.to_pandas())
                 else:
-                    create_visualizations(st.session_state.original_df)
+                    upload.release_pandas()
             
             with tab3:
                 # Data preview
                 st.subheader("Original Data")
-                st.dataframe(df_cleaner, use_container_width=True, height=400)
+                render_paginated_table(st.session_state.con, 'uploaded_data', key="original_rows")
                 
                 st.markdown("---")
                 st.subheader("Column Information")
                 
-                col_info = pd.DataFrame({
-                    'Column': df_cleaner.columns,
-                    'Data Type': df_cleaner.dtypes.astype(str),
-                    'Non-Null Count': df_cleaner.count().values,
-                    'Null Count': df_cleaner.isnull().sum().values,
-                    'Null %': (df_cleaner.isnull().sum() / len(df_cleaner) * 100).round(2).values,
-                    'Unique Values': [df_cleaner[col].nunique() for col in df_cleaner.columns],
-                    'Sample Values': [str(df_cleaner[col].dropna().head(3).tolist()) for col in df_cleaner.columns]
-                })
+                col_info = cleaner_profile.column_info()
                 
                 st.dataframe(col_info, use_container_width=True, hide_index=True)
             
@@ -2849,6 +2873,7 @@ elif page == "🧹 SQL Cleaner":
                 # Statistics
                 st.subheader("📊 Data Profile")
                 
+                kinds = cleaner_profile.kind_counts()
                 profile_data = {
                     'Metric': [
                         'Total Records',
@@ -2864,17 +2889,17 @@ elif page == "🧹 SQL Cleaner":
                         'Memory Usage'
                     ],
                     'Value': [
-                        f"{len(df_cleaner):,}",
-                        len(df_cleaner.columns),
-                        len(df_cleaner.select_dtypes(include=[np.number]).columns),
-                        len(df_cleaner.select_dtypes(include=['object']).columns),
-                        len(df_cleaner.select_dtypes(include=['bool']).columns),
-                        len(df_cleaner.select_dtypes(include=['datetime64']).columns),
-                        f"{df_cleaner.isnull().sum().sum():,}",
-                        f"{(df_cleaner.isnull().sum().sum() / (len(df_cleaner) * len(df_cleaner.columns)) * 100):.2f}%",
-                        f"{df_cleaner.duplicated().sum():,}",
-                        f"{(df_cleaner.duplicated().sum() / len(df_cleaner) * 100):.2f}%",
-                        f"{df_cleaner.memory_usage(deep=True).sum() / 1024**2:.2f} MB"
+                        f"{cleaner_profile.rows:,}",
+                        len(cleaner_profile.columns),
+                        kinds['numeric'],
+                        kinds['categorical'],
+                        kinds['boolean'],
+                        kinds['datetime'],
+                        f"{cleaner_profile.missing_cells:,}",
+                        f"{(cleaner_profile.missing_cells / (cleaner_profile.rows * len(cleaner_profile.columns)) * 100):.2f}%",
+                        f"{cleaner_profile.duplicates:,}",
+                        f"{(cleaner_profile.duplicates / cleaner_profile.rows * 100):.2f}%",
+                        f"{cleaner_profile.memory_mb:.2f} MB"
                     ]
                 }
                 
@@ -2883,7 +2908,7 @@ elif page == "🧹 SQL Cleaner":
                 # Numeric statistics
                 st.markdown("---")
                 st.subheader("📈 Numeric Column Statistics")
-                numeric_stats = df_cleaner.describe()
+                numeric_stats = cleaner_profile.describe()
                 if not numeric_stats.empty:
                     st.dataframe(numeric_stats, use_container_width=True)
                 else:
@@ -0,0 +1,195 @@
+"""Rolling-origin backtests of the forecasting methods.
+
+Each method is evaluated at every cutoff c in a range: it forecasts the next
+`horizon` points from values[:c] and the errors against values[c:c+horizon]
+are pooled into MAE, MAPE and RMSE. Nothing is refitted per cutoff: the
+smoothing state after every point comes from one pass over the series, the
+forecasts for all cutoffs are gathered from it with array indexing, and the
+actual windows are a sliding_window_view of the series. Parameters that are
+fitted (alpha='auto', Holt-Winters) are chosen on the data before the first
+cutoff only, so no cutoff sees its own future.
+
+Results are cached per (series fingerprint, method, parameters), so moving a
+slider back to a value already evaluated costs a dictionary lookup.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from forecasting import (
+    accuracy,
+    exponential_smoothing_levels,
+    fit_alpha,
+    fit_holt_winters_matrix,
+    holt_winters_pass,
+)
+
+# Number of backtest results kept (each holds a cutoffs x horizon error matrix)
+BACKTEST_CACHE_ENTRIES = int(os.getenv('BACKTEST_CACHE_ENTRIES', '64'))
+
+BACKTEST_METHODS = ['Moving Average', 'Exponential Smoothing', 'Holt-Winters']
+
+
+def series_fingerprint(values):
+    """Content hash of a numeric series"""
+    values = np.ascontiguousarray(values, dtype='float64')
+    return hashlib.blake2b(values.tobytes(), digest_size=16).hexdigest()
+
+
+class BacktestResult:
+    """Forecasts and errors of one method at every rolling cutoff"""
+
+    def __init__(self, method, params, horizon, cutoffs, actual, forecasts, elapsed, from_cache=False):
+        self.method = method
+        self.params = params
+        self.horizon = horizon
+        self.cutoffs = cutoffs
+        self.actual = actual
+        self.forecasts = forecasts
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+        self.metrics = accuracy(actual.ravel(), forecasts.ravel())
+
+    @property
+    def mae(self):
+        return self.metrics['mae']
+
+    @property
+    def mape(self):
+        return self.metrics['mape']
+
+    @property
+    def rmse(self):
+        return self.metrics['rmse']
+
+    def horizon_metrics(self):
+        """MAE, MAPE and RMSE for each step ahead (1..horizon)"""
+        by_step = accuracy(self.actual.T, self.forecasts.T)
+        return pd.DataFrame({
+            'Step': np.arange(1, self.horizon + 1),
+            'MAE': by_step['mae'],
+            'MAPE (%)': by_step['mape'],
+            'RMSE': by_step['rmse']
+        })
+
+
+class BacktestCache:
+    """LRU cache of BacktestResults keyed by (series fingerprint, method, parameters)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _moving_average_forecasts(values, cutoffs, horizon, window):
+    """Mean of the window before each cutoff, held flat"""
+    means = sliding_window_view(values, window).mean(axis=1)  # means[i] covers values[i:i + window]
+    return np.repeat(means[cutoffs - window, None], horizon, axis=1), {'window': window}
+
+
+def _exponential_smoothing_forecasts(values, cutoffs, horizon, alpha):
+    """Smoothed level at each cutoff, held flat"""
+    if alpha == 'auto':
+        alpha, _ = fit_alpha(values[:cutoffs[0]])
+    levels = exponential_smoothing_levels(values, alpha)
+    return np.repeat(levels[cutoffs - 1, None], horizon, axis=1), {'alpha': alpha}
+
+
+def _holt_winters_forecasts(values, cutoffs, horizon, season_length):
+    """Level + k * trend (+ latest seasonal value for that position) from the state at each cutoff"""
+    _, params, _ = fit_holt_winters_matrix(values[None, :cutoffs[0]], 1, season_length)
+    alpha, beta = params['alpha'][:, None], params['beta'][:, None]
+    gamma = params['gamma'][:, None] if season_length else np.zeros((1, 1))
+    history = holt_winters_pass(values[None, :], alpha, beta, gamma, season_length, keep_history=True)[1]
+    level, trend, season = (history[name][0, 0] for name in ('level', 'trend', 'season'))
+
+    steps = np.arange(1, horizon + 1)
+    forecasts = level[cutoffs - 1, None] + steps * trend[cutoffs - 1, None]
+    if season_length:
+        # Most recent time before the cutoff in the same seasonal position as cutoff + step - 1
+        latest = cutoffs[:, None] + steps - 1 - season_length * np.ceil(steps / season_length).astype(int)
+        forecasts += season[latest]
+    params = {name: float(value[0]) for name, value in params.items()}
+    if season_length:
+        params['season_length'] = season_length
+    return forecasts, params
+
+
+def backtest(series, method, horizon=7, step=1, min_train=None, cache=None, window=7, alpha=0.3,
+             season_length=None):
+    """Rolling-origin backtest of method over series
+
+    Cutoffs run from min_train (default: a third of the series) to
+    len(series) - horizon every `step` points.
+    Only the parameters the method uses are part of the cache key. Raises
+    ValueError when the series is too short for a single cutoff.
+    """
+    start = time.perf_counter()
+    values = np.asarray(series, dtype='float64')
+    if np.isnan(values).any():
+        raise ValueError("Backtesting needs a series without missing values")
+
+    if method == 'Moving Average':
+        params = {'window': window}
+        required = window
+    elif method == 'Exponential Smoothing':
+        params = {'alpha': alpha}
+        required = 2
+    elif method == 'Holt-Winters':
+        params = {'season_length': season_length}
+        required = 2 * season_length if season_length else 3
+    else:
+        raise ValueError(f"Unknown backtest method: {method}")
+    min_train = max(required, len(values) // 3 if min_train is None else min_train)
+
+    key = None
+    if cache is not None:
+        key = (series_fingerprint(values), method, tuple(sorted(params.items())), horizon, step, min_train)
+        cached = cache.get(key)
+        if cached is not None:
+            return BacktestResult(cached.method, cached.params, cached.horizon, cached.cutoffs, cached.actual,
+                                  cached.forecasts, time.perf_counter() - start, from_cache=True)
+
+    cutoffs = np.arange(min_train, len(values) - horizon + 1, step)
+    if len(cutoffs) == 0:
+        raise ValueError(f"Backtesting {method} with a horizon of {horizon} needs at least "
+                         f"{min_train + horizon} points, got {len(values)}")
+
+    actual = sliding_window_view(values, horizon)[cutoffs]
+    if method == 'Moving Average':
+        forecasts, fitted_params = _moving_average_forecasts(values, cutoffs, horizon, window)
+    elif method == 'Exponential Smoothing':
+        forecasts, fitted_params = _exponential_smoothing_forecasts(values, cutoffs, horizon, alpha)
+    else:
+        forecasts, fitted_params = _holt_winters_forecasts(values, cutoffs, horizon, season_length)
+
+    result = BacktestResult(method, fitted_params, horizon, cutoffs, actual, forecasts, time.perf_counter() - start)
+    if key is not None:
+        cache.put(key, result)
+    return result
@@ -0,0 +1,68 @@
+"""Benchmark vectorized exponential smoothing and alpha fitting against the original loop.
+
+Usage:
+    python benchmarks/bench_forecasting.py --points 10000 100000 1000000 10000000
+    python benchmarks/bench_forecasting.py --points 10000000 --legacy-max 0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecasting  # noqa: E402
+
+
+def legacy_exponential_smoothing_forecast(series, alpha=0.3, periods=30):
+    """Exponential smoothing forecast as app.py computed it before forecasting.py"""
+    result = [series.iloc[0]]
+    for i in range(1, len(series)):
+        result.append(alpha * series.iloc[i] + (1 - alpha) * result[i-1])
+
+    last_value = result[-1]
+    forecast = [last_value] * periods
+    return forecast
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[10000, 100000, 1000000, 10000000])
+    parser.add_argument('--alpha', type=float, default=0.3)
+    parser.add_argument('--legacy-max', type=int, default=100000,
+                        help="Longest series timed with the Python loop (it takes minutes at 10M points)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    grid = len(forecasting.ALPHA_GRID)
+    print(f"{'points':>11} {'legacy s':>10} {'vectorized s':>13} {'speedup':>8} "
+          f"{'fit ' + str(grid) + ' alphas s':>17} {'fitted α':>9}")
+    for points in args.points:
+        series = pd.Series(100 + rng.normal(0, 1, points).cumsum())
+
+        fast, fast_secs = time_call(forecasting.fit_exponential_smoothing, series, args.alpha)
+        fast = fast.tolist()
+        (alpha, _), fit_secs = time_call(forecasting.fit_alpha, series)
+
+        if points > args.legacy_max:
+            print(f"{points:>11,} {'-':>10} {fast_secs:>13.4f} {'-':>8} {fit_secs:>17.4f} {alpha:>9.2f}")
+            continue
+
+        slow, slow_secs = time_call(legacy_exponential_smoothing_forecast, series, args.alpha)
+        assert np.allclose(fast, slow), "vectorized forecast differs from the loop"
+        print(f"{points:>11,} {slow_secs:>10.4f} {fast_secs:>13.4f} {slow_secs / fast_secs:>7.0f}x "
+              f"{fit_secs:>17.4f} {alpha:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
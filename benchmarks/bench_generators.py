@@ -0,0 +1,54 @@
+"""Benchmark the vectorized sample data generators against the original loops.
+
+Usage:
+    python benchmarks/bench_generators.py --rows 10000 100000 1000000
+    python benchmarks/bench_generators.py --rows 100000 --skip-legacy
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_generators  # noqa: E402
+import legacy_generators  # noqa: E402
+
+DATASETS = ['sales', 'healthcare', 'finance', 'industry_agnostic',
+            'manufacturing', 'operations', 'government']
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--datasets', nargs='+', default=DATASETS, choices=DATASETS)
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help="Only time the vectorized engine (the loops take minutes at 1M rows)")
+    args = parser.parse_args()
+
+    print(f"{'dataset':<18} {'rows':>10} {'legacy rows/s':>15} {'vectorized rows/s':>18} {'speedup':>8}")
+    for rows in args.rows:
+        for name in args.datasets:
+            fast, fast_secs = time_call(getattr(data_generators, f'generate_{name}_data_df'), rows, seed=42)
+            fast_rate = len(fast) / fast_secs
+
+            if args.skip_legacy:
+                print(f"{name:<18} {rows:>10,} {'-':>15} {fast_rate:>18,.0f} {'-':>8}")
+                continue
+
+            random.seed(42)
+            slow, slow_secs = time_call(getattr(legacy_generators, f'generate_{name}_data_df'), rows)
+            slow_rate = len(slow) / slow_secs
+            print(f"{name:<18} {rows:>10,} {slow_rate:>15,.0f} {fast_rate:>18,.0f} {fast_rate / slow_rate:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
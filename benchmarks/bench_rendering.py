@@ -0,0 +1,64 @@
+"""Benchmark SVG (Scatter) against WebGL (Scattergl) line figures: build time and serialized JSON size.
+
+Usage:
+    python benchmarks/bench_rendering.py --points 10000 100000 1000000
+    python benchmarks/bench_rendering.py --points 1000000 --downsample 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import downsampling  # noqa: E402
+
+
+def build_figure(frame, webgl):
+    """Line figure of frame the way the Trend Analysis page draws it"""
+    fig = go.Figure()
+    fig.add_trace(downsampling.line_trace(webgl, x=frame['date'], y=frame['value'], mode='lines', name='Original'))
+    fig.update_layout(title="Trend Analysis", xaxis_title="Date", yaxis_title="value", height=500)
+    return fig
+
+
+def time_call(func, *args, **kwargs):
+    """Run func once and return (result, elapsed seconds)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--points', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--downsample', type=int, default=0,
+                        help="Also time figures of the series downsampled (LTTB) to this many points")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    build_figure(pd.DataFrame({'date': pd.date_range('2020-01-01', periods=2), 'value': [0.0, 1.0]}), True)  # warm-up
+    print(f"{'points':>11} {'plotted':>11} {'renderer':>9} {'build s':>9} {'to_json s':>10} {'JSON MB':>9}")
+    for points in args.points:
+        frame = pd.DataFrame({
+            'date': pd.date_range('2020-01-01', periods=points, freq='min'),
+            'value': 100 + rng.normal(0, 1, points).cumsum()
+        })
+        variants = [frame]
+        if args.downsample:
+            variants.append(downsampling.downsample(frame, 'date', 'value', args.downsample)[0])
+
+        for data in variants:
+            for renderer, webgl in (('SVG', False), ('WebGL', True)):
+                fig, build_secs = time_call(build_figure, data, webgl)
+                payload, json_secs = time_call(fig.to_json)
+                print(f"{points:>11,} {len(data):>11,} {renderer:>9} {build_secs:>9.4f} {json_secs:>10.4f} "
+                      f"{len(payload) / 1024 ** 2:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
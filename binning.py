@@ -0,0 +1,139 @@
+"""Pre-binned histograms and box plots for the distribution charts.
+
+px.histogram and px.box put every value of the column into the figure JSON
+and let the browser bin it, so the payload grows with the row count. Here the
+server computes the histogram counts and the box-plot five-number summary
+with NumPy and the figures are drawn from those aggregates: a fixed number of
+bars and one box whose outlier markers are capped at a random sample.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+# Upper bound on bins when the bin count is chosen automatically
+MAX_HISTOGRAM_BINS = int(os.getenv('MAX_HISTOGRAM_BINS', '200'))
+
+# Most outlier points drawn on a box plot (the count is always exact)
+BOX_OUTLIER_SAMPLE = int(os.getenv('BOX_OUTLIER_SAMPLE', '500'))
+
+
+def _finite_values(values):
+    """Finite float values of a column (NaN, None and inf dropped)"""
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+class Histogram:
+    """Bin edges and counts of one column"""
+
+    def __init__(self, edges, counts, total):
+        self.edges = edges
+        self.counts = counts
+        self.total = total
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+
+class BoxStats:
+    """Tukey box-plot summary: quartiles, whisker ends, mean and a capped sample of outliers"""
+
+    def __init__(self, q1, median, q3, lower_fence, upper_fence, mean, outliers, outlier_count, count):
+        self.q1 = q1
+        self.median = median
+        self.q3 = q3
+        self.lower_fence = lower_fence
+        self.upper_fence = upper_fence
+        self.mean = mean
+        self.outliers = outliers
+        self.outlier_count = outlier_count
+        self.count = count
+
+
+def histogram(values, bins='auto', max_bins=MAX_HISTOGRAM_BINS):
+    """Histogram of the finite values; bins is a count or a NumPy rule ('auto' is capped at max_bins)"""
+    values = _finite_values(values)
+    if len(values) == 0:
+        return Histogram(np.array([0.0, 1.0]), np.array([0]), 0)
+    if isinstance(bins, str):
+        edges = np.histogram_bin_edges(values, bins=bins)
+        if len(edges) - 1 > max_bins:
+            edges = np.histogram_bin_edges(values, bins=max_bins)
+    else:
+        edges = np.histogram_bin_edges(values, bins=bins)
+    counts, edges = np.histogram(values, bins=edges)
+    return Histogram(edges, counts, len(values))
+
+
+def box_stats(values, max_outliers=BOX_OUTLIER_SAMPLE, seed=0):
+    """Five-number summary with 1.5 x IQR fences; whiskers end at the most extreme values inside them"""
+    values = _finite_values(values)
+    if len(values) == 0:
+        return BoxStats(np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.array([]), 0, 0)
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    outliers = values[~inside]
+    outlier_count = len(outliers)
+    if outlier_count > max_outliers:
+        # Keep the extremes so the axis range matches the full data
+        sample = np.random.default_rng(seed).choice(outliers, max_outliers - 2, replace=False)
+        outliers = np.concatenate([[outliers.min(), outliers.max()], sample])
+    return BoxStats(q1, median, q3, values[inside].min(), values[inside].max(), values.mean(), outliers,
+                    outlier_count, len(values))
+
+
+def histogram_trace(hist, name=None, color=None):
+    """Bar trace drawing a pre-binned histogram"""
+    return go.Bar(x=hist.centers, y=hist.counts, width=hist.widths, name=name, marker_color=color,
+                  marker_line_width=0, hovertemplate='%{x}<br>count=%{y}<extra></extra>')
+
+
+def box_traces(stats, name, color=None, horizontal=False):
+    """Box trace built from BoxStats plus a marker trace for the sampled outliers"""
+    box_axis, value_axis = ('y', 'x') if horizontal else ('x', 'y')
+    box = go.Box(q1=[stats.q1], median=[stats.median], q3=[stats.q3], lowerfence=[stats.lower_fence],
+                 upperfence=[stats.upper_fence], mean=[stats.mean], name=name, marker_color=color,
+                 orientation='h' if horizontal else 'v', showlegend=False, **{box_axis: [name]})
+    points = go.Scatter(mode='markers', name='Outliers', marker=dict(color=color, size=5), showlegend=False,
+                        **{box_axis: [name] * len(stats.outliers), value_axis: stats.outliers})
+    return [box, points]
+
+
+def histogram_figure(values, title, bins='auto', color=None, x_label=None):
+    """Histogram figure whose payload is the bins, not the values"""
+    fig = go.Figure(histogram_trace(histogram(values, bins), color=color))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count', bargap=0)
+    return fig
+
+
+def box_figure(values, title, color=None, name=None):
+    """Box plot figure drawn from the five-number summary and a capped outlier sample"""
+    stats = box_stats(values)
+    fig = go.Figure(box_traces(stats, name or '', color))
+    fig.update_layout(title=title)
+    if stats.outlier_count > len(stats.outliers):
+        fig.add_annotation(text=f"{len(stats.outliers):,} of {stats.outlier_count:,} outliers shown",
+                           xref='paper', yref='paper', x=1, y=1.05, showarrow=False)
+    return fig
+
+
+def histogram_with_box_figure(values, title, bins='auto', color=None, x_label=None):
+    """Pre-binned equivalent of px.histogram(..., marginal='box')"""
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02)
+    for trace in box_traces(box_stats(values), x_label or '', color, horizontal=True):
+        fig.add_trace(trace, row=1, col=1)
+    fig.add_trace(histogram_trace(histogram(values, bins), color=color), row=2, col=1)
+    fig.update_layout(title=title, bargap=0, showlegend=False)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=x_label, row=2, col=1)
+    fig.update_yaxes(title_text='count', row=2, col=1)
+    return fig
@@ -0,0 +1,139 @@
+"""Dtype compaction for datasets loaded on the Data Upload page.
+
+Uploads and generated samples kept every text column as Python objects and
+every number as 64 bits, so low-cardinality fields (region, currency,
+department, status) repeated the same strings once per row. After loading, a
+dataset is compacted once: text with few distinct values becomes
+`category`, other text becomes Arrow-backed strings. Downcasting 64-bit
+integers and floats to 32 bits when no value changes is opt-in
+(COMPACT_NUMBERS=1): later arithmetic on int32 can overflow and float32 loses
+precision, so numbers are kept as parsed by default.
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingestion import frame_nbytes
+
+# Text columns become categories when distinct values are at most this share of the rows...
+CATEGORY_MAX_RATIO = float(os.getenv('CATEGORY_MAX_RATIO', '0.5'))
+
+# ...and there are at most this many of them
+CATEGORY_MAX_VALUES = int(os.getenv('CATEGORY_MAX_VALUES', '10000'))
+
+# Set to 0 to keep loaded datasets exactly as parsed
+COMPACT_DTYPES = os.getenv('COMPACT_DTYPES', '1') != '0'
+
+# Set to 1 to also downcast 64-bit numbers to 32 bits where no value changes
+COMPACT_NUMBERS = os.getenv('COMPACT_NUMBERS', '0') == '1'
+
+
+def _arrow_string_dtype():
+    """Arrow-backed string dtype with NaN for missing values (the pandas 3 default 'str'), if available"""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:
+        return 'string[pyarrow_numpy]'
+
+
+def text_columns(df):
+    """Columns holding text: object, string and category dtypes"""
+    return [col for col in df.columns
+            if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col])
+            or isinstance(df[col].dtype, pd.CategoricalDtype)]
+
+
+class CompactionResult:
+    """A compacted DataFrame with its memory footprint before and after"""
+
+    def __init__(self, df, before_bytes, after_bytes, conversions, elapsed):
+        self.df = df
+        self.before_bytes = before_bytes
+        self.after_bytes = after_bytes
+        self.conversions = conversions
+        self.elapsed = elapsed
+
+    @property
+    def before_mb(self):
+        return self.before_bytes / 1024**2
+
+    @property
+    def after_mb(self):
+        return self.after_bytes / 1024**2
+
+    @property
+    def saved_mb(self):
+        return self.before_mb - self.after_mb
+
+    def summary(self):
+        """Converted columns as a DataFrame (Column, From, To)"""
+        return pd.DataFrame([{'Column': col, 'From': before, 'To': after}
+                             for col, (before, after) in self.conversions.items()],
+                            columns=['Column', 'From', 'To'])
+
+
+def _compact_text(values, category_ratio, max_categories):
+    if pd.api.types.is_object_dtype(values) and pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        return values  # mixed Python objects are left alone
+    distinct = values.nunique(dropna=True)
+    if distinct <= max_categories and distinct <= category_ratio * len(values):
+        # Ordered by value, so min, max and sorting behave as they did on the strings
+        return values.astype(pd.CategoricalDtype(np.sort(values.dropna().unique()), ordered=True))
+    if pd.api.types.is_object_dtype(values):
+        try:
+            return values.astype(_arrow_string_dtype())
+        except (ImportError, TypeError):
+            return values
+    return values
+
+
+def _compact_int(values):
+    # Not narrower than 32 bits: int8/int16 columns overflow in everyday arithmetic (differences, products)
+    info = np.iinfo('int32')
+    if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return values.astype('int32')
+    return values
+
+
+def _compact_float(values):
+    narrow = values.astype('float32')
+    if np.array_equal(narrow.to_numpy(dtype='float64'), values.to_numpy(dtype='float64'), equal_nan=True):
+        return narrow
+    return values
+
+
+def compact_column(values, category_ratio=CATEGORY_MAX_RATIO, max_categories=CATEGORY_MAX_VALUES,
+                   numbers=COMPACT_NUMBERS):
+    """The smallest lossless representation of one column (values unchanged, only the dtype)
+
+    Numeric columns are only downcast with numbers=True.
+    """
+    dtype = values.dtype
+    if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+        return values
+    if numbers and isinstance(dtype, np.dtype) and dtype.kind == 'i' and dtype.itemsize > 4:
+        return _compact_int(values)
+    if numbers and isinstance(dtype, np.dtype) and dtype.kind == 'f' and dtype.itemsize > 4:
+        return _compact_float(values)
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        return _compact_text(values, category_ratio, max_categories)
+    return values
+
+
+def compact_frame(df, category_ratio=CATEGORY_MAX_RATIO, max_categories=CATEGORY_MAX_VALUES,
+                  numbers=COMPACT_NUMBERS):
+    """Compact every column of df into a new DataFrame; returns a CompactionResult"""
+    start = time.perf_counter()
+    before = frame_nbytes(df)
+    compacted_df = df.copy(deep=False)
+    conversions = {}
+    for position, col in enumerate(df.columns):
+        values = df.iloc[:, position]
+        compacted = compact_column(values, category_ratio, max_categories, numbers)
+        if compacted.dtype != values.dtype:
+            conversions[col] = (str(values.dtype), str(compacted.dtype))
+            compacted_df.isetitem(position, compacted)
+    return CompactionResult(compacted_df, before, frame_nbytes(compacted_df), conversions,
+                            time.perf_counter() - start)
@@ -0,0 +1,127 @@
+"""Correlation matrices and strongest pairs for the Correlation Analysis view.
+
+The view used to call df.corr() and then walk every (i, j) pair in a nested
+Python loop to build and sort a DataFrame of all pairs, which is quadratic in
+Python for wide tables. Here every column is standardized once and the whole
+matrix comes from float32 matrix products (BLAS), Spearman is Pearson on
+ranks, and very tall tables can be estimated from a row sample. The strongest
+pairs are picked from the upper triangle with np.argpartition.
+"""
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Rows above which the sampled mode estimates the matrix from a random sample of rows
+CORRELATION_SAMPLE_ROWS = int(os.getenv('CORRELATION_SAMPLE_ROWS', '200000'))
+
+CORRELATION_METHODS = ['pearson', 'spearman']
+
+
+class CorrelationResult:
+    """A correlation matrix and how it was computed"""
+
+    def __init__(self, matrix, method, rows_used, total_rows, elapsed):
+        self.matrix = matrix
+        self.method = method
+        self.rows_used = rows_used
+        self.total_rows = total_rows
+        self.elapsed = elapsed
+
+    @property
+    def sampled(self):
+        return self.rows_used < self.total_rows
+
+    def top_pairs(self, k=10):
+        return top_correlations(self.matrix, k)
+
+
+def _standardize(values):
+    """Columns centered and scaled to unit population variance over their own non-missing values (NaN -> 0)"""
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    means = np.nansum(values, axis=0, dtype='float64') / np.maximum(counts, 1)
+    centered = np.where(valid, values - means.astype(values.dtype), 0)
+    scale = np.sqrt(np.einsum('ij,ij->j', centered, centered, dtype='float64') / np.maximum(counts, 1))
+    scale[scale == 0] = np.nan  # constant columns have no correlation
+    return (centered / scale.astype(values.dtype)).astype(values.dtype), valid
+
+
+def pearson_matrix(values):
+    """Pearson correlations between the columns of a 2-D float array, over pairwise complete rows
+
+    Without missing values this is one matrix product of the standardized
+    columns. With them, the pairwise sums (count, sum, sum of squares, cross
+    product) over rows where both columns are present are matrix products too.
+    Standardizing first keeps those sums well conditioned in float32.
+    """
+    z, valid = _standardize(values)
+    if valid.all():
+        corr = (z.T @ z).astype('float64') / len(z)
+    else:
+        mask = valid.astype(values.dtype)
+        n = (mask.T @ mask).astype('float64')
+        sums = (z.T @ mask).astype('float64')  # sums[i, j]: sum of column i over rows where j is present
+        squares = ((z * z).T @ mask).astype('float64')
+        cross = (z.T @ z).astype('float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = n * cross - sums * sums.T
+            variance = n * squares - sums * sums
+            corr = covariance / np.sqrt(variance * variance.T)
+        corr[n < 2] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    diagonal = np.isfinite(np.diag(corr))
+    corr[np.diag_indices_from(corr)] = np.where(diagonal, 1.0, np.nan)
+    return corr
+
+
+def correlation_matrix(df, columns=None, method='pearson', sample_rows=None, seed=0, dtype='float32'):
+    """Correlation matrix of the numeric columns of df as a CorrelationResult
+
+    method is 'pearson' or 'spearman' (Pearson on average ranks; with missing
+    values the ranks are taken per column, not per pair as pandas does).
+    sample_rows estimates the matrix from that many randomly chosen rows when
+    the table is taller.
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+    start = time.perf_counter()
+    columns = list(columns) if columns is not None else df.select_dtypes(include=[np.number]).columns.tolist()
+    frame = df[columns]
+    total_rows = len(frame)
+    if sample_rows is not None and total_rows > sample_rows:
+        positions = np.sort(np.random.default_rng(seed).choice(total_rows, sample_rows, replace=False))
+        frame = frame.iloc[positions]
+    if method == 'spearman':
+        frame = frame.rank(method='average')
+    values = frame.to_numpy(dtype=dtype, na_value=np.nan)
+    matrix = pd.DataFrame(pearson_matrix(values), index=columns, columns=columns)
+    return CorrelationResult(matrix, method, len(frame), total_rows, time.perf_counter() - start)
+
+
+def top_correlations(matrix, k=10):
+    """The k column pairs with the largest absolute correlation, strongest first
+
+    Returns a DataFrame with 'Variable 1', 'Variable 2' and 'Correlation'
+    columns; pairs with an undefined correlation are left out.
+    """
+    names = np.asarray(matrix.columns)
+    upper_i, upper_j = np.triu_indices(len(names), 1)
+    values = matrix.to_numpy()[upper_i, upper_j]
+    finite = np.flatnonzero(np.isfinite(values))
+    strength = np.abs(values[finite])
+    k = min(k, len(finite))
+    if k == 0:
+        return pd.DataFrame(columns=['Variable 1', 'Variable 2', 'Correlation'])
+    if k < len(finite):
+        chosen = np.argpartition(-strength, k - 1)[:k]
+    else:
+        chosen = np.arange(len(finite))
+    chosen = chosen[np.argsort(-strength[chosen], kind='stable')]
+    pairs = finite[chosen]
+    return pd.DataFrame({
+        'Variable 1': names[upper_i[pairs]],
+        'Variable 2': names[upper_j[pairs]],
+        'Correlation': values[pairs]
+    })
@@ -0,0 +1,550 @@
+"""Vectorized sample data generators for the BI dashboard.
+
+Every column is drawn in one shot from a seeded ``np.random.Generator`` instead
+of looping over rows with ``random.choice``. The schemas, value mixes, null
+rates and duplicate injection match the original row-by-row generators.
+"""
+import numpy as np
+import pandas as pd
+
+# The messy industry datasets are capped at this many base records
+MAX_GENERATED_ROWS = 1_000_000
+
+_CLOCK_LABELS = np.array([f"{h:02d}:{m:02d}:00" for h in range(24) for m in range(60)], dtype=object)
+
+
+# Column helpers
+def _options(options):
+    """Object array of choices that may mix None, str, bool and int values"""
+    values = np.empty(len(options), dtype=object)
+    values[:] = options
+    return values
+
+
+def _pick(rng, options, size):
+    """Vectorized random.choice over a list of options"""
+    return _options(options)[rng.integers(0, len(options), size)]
+
+
+def _randint(rng, low, high, size):
+    """Inclusive integer range, same bounds as random.randint"""
+    return rng.integers(low, high + 1, size)
+
+
+def _uniform(rng, low, high, size, decimals):
+    """Uniform floats rounded like round(random.uniform(low, high), decimals)"""
+    return np.round(rng.uniform(low, high, size), decimals)
+
+
+def _keep(rng, size, null_rate):
+    """Boolean mask that is False for roughly null_rate of the rows"""
+    return rng.random(size) > null_rate
+
+
+def _where_valid(values, valid):
+    """Blank out invalid rows: NaN for numeric columns, None for everything else"""
+    if values.dtype.kind in 'fiu':
+        out = values.astype(float)
+        out[~valid] = np.nan
+    else:
+        out = values.astype(object)
+        out[~valid] = None
+    return out
+
+
+def _with_nulls(rng, values, null_rate):
+    """Keep a value only when random() > null_rate, like the original generators"""
+    return _where_valid(values, _keep(rng, len(values), null_rate))
+
+
+def _id_labels(prefix, numbers, width=0, suffix=''):
+    """String-format every integer in numbers"""
+    digits = numbers.astype(str)
+    if width:
+        digits = np.char.zfill(digits, width)
+    formatted = np.char.add(prefix, digits)
+    if suffix:
+        formatted = np.char.add(formatted, suffix)
+    return formatted.astype(object)
+
+
+def _format_ids(prefix, numbers, width=0, suffix=''):
+    """Format integers as f"{prefix}{n:0{width}d}{suffix}" for a whole column"""
+    numbers = np.asarray(numbers)
+    if len(numbers) == 0:
+        return numbers.astype(object)
+    low, high = int(numbers.min()), int(numbers.max())
+    # Narrow ranges (random ids, zip codes) are formatted once per distinct value
+    if high - low < len(numbers) // 2:
+        return _id_labels(prefix, np.arange(low, high + 1), width, suffix)[numbers - low]
+    return _id_labels(prefix, numbers, width, suffix)
+
+
+def _format_clock(hour, minute):
+    """Format hour/minute columns as 'HH:MM:00' strings"""
+    return _CLOCK_LABELS[np.asarray(hour) * 60 + np.asarray(minute)]
+
+
+def _format_dates(base, day_offsets):
+    """Format base + day offsets as 'YYYY-MM-DD' strings"""
+    day_offsets = np.asarray(day_offsets)
+    if len(day_offsets) == 0:
+        return day_offsets.astype(object)
+    low, high = int(day_offsets.min()), int(day_offsets.max())
+    days = np.datetime64(base, 'D') + np.arange(low, high + 1).astype('timedelta64[D]')
+    return np.datetime_as_string(days, unit='D').astype(object)[day_offsets - low]
+
+
+def _inject_duplicates(df, rng, rate, first_id=1):
+    """Repeat a row right after itself with probability rate (only after record 100)"""
+    record_ids = np.arange(first_id, first_id + len(df))
+    duplicate = (rng.random(len(df)) < rate) & (record_ids > 100)
+    if not duplicate.any():
+        return df
+    return df.iloc[np.repeat(np.arange(len(df)), 1 + duplicate)].reset_index(drop=True)
+
+
+def _capped(rows):
+    """Number of base records generated for the capped industry datasets"""
+    return max(0, min(int(rows), MAX_GENERATED_ROWS))
+
+
+# Sales, healthcare and finance
+def generate_sales_data_df(rows, seed=None):
+    """Generate sales data as DataFrame"""
+    rng = np.random.default_rng(seed)
+    n = int(rows)
+
+    products = ['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones', 'Webcam', 'Desk', 'Chair']
+    categories = ['Electronics', 'Accessories', 'Furniture']
+    regions = ['North', 'South', 'East', 'West', 'Central']
+
+    quantity = _randint(rng, 1, 10, n)
+    price = _uniform(rng, 50, 1000, n, 2)
+
+    return pd.DataFrame({
+        'transaction_id': np.arange(1, n + 1),
+        'date': _format_dates('2024-01-01', _randint(rng, 0, 364, n)),
+        'product': _pick(rng, products, n),
+        'category': _pick(rng, categories, n),
+        'quantity': quantity,
+        'price': price,
+        'total': np.round(quantity * price, 2),
+        'customer_id': _format_ids('CUST', _randint(rng, 1, 5000, n), 6),
+        'region': _pick(rng, regions, n)
+    })
+
+
+def generate_healthcare_data_df(rows, seed=None):
+    """Generate healthcare data as DataFrame"""
+    rng = np.random.default_rng(seed)
+    n = int(rows)
+
+    diagnoses = ['Hypertension', 'Diabetes', 'Asthma', 'Arthritis', 'Pneumonia', 'Bronchitis', 'Fracture', 'Migraine']
+    genders = ['M', 'F', 'Other']
+    insurances = ['Medicare', 'Medicaid', 'Private', 'Uninsured']
+
+    admission_offset = _randint(rng, 0, 364, n)
+    treatment_days = _randint(rng, 1, 14, n)
+
+    return pd.DataFrame({
+        'patient_id': _format_ids('PAT', np.arange(1, n + 1), 8),
+        'admission_date': _format_dates('2024-01-01', admission_offset),
+        'discharge_date': _format_dates('2024-01-01', admission_offset + treatment_days),
+        'diagnosis': _pick(rng, diagnoses, n),
+        'age': _randint(rng, 18, 98, n),
+        'gender': _pick(rng, genders, n),
+        'treatment_days': treatment_days,
+        'cost': _uniform(rng, 1000, 50000, n, 2),
+        'insurance': _pick(rng, insurances, n)
+    })
+
+
+def generate_finance_data_df(rows, seed=None):
+    """Generate finance data as DataFrame"""
+    rng = np.random.default_rng(seed)
+    n = int(rows)
+
+    types = ['Debit', 'Credit', 'Transfer', 'ATM', 'Payment']
+    currencies = ['USD', 'EUR', 'GBP', 'JPY']
+    merchants = ['Amazon', 'Walmart', 'Target', 'Starbucks', 'Shell', 'Restaurant', 'Online Store', 'Grocery']
+
+    seconds = (_randint(rng, 0, 364, n) * 86400 + _randint(rng, 0, 23, n) * 3600
+               + _randint(rng, 0, 59, n) * 60 + _randint(rng, 0, 59, n))
+    timestamps = np.datetime64('2024-01-01T00:00:00') + seconds.astype('timedelta64[s]')
+
+    txn_type = _pick(rng, types, n)
+    amount = _uniform(rng, 10, 2000, n, 2)
+
+    # Running balance that restarts every 10,000 transactions
+    signed = np.where(np.isin(txn_type, ['Debit', 'ATM', 'Payment']), -amount, amount)
+    block = np.arange(n) // 10000
+    block_start = np.concatenate(([10000.0], 10000 + rng.uniform(0, 5000, max(0, block.max(initial=0)))))
+    running = np.cumsum(signed)
+    offsets = np.zeros(len(block_start))
+    boundaries = np.arange(1, len(block_start)) * 10000
+    offsets[1:] = running[boundaries - 1]
+    balance = block_start[block] + running - offsets[block]
+
+    return pd.DataFrame({
+        'transaction_id': _format_ids('TXN', np.arange(1, n + 1), 10),
+        'timestamp': np.datetime_as_string(timestamps, unit='s').astype(object),
+        'account_id': _format_ids('ACC', _randint(rng, 1, 10000, n), 8),
+        'transaction_type': txn_type,
+        'amount': amount,
+        'balance': np.round(balance, 2),
+        'currency': _pick(rng, currencies, n),
+        'merchant': _pick(rng, merchants, n)
+    })
+
+
+# Messy industry datasets (row ids start at `start` so they can be generated in pieces)
+def _industry_agnostic_frame(rng, start, stop):
+    """Build industry-agnostic records start..stop-1 before duplicate injection"""
+    n = stop - start
+
+    departments = ['Sales', 'Marketing', 'IT', 'HR', 'Finance', 'Operations', 'Customer Service', 'R&D', 'Legal', 'Logistics']
+    statuses = ['Active', 'Pending', 'Completed', 'Cancelled', 'On Hold', 'In Progress', 'Review', 'Approved', None, 'ACTIVE', 'active']
+    priorities = ['High', 'Medium', 'Low', 'Critical', 'Normal', None, 'HIGH', 'high']
+    categories = ['Project', 'Task', 'Initiative', 'Request', 'Issue', 'Improvement', 'Maintenance', None]
+    locations = ['New York', 'London', 'Tokyo', 'Singapore', 'Sydney', 'Toronto', 'Berlin', 'Paris', 'Mumbai', 'São Paulo', None, 'NYC', 'N/A']
+    notes = ['Follow up needed', 'Waiting for approval', 'In progress - see attached', '', None,
+             'TBD', 'N/A', 'Contact John for details', 'URGENT!!!', 'na']
+
+    # 5% null dates
+    has_dates = rng.random(n) >= 0.05
+    created_offset = _randint(rng, 0, 1825, n)
+    updated_offset = created_offset + _randint(rng, 0, 365, n)
+
+    # Owner field with inconsistencies
+    owner_kind = rng.integers(0, 7, n)
+    owner_number = _randint(rng, 1, 500, n)
+    owner = _options([None, None, None, 'TBD', 'Unassigned', '', 'N/A'])[owner_kind]
+    owner[owner_kind == 0] = _format_ids('user', owner_number[owner_kind == 0], suffix='@company.com')
+    owner[owner_kind == 1] = _format_ids('User ', owner_number[owner_kind == 1])
+
+    return pd.DataFrame({
+        'record_id': _format_ids('REC', np.arange(start, stop), 10),
+        'created_date': _where_valid(_format_dates('2020-01-01', created_offset), has_dates),
+        'updated_date': _where_valid(_format_dates('2020-01-01', updated_offset), has_dates),
+        'department': _pick(rng, departments, n),
+        'category': _pick(rng, categories, n),
+        'status': _pick(rng, statuses, n),
+        'priority': _pick(rng, priorities, n),
+        'location': _pick(rng, locations, n),
+        'budget': _with_nulls(rng, _uniform(rng, 1000, 500000, n, 2), 0.08),
+        'actual_cost': _with_nulls(rng, _uniform(rng, 500, 600000, n, 2), 0.1),
+        'completion_percentage': _with_nulls(rng, _uniform(rng, 0, 100, n, 1), 0.07),
+        'team_size': _with_nulls(rng, _randint(rng, 1, 50, n), 0.06),
+        'rating': _with_nulls(rng, _uniform(rng, 1, 5, n, 1), 0.12),
+        'owner': owner,
+        'notes': _pick(rng, notes, n)
+    })
+
+
+def _manufacturing_frame(rng, start, stop):
+    """Build manufacturing records start..stop-1 before duplicate injection"""
+    n = stop - start
+
+    plants = ['Plant A', 'Plant B', 'Plant C', 'Plant D', 'Plant E', None, 'PLANT A', 'plant_a']
+    production_lines = ['Line 1', 'Line 2', 'Line 3', 'Line 4', 'Line 5', 'Line 6', None]
+    product_types = ['Widget-A', 'Widget-B', 'Gadget-X', 'Component-12', 'Assembly-Z', 'Part-456', None]
+    shifts = ['Day', 'Night', 'Evening', 'DAY', 'day', None, 'Swing']
+    quality_statuses = ['Pass', 'Fail', 'Pending', 'Rework', 'Scrap', None, 'PASS', 'pass']
+    machine_statuses = ['Running', 'Idle', 'Maintenance', 'Breakdown', 'Setup', None, 'RUNNING']
+    suppliers = ['Supplier-A', 'Supplier-B', 'Supplier-C', 'Supplier-D', 'Supplier-E', None, 'TBD']
+    notes = ['Normal operation', 'Machine calibration needed', 'Quality issues detected', '', None,
+             'TBD', 'SEE SUPERVISOR', 'Material shortage', 'na', 'N/A']
+
+    # Messy timestamps (4% null)
+    has_dates = rng.random(n) >= 0.04
+    hour = _randint(rng, 0, 23, n)
+    minute = _randint(rng, 0, 59, n)
+    duration = _randint(rng, 30, 480, n)  # 30 min to 8 hours
+    end_hour = (hour + duration // 60) % 24
+    end_minute = (minute + duration % 60) % 60
+
+    # Messy production quantities
+    planned_qty = _with_nulls(rng, _randint(rng, 100, 10000, n), 0.05)
+    actual_qty = _with_nulls(rng, _randint(rng, 50, 10000, n), 0.06)
+    defect_qty = _with_nulls(rng, _randint(rng, 0, 500, n), 0.08)
+
+    # Yield with 3% impossible values
+    yield_pct = np.round(actual_qty / planned_qty * 100, 2)
+    impossible = rng.random(n) < 0.03
+    yield_pct = np.where(impossible & ~np.isnan(yield_pct), _uniform(rng, 100, 150, n, 2), yield_pct)
+
+    return pd.DataFrame({
+        'batch_id': _format_ids('BATCH', np.arange(start, stop), 12),
+        'production_date': _where_valid(_format_dates('2022-01-01', _randint(rng, 0, 1095, n)), has_dates),
+        'start_time': _where_valid(_format_clock(hour, minute), has_dates),
+        'end_time': _where_valid(_format_clock(end_hour, end_minute), has_dates),
+        'plant': _pick(rng, plants, n),
+        'production_line': _pick(rng, production_lines, n),
+        'product_type': _pick(rng, product_types, n),
+        'shift': _pick(rng, shifts, n),
+        'planned_quantity': planned_qty,
+        'actual_quantity': actual_qty,
+        'defect_quantity': defect_qty,
+        'yield_percentage': yield_pct,
+        'quality_status': _pick(rng, quality_statuses, n),
+        'machine_id': _with_nulls(rng, _format_ids('MCH', _randint(rng, 1, 200, n), 4), 0.04),
+        'machine_status': _pick(rng, machine_statuses, n),
+        'downtime_minutes': _with_nulls(rng, _randint(rng, 0, 480, n), 0.1),
+        'temperature_celsius': _with_nulls(rng, _uniform(rng, 15, 95, n, 1), 0.09),
+        'pressure_psi': _with_nulls(rng, _uniform(rng, 50, 300, n, 1), 0.09),
+        'material_cost': _with_nulls(rng, _uniform(rng, 100, 50000, n, 2), 0.07),
+        'labor_cost': _with_nulls(rng, _uniform(rng, 50, 5000, n, 2), 0.08),
+        'supplier': _pick(rng, suppliers, n),
+        'operator_id': _with_nulls(rng, _format_ids('OPR', _randint(rng, 1, 500, n), 5), 0.06),
+        'notes': _pick(rng, notes, n)
+    })
+
+
+def _operations_frame(rng, start, stop):
+    """Build operations/logistics records start..stop-1 before duplicate injection"""
+    n = stop - start
+
+    warehouses = ['WH-North', 'WH-South', 'WH-East', 'WH-West', 'WH-Central', None, 'WH-NORTH', 'wh_north']
+    carriers = ['FedEx', 'UPS', 'DHL', 'USPS', 'Local Courier', None, 'TBD', 'fedex']
+    shipment_types = ['Standard', 'Express', 'Overnight', 'Economy', 'Priority', None, 'STANDARD']
+    statuses = ['Delivered', 'In Transit', 'Pending', 'Delayed', 'Cancelled', 'Lost', 'Returned', None, 'DELIVERED']
+    regions = ['Northeast', 'Southeast', 'Midwest', 'Southwest', 'West Coast', 'International', None]
+    order_types = ['B2B', 'B2C', 'Internal', 'Return', 'Exchange', None, 'b2b']
+    priorities = ['High', 'Medium', 'Low', 'Critical', None, 'HIGH', 'high']
+    damaged_flags = [True, False, None, 'Yes', 'No', 'TRUE', 'false', 1, 0]
+    notes = ['Standard delivery', 'Customer not home', 'Left at door', 'Signature required', '', None,
+             'URGENT', 'Handle with care', 'na', 'N/A', 'See tracking for details']
+
+    # Messy dates (4% null); 2% delivered before shipped, 15% not delivered yet
+    has_dates = rng.random(n) >= 0.04
+    order_offset = _randint(rng, 0, 1460, n)
+    ship_offset = order_offset + _randint(rng, 0, 14, n)
+    early = rng.random(n) < 0.02
+    delivery_offset = ship_offset + np.where(early, _randint(rng, -5, 0, n), _randint(rng, 1, 21, n))
+    delivered = has_dates & (rng.random(n) > 0.15)
+
+    # Volume only when every dimension is present
+    length_cm = _with_nulls(rng, _uniform(rng, 5, 200, n, 1), 0.07)
+    width_cm = _with_nulls(rng, _uniform(rng, 5, 150, n, 1), 0.07)
+    height_cm = _with_nulls(rng, _uniform(rng, 5, 150, n, 1), 0.07)
+
+    return pd.DataFrame({
+        'order_id': _format_ids('ORD', np.arange(start, stop), 12),
+        'shipment_id': _with_nulls(rng, _format_ids('SHIP', np.arange(start, stop), 12), 0.05),
+        'tracking_number': _with_nulls(rng, _format_ids('TRK', _randint(rng, 1000000000, 9999999999, n)), 0.08),
+        'order_date': _where_valid(_format_dates('2021-01-01', order_offset), has_dates),
+        'ship_date': _where_valid(_format_dates('2021-01-01', ship_offset), has_dates),
+        'delivery_date': _where_valid(_format_dates('2021-01-01', delivery_offset), delivered),
+        'warehouse': _pick(rng, warehouses, n),
+        'carrier': _pick(rng, carriers, n),
+        'shipment_type': _pick(rng, shipment_types, n),
+        'status': _pick(rng, statuses, n),
+        'region': _pick(rng, regions, n),
+        'order_type': _pick(rng, order_types, n),
+        'weight_kg': _with_nulls(rng, _uniform(rng, 0.1, 500, n, 2), 0.06),
+        'length_cm': length_cm,
+        'width_cm': width_cm,
+        'height_cm': height_cm,
+        'volume_cm3': np.round(length_cm * width_cm * height_cm, 2),
+        'items_count': _with_nulls(rng, _randint(rng, 1, 100, n), 0.05),
+        'shipping_cost': _with_nulls(rng, _uniform(rng, 5, 500, n, 2), 0.08),
+        'insurance_cost': _with_nulls(rng, _uniform(rng, 0, 100, n, 2), 0.12),
+        'distance_km': _with_nulls(rng, _uniform(rng, 10, 15000, n, 1), 0.1),
+        'customer_id': _with_nulls(rng, _format_ids('CUST', _randint(rng, 1, 50000, n), 8), 0.04),
+        'destination_zip': _with_nulls(rng, _format_ids('', _randint(rng, 10000, 99999, n)), 0.06),
+        'priority': _pick(rng, priorities, n),
+        'delivery_attempts': _with_nulls(rng, _randint(rng, 1, 5, n), 0.15),
+        'is_damaged': _pick(rng, damaged_flags, n),
+        'notes': _pick(rng, notes, n)
+    })
+
+
+def _government_frame(rng, start, stop):
+    """Build government/public sector records start..stop-1 before duplicate injection"""
+    n = stop - start
+
+    departments = ['Public Works', 'Education', 'Health Services', 'Transportation', 'Parks & Recreation',
+                   'Public Safety', 'Housing', 'Environmental', 'Finance', 'Administration', None, 'PUBLIC WORKS']
+    request_types = ['Service Request', 'Permit', 'License', 'Complaint', 'Information', 'Inspection',
+                     'Violation', 'Application', None, 'SERVICE REQUEST']
+    statuses = ['Open', 'Closed', 'In Progress', 'Pending', 'Approved', 'Denied', 'On Hold',
+                'Under Review', None, 'CLOSED', 'closed']
+    priorities = ['High', 'Medium', 'Low', 'Emergency', 'Routine', None, 'HIGH', 'high']
+    channels = ['Online', 'Phone', 'In-Person', 'Email', 'Mail', 'Mobile App', None, 'ONLINE']
+    districts = ['District 1', 'District 2', 'District 3', 'District 4', 'District 5',
+                 'District 6', None, 'DISTRICT 1', 'Dist-1']
+    categories = ['Infrastructure', 'Environmental', 'Public Safety', 'Administrative',
+                  'Health', 'Education', 'Housing', None]
+    fiscal_years = ['FY2019', 'FY2020', 'FY2021', 'FY2022', 'FY2023', 'FY2024', None, '2023', 'FY 2023']
+    descriptions = ['Pothole repair needed', 'Street light out', 'Permit application', 'Noise complaint',
+                    'Park maintenance', 'Building inspection required', '', None, 'TBD',
+                    'See attached documents', 'URGENT - immediate attention needed', 'na', 'N/A']
+    resolutions = ['Completed successfully', 'Issue resolved', 'Pending additional review',
+                   'Referred to another department', '', None, 'IN PROGRESS', 'Waiting for parts', 'na']
+
+    # Messy dates (5% null); 10% never assigned, 25% still open
+    has_dates = rng.random(n) >= 0.05
+    submitted_offset = _randint(rng, 0, 2190, n)
+    assigned = has_dates & (rng.random(n) > 0.1)
+    assigned_offset = submitted_offset + _randint(rng, 0, 30, n)
+    resolved = assigned & (rng.random(n) > 0.25)
+    resolved_offset = assigned_offset + _randint(rng, 1, 365, n)
+
+    # Response time in hours with 2% negative outliers
+    response_hours = (resolved_offset - submitted_offset) * 24 + _randint(rng, 0, 23, n)
+    negative = rng.random(n) < 0.02
+    response_hours = np.where(negative, _randint(rng, -100, 0, n), response_hours)
+
+    # Messy location data
+    street = np.char.add(_pick(rng, ['Main', 'Oak', 'Park', 'Elm', 'Maple'], n).astype(str), ' ')
+    street = np.char.add(street, _pick(rng, ['St', 'Ave', 'Blvd', 'Rd', 'Dr'], n).astype(str))
+    address = _format_ids('', _randint(rng, 1, 9999, n), suffix=' ')
+    address = np.char.add(address.astype(str), street).astype(object)
+
+    # Staff assignment
+    staff_kind = rng.integers(0, 6, n)
+    staff_number = _randint(rng, 1, 200, n)
+    assigned_to = _options([None, None, None, 'Unassigned', 'TBD', ''])[staff_kind]
+    assigned_to[staff_kind == 0] = _format_ids('staff', staff_number[staff_kind == 0], suffix='@gov.local')
+    assigned_to[staff_kind == 1] = _format_ids('Employee ', staff_number[staff_kind == 1])
+
+    status = _pick(rng, statuses, n)
+    has_resolution = np.isin(status, ['Closed', 'Resolved', 'Completed']) | (rng.random(n) < 0.3)
+
+    return pd.DataFrame({
+        'case_id': _format_ids('CASE', np.arange(start, stop), 12),
+        'reference_number': _with_nulls(rng, _format_ids('REF', _randint(rng, 100000000, 999999999, n)), 0.06),
+        'submitted_date': _where_valid(_format_dates('2019-01-01', submitted_offset), has_dates),
+        'assigned_date': _where_valid(_format_dates('2019-01-01', assigned_offset), assigned),
+        'resolved_date': _where_valid(_format_dates('2019-01-01', resolved_offset), resolved),
+        'department': _pick(rng, departments, n),
+        'request_type': _pick(rng, request_types, n),
+        'status': status,
+        'priority': _pick(rng, priorities, n),
+        'channel': _pick(rng, channels, n),
+        'district': _pick(rng, districts, n),
+        'category': _pick(rng, categories, n),
+        'address': _with_nulls(rng, address, 0.08),
+        'zip_code': _with_nulls(rng, _format_ids('', _randint(rng, 10000, 99999, n)), 0.07),
+        'latitude': _with_nulls(rng, _uniform(rng, 25.0, 49.0, n, 6), 0.12),
+        'longitude': _with_nulls(rng, _uniform(rng, -125.0, -65.0, n, 6), 0.12),
+        'citizen_id': _with_nulls(rng, _format_ids('CIT', _randint(rng, 1, 500000, n), 10), 0.1),
+        'assigned_to': assigned_to,
+        'response_time_hours': _where_valid(response_hours, resolved),
+        'estimated_cost': _with_nulls(rng, _uniform(rng, 0, 100000, n, 2), 0.15),
+        'actual_cost': _with_nulls(rng, _uniform(rng, 0, 120000, n, 2), 0.2),
+        'satisfaction_rating': _with_nulls(rng, _randint(rng, 1, 5, n), 0.3),
+        'requires_inspection': _pick(rng, [True, False, None, 'Yes', 'No', 'TRUE', 1, 0], n),
+        'follow_up_needed': _pick(rng, [True, False, None, 'Yes', 'No', 1, 0], n),
+        'fiscal_year': _pick(rng, fiscal_years, n),
+        'description': _pick(rng, descriptions, n),
+        'resolution_notes': _where_valid(_pick(rng, resolutions, n), has_resolution)
+    })
+
+
+def generate_industry_agnostic_data_df(rows, seed=None):
+    """Generate industry-agnostic business data as DataFrame - complex and messy"""
+    rng = np.random.default_rng(seed)
+    n = _capped(rows)
+    return _inject_duplicates(_industry_agnostic_frame(rng, 1, n + 1), rng, 0.02)
+
+
+def generate_manufacturing_data_df(rows, seed=None):
+    """Generate manufacturing operations data as DataFrame - complex and messy"""
+    rng = np.random.default_rng(seed)
+    n = _capped(rows)
+    return _inject_duplicates(_manufacturing_frame(rng, 1, n + 1), rng, 0.015)
+
+
+def generate_operations_data_df(rows, seed=None):
+    """Generate operations/logistics data as DataFrame - complex and messy"""
+    rng = np.random.default_rng(seed)
+    n = _capped(rows)
+    return _inject_duplicates(_operations_frame(rng, 1, n + 1), rng, 0.01)
+
+
+def generate_government_data_df(rows, seed=None):
+    """Generate government/public sector data as DataFrame - complex and messy"""
+    rng = np.random.default_rng(seed)
+    n = _capped(rows)
+    return _inject_duplicates(_government_frame(rng, 1, n + 1), rng, 0.02)
+
+
+# Chunked streaming for the large messy datasets
+STREAMING_DATASETS = {
+    'industry_agnostic': (_industry_agnostic_frame, 0.02),
+    'manufacturing': (_manufacturing_frame, 0.015),
+    'operations': (_operations_frame, 0.01),
+    'government': (_government_frame, 0.02),
+}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def iter_sample_chunks(dataset, rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=None):
+    """Yield a messy dataset as DataFrames of at most chunk_size base records
+
+    Record ids continue across chunks and duplicates are injected per chunk,
+    so memory is bounded by the chunk size rather than the total row count.
+    """
+    build, duplicate_rate = STREAMING_DATASETS[dataset]
+    rng = np.random.default_rng(seed)
+    rows = int(rows)
+    for start in range(1, rows + 1, chunk_size):
+        stop = min(start + chunk_size, rows + 1)
+        yield _inject_duplicates(build(rng, start, stop), rng, duplicate_rate, first_id=start)
+
+
+def _arrow_safe(chunk):
+    """Stringify object columns that mix bools, ints and strings so Arrow can type them"""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if chunk[col].dtype == object and pd.api.types.infer_dtype(chunk[col], skipna=True) != 'string':
+            chunk[col] = chunk[col].where(chunk[col].isna(), chunk[col].astype(str))
+    return chunk
+
+
+def write_sample_data(dataset, rows, path, file_format='csv', chunk_size=DEFAULT_CHUNK_SIZE,
+                      seed=None, on_chunk=None):
+    """Stream a generated dataset straight to a CSV or Parquet file
+
+    Returns the number of rows written (base records plus injected duplicates).
+    on_chunk, if given, is called with the number of base records done so far.
+    """
+    written = 0
+    done = 0
+    chunks = iter_sample_chunks(dataset, rows, chunk_size, seed)
+
+    if file_format == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow. Install it or choose CSV.")
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(_arrow_safe(chunk), preserve_index=False,
+                                             schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+                done = min(done + chunk_size, int(rows))
+                if on_chunk:
+                    on_chunk(done)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            for chunk in chunks:
+                chunk.to_csv(handle, header=written == 0, index=False)
+                written += len(chunk)
+                done = min(done + chunk_size, int(rows))
+                if on_chunk:
+                    on_chunk(done)
+
+    return written
@@ -0,0 +1,206 @@
+"""Dataset summaries for the AI prompts.
+
+Every AI entry point rebuilt its own description of the dataset on each call
+(describe(), dtypes, isnull().sum(), head() for insights and chat, describe()
+of the numeric columns twice for reports), each a full scan of the data. The
+summary is now built once per dataset version from the single-pass DuckDB
+profile (shared with the EDA page through the profile cache), rendered to
+text once, and kept in a small LRU keyed by dataset fingerprint. Very wide
+datasets are capped to a number of columns, and the sample to a number of
+rows, so prompts stay a manageable size.
+
+Which columns are described is decided by prompt_budget: the most
+informative ones that fit a token budget, listed in their original order.
+Statistics are one line per column rather than describe()'s wrapped
+column-per-statistic layout.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from profiler import APPROX_PROFILE_ROWS, dataset_fingerprint, profile_dataframe
+from prompt_budget import column_scores, estimate_tokens
+
+# Most columns described in AI prompts, however small they are
+AI_SUMMARY_MAX_COLUMNS = int(os.getenv('AI_SUMMARY_MAX_COLUMNS', '50'))
+
+# Rows of sample data included in AI prompts
+AI_SUMMARY_SAMPLE_ROWS = int(os.getenv('AI_SUMMARY_SAMPLE_ROWS', '5'))
+
+# Estimated tokens the dataset summary of one prompt may take
+AI_SUMMARY_TOKEN_BUDGET = int(os.getenv('AI_SUMMARY_TOKEN_BUDGET', '2000'))
+
+# Number of summaries kept (one per dataset version and cap setting)
+AI_SUMMARY_CACHE_ENTRIES = int(os.getenv('AI_SUMMARY_CACHE_ENTRIES', '16'))
+
+
+class DatasetSummary:
+    """The text blocks the AI prompts describe a dataset with"""
+
+    def __init__(self, rows, columns, shown_columns, numeric_columns, all_numeric_columns, statistics, dtypes,
+                 missing, sample, first_min, first_max, first_is_datetime, tokens, token_budget, elapsed):
+        self.rows = rows
+        self.columns = columns
+        self.shown_columns = shown_columns
+        self.numeric_columns = numeric_columns
+        self.all_numeric_columns = all_numeric_columns
+        self.statistics = statistics
+        self.dtypes = dtypes
+        self.missing = missing
+        self.sample = sample
+        self.first_min = first_min
+        self.first_max = first_max
+        self.first_is_datetime = first_is_datetime
+        self.tokens = tokens
+        self.token_budget = token_budget
+        self.elapsed = elapsed
+
+    @property
+    def truncated(self):
+        return len(self.shown_columns) < len(self.columns)
+
+    def column_note(self):
+        """'' or a note that only some of the columns are described"""
+        if not self.truncated:
+            return ''
+        return f"(describing the {len(self.shown_columns)} most informative of {len(self.columns)} columns)"
+
+    def column_list(self):
+        """Comma-separated column names, ending with a count of those left out"""
+        names = ', '.join(map(str, self.shown_columns))
+        if self.truncated:
+            names += f", ... and {len(self.columns) - len(self.shown_columns)} more"
+        return names
+
+    def numeric_list(self, all_columns=False):
+        """Comma-separated numeric column names among those described (or all of them)"""
+        return ', '.join(map(str, self.all_numeric_columns if all_columns else self.numeric_columns))
+
+
+class SummaryCache:
+    """LRU cache of DatasetSummaries keyed by (dataset fingerprint, limits, priority columns)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def put(self, key, summary):
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _first_column_range(df, profile):
+    """Minimum and maximum of the first column (None when empty or not comparable)"""
+    if len(df) == 0 or len(df.columns) == 0:
+        return None, None
+    first = df.columns[0]
+    if first in profile.numeric_stats.columns:
+        return profile.numeric_stats.at['min', first], profile.numeric_stats.at['max', first]
+    values = df.iloc[:, 0]
+    try:
+        return values.min(), values.max()
+    except TypeError:
+        return None, None
+
+
+def _statistics_text(stats, columns):
+    if not columns:
+        return 'No numeric columns available'
+    return stats[columns].T.to_string(float_format='{:.6g}'.format)
+
+
+def _render(df, profile, columns, sample_rows):
+    """Text blocks (statistics, dtypes, missing, sample) describing columns, in df's column order"""
+    ordered = [col for col in df.columns if col in set(columns)]
+    numeric = [col for col in ordered if col in profile.numeric_stats.columns]
+    blocks = {
+        'statistics': _statistics_text(profile.numeric_stats, numeric),
+        'dtypes': profile.dtypes[ordered].to_string(),
+        'missing': profile.nulls[ordered].to_string(),
+        'sample': df[ordered].head(sample_rows).to_string(),
+    }
+    return ordered, numeric, blocks
+
+
+def _fit_columns(df, profile, ranked, max_columns, sample_rows, token_budget):
+    """The longest prefix of ranked (at least one column) whose rendered summary fits token_budget
+
+    Binary search on the prefix length: rendering a few columns is cheap, and
+    measuring the real text accounts for alignment padding, which per-column
+    estimates cannot.
+    """
+    def tokens(count):
+        return sum(estimate_tokens(text) for text in _render(df, profile, ranked[:count], sample_rows)[2].values())
+
+    low, high = 1, min(max_columns, len(ranked))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if tokens(middle) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    return ranked[:low]
+
+
+def summarize_dataset(df, max_columns=AI_SUMMARY_MAX_COLUMNS, sample_rows=AI_SUMMARY_SAMPLE_ROWS,
+                      token_budget=AI_SUMMARY_TOKEN_BUDGET, priority=(), cache=None, profile_cache=None,
+                      fingerprint=None):
+    """DatasetSummary of df, built from one profiling pass and reused from cache for unchanged data
+
+    Describes the most informative columns (at most max_columns) whose
+    summary fits token_budget; priority columns (e.g. those named in the
+    question) come first. profile_cache is the ProfileCache the profile is
+    looked up in and stored to.
+    """
+    start = time.perf_counter()
+    if fingerprint is None:
+        fingerprint = dataset_fingerprint(df)
+    priority = tuple(priority)
+    key = (fingerprint, max_columns, sample_rows, token_budget, priority)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    profile = profile_dataframe(df, approximate=len(df) > APPROX_PROFILE_ROWS, cache=profile_cache,
+                                fingerprint=fingerprint)
+    ranked = list(column_scores(df, profile, priority=priority).index)
+    shown, numeric, blocks = _render(df, profile, _fit_columns(df, profile, ranked, max_columns, sample_rows,
+                                                               token_budget), sample_rows)
+    first_min, first_max = _first_column_range(df, profile)
+    summary = DatasetSummary(
+        rows=len(df),
+        columns=list(df.columns),
+        shown_columns=shown,
+        numeric_columns=numeric,
+        all_numeric_columns=[col for col in df.columns if col in profile.numeric_stats.columns],
+        first_min=first_min,
+        first_max=first_max,
+        first_is_datetime=len(df.columns) > 0 and pd.api.types.is_datetime64_any_dtype(df.dtypes.iloc[0]),
+        tokens=sum(estimate_tokens(text) for text in blocks.values()),
+        token_budget=token_budget,
+        elapsed=time.perf_counter() - start,
+        **blocks
+    )
+    if cache is not None:
+        cache.put(key, summary)
+    return summary
@@ -0,0 +1,109 @@
+"""Point-budget downsampling for the Plotly time series charts.
+
+Line charts used to ship every row to the browser, which hangs on
+million-row datasets. Before plotting, a series is cut to the visible date
+range and, if it still has more points than the budget, reduced with
+Largest-Triangle-Three-Buckets (keeps the visual shape) or min/max buckets
+(keeps every spike). A narrow enough range is drawn at full resolution.
+Charts with many points are drawn with WebGL (Scattergl) instead of SVG.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Most points a single chart sends to the browser
+CHART_POINT_BUDGET = int(os.getenv('CHART_POINT_BUDGET', '2000'))
+
+DOWNSAMPLE_MODES = ['LTTB', 'Min/Max']
+
+# Points in a chart above which 'Auto' rendering switches from SVG to WebGL
+WEBGL_THRESHOLD = int(os.getenv('WEBGL_THRESHOLD', '5000'))
+
+RENDER_MODES = ['Auto', 'SVG', 'WebGL']
+
+
+def _as_float(values):
+    """Numeric view of x or y values (datetimes as nanoseconds), NaNs filled for point selection only"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype='float64')
+    values = pd.to_numeric(values, errors='coerce').astype('float64')
+    return values.interpolate(limit_direction='both').fillna(0.0).to_numpy()
+
+
+def lttb_indices(x, y, budget):
+    """Positions of the points Largest-Triangle-Three-Buckets keeps (always first and last)"""
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n) if budget >= n else np.unique([0, n - 1])
+    x, y = _as_float(x), _as_float(y)
+    edges = np.linspace(1, n - 1, budget - 1).astype(int)
+    # Averages of every bucket, used as the third triangle corner for the bucket before it
+    sums_x, sums_y = np.add.reduceat(x[1:n - 1], edges[:-1] - 1), np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    means_x = np.append(sums_x / counts, x[-1])
+    means_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(budget, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(budget - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        bx, by = x[start:stop], y[start:stop]
+        # Twice the triangle area between the previous point, each candidate and the next bucket's mean
+        areas = np.abs((x[previous] - means_x[bucket + 1]) * (by - y[previous])
+                       - (x[previous] - bx) * (means_y[bucket + 1] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax_indices(y, budget):
+    """Positions of the minimum and maximum of equal buckets (plus first and last), at most budget of them"""
+    n = len(y)
+    if budget >= n:
+        return np.arange(n)
+    y = _as_float(y)
+    size = -(-n // max(1, (budget - 2) // 2))
+    buckets = -(-n // size)  # every bucket, including the last, holds at least one real point
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def downsample(frame, x_col, y_col, budget=CHART_POINT_BUDGET, mode='LTTB', x_range=None):
+    """Rows of frame (sorted by x_col) to plot: those inside x_range, reduced to about budget points
+
+    Points are chosen on y_col and whole rows are kept, so other columns
+    (e.g. a rolling mean) can be drawn from the same subset. Returns
+    (subset, points_in_range).
+    """
+    if x_range is not None:
+        x = frame[x_col]
+        frame = frame.iloc[x.searchsorted(x_range[0], side='left'):x.searchsorted(x_range[1], side='right')]
+    total = len(frame)
+    if total <= budget:
+        return frame, total
+    if mode == 'Min/Max':
+        positions = minmax_indices(frame[y_col].to_numpy(), budget)
+    else:
+        positions = lttb_indices(frame[x_col].to_numpy(), frame[y_col].to_numpy(), budget)
+    return frame.iloc[positions], total
+
+
+def use_webgl(points, render_mode='Auto', threshold=WEBGL_THRESHOLD):
+    """Whether a chart of this many points is drawn with WebGL ('SVG' and 'WebGL' force the choice)"""
+    if render_mode == 'Auto':
+        return points > threshold
+    return render_mode == 'WebGL'
+
+
+def line_trace(webgl, **kwargs):
+    """go.Scattergl when webgl else go.Scatter, with the same arguments"""
+    return go.Scattergl(**kwargs) if webgl else go.Scatter(**kwargs)
@@ -0,0 +1,342 @@
+"""DuckDB connections for Streamlit sessions.
+
+DuckDB has no users or permissions: whatever shares a database can read all
+of it, through catalog views such as sqlite_master or qualified names. So
+every session gets its own DuckDB database, in memory or (with
+DUCKDB_STORAGE=disk) in a file under DUCKDB_SPILL_DIR that survives a
+reconnect, and works through cursors on it. Threads and memory are capped per
+session by DUCKDB_THREADS and DUCKDB_MEMORY_LIMIT, and large joins and sorts
+spill to the session's own temp directory.
+
+Each database may only touch the files in its session's directory (uploads
+being ingested, streamed samples): external access is disabled apart from
+that directory and the configuration is locked, so user SQL cannot read
+other sessions' files, attach their databases or lift the restriction.
+check_session_sql adds a statement-level check on top: only queries, DML and
+DDL are run, and catalog introspection and dynamic SQL are refused.
+
+In disk mode a reconnect finds its database through a random token in the
+URL. The session id, which names the database and directory and which user
+SQL can see (current_database()), is a one-way hash of that token, so
+knowing an id does not give access to the session. Sessions idle for longer
+than DUCKDB_SESSION_TTL_HOURS are released and their files removed by a
+background janitor.
+"""
+import hashlib
+import os
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+
+import duckdb
+
+# 'memory' keeps the original behaviour, 'disk' gives each session a database file
+DUCKDB_STORAGE = os.getenv('DUCKDB_STORAGE', 'memory').lower()
+DUCKDB_SPILL_DIR = os.getenv('DUCKDB_SPILL_DIR', os.path.join(tempfile.gettempdir(), 'ai_bi_dashboard_duckdb'))
+
+# Caps for each session's database: memory_limit is passed straight to DuckDB (e.g. '2GB'),
+# empty values keep DuckDB's defaults
+DUCKDB_MEMORY_LIMIT = os.getenv('DUCKDB_MEMORY_LIMIT', '')
+DUCKDB_THREADS = int(os.getenv('DUCKDB_THREADS', str(min(4, os.cpu_count() or 1))))
+
+# Idle session files older than this are deleted; the janitor runs every few minutes
+DUCKDB_SESSION_TTL_HOURS = float(os.getenv('DUCKDB_SESSION_TTL_HOURS', '24'))
+DUCKDB_CLEANUP_INTERVAL_SECONDS = int(os.getenv('DUCKDB_CLEANUP_INTERVAL_SECONDS', '600'))
+
+_SESSION_ID = re.compile(r'^[0-9a-f]{32}$')
+_SESSION_TOKEN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+_NAMESPACE_IN_TEXT = re.compile(r'session_[0-9a-f]{32}', re.I)
+
+# Statement types user SQL may contain (USE and SET are 'SET'; ATTACH, COPY, LOAD, CALL, ... are refused)
+USER_STATEMENT_TYPES = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER', 'EXPLAIN'}
+
+# Table functions that introspect the database or its settings, or run SQL built from strings
+_BLOCKED_FUNCTIONS = re.compile(r'^(query|query_table|duckdb_\w+|pragma_\w+)$')
+_DATABASE_FILES = re.compile(r'\.(duckdb|wal)\b', re.I)
+
+
+class SessionAccessError(PermissionError):
+    """User SQL reached outside the session's own data"""
+
+
+def new_session_token():
+    """Random secret that identifies a session in the URL"""
+    return secrets.token_urlsafe(32)
+
+
+def is_session_token(value):
+    """True for tokens produced by new_session_token"""
+    return bool(value) and bool(_SESSION_TOKEN.match(value))
+
+
+def session_id_for_token(token):
+    """Session id (database and directory names) for a URL token; the token cannot be recovered from it"""
+    return hashlib.sha256(token.encode('ascii')).hexdigest()[:32]
+
+
+def is_session_id(value):
+    """True for identifiers produced by session_id_for_token (safe to use in file names)"""
+    return bool(value) and bool(_SESSION_ID.match(value))
+
+
+def session_database_path(session_id, spill_dir=None):
+    """Database file backing a session in disk mode"""
+    return os.path.join(spill_dir or DUCKDB_SPILL_DIR, f"session_{session_id}.duckdb")
+
+
+def session_files_dir(session_id, spill_dir=None):
+    """The only directory a session's database may read or write files in"""
+    return os.path.join(spill_dir or DUCKDB_SPILL_DIR, f"session_{session_id}.files")
+
+
+def session_temp_dir(session_id, spill_dir=None):
+    """Where a session's database spills large joins and sorts"""
+    return os.path.join(spill_dir or DUCKDB_SPILL_DIR, f"session_{session_id}.tmp")
+
+
+def session_namespace(session_id):
+    """Catalog name of a session's database in disk mode"""
+    return f"session_{session_id}"
+
+
+def _token_texts(sql):
+    """(text, kind) of every DuckDB token in sql, comments and surrounding whitespace dropped"""
+    tokens = duckdb.tokenize(sql)
+    texts = []
+    for index, (start, kind) in enumerate(tokens):
+        end = tokens[index + 1][0] if index + 1 < len(tokens) else len(sql)
+        texts.append((sql[start:end].split('--')[0].split('/*')[0].strip(), kind.name))
+    return texts
+
+
+def _unquote(identifier):
+    if identifier.startswith('"') and identifier.endswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier
+
+
+def _catalog_names(con):
+    """Names that reach the built-in catalog: its schemas and the views usable without a qualifier
+
+    information_schema's views (tables, columns, ...) need their schema name,
+    so common column names like 'views' stay usable.
+    """
+    rows = con.execute("SELECT schema_name, view_name FROM duckdb_views() WHERE internal").fetchall()
+    names = {schema.lower() for schema, _ in rows} - {'main'}
+    return names | {view.lower() for schema, view in rows if schema != 'information_schema'}
+
+
+def check_session_sql(con, sql, session_id):
+    """Raise SessionAccessError unless sql only queries or changes the session's own tables
+
+    con is the session's cursor. Refuses statements other than queries, DML
+    and DDL (ATTACH, USE, SET, PRAGMA, COPY, ...), the built-in catalog views
+    and table functions, dynamic SQL, database file names and any mention of
+    another session, even inside a string.
+    """
+    own = session_namespace(session_id)
+    for statement in duckdb.extract_statements(sql):
+        if statement.type.name not in USER_STATEMENT_TYPES:
+            raise SessionAccessError(f"{statement.type.name} statements are not allowed here")
+
+    catalog = _catalog_names(con)
+    tokens = _token_texts(sql)
+    for index, (text, kind) in enumerate(tokens):
+        following = tokens[index + 1][0] if index + 1 < len(tokens) else ''
+        if kind == 'string_const':
+            if any(match.lower() != own for match in _NAMESPACE_IN_TEXT.findall(text)) or _DATABASE_FILES.search(text):
+                raise SessionAccessError("Queries may not refer to other sessions' data or database files")
+            continue
+        name = _unquote(text).lower()
+        if kind == 'keyword' and name == 'pragma':
+            raise SessionAccessError("PRAGMA statements are not allowed here")
+        if kind != 'identifier':
+            continue
+        if _NAMESPACE_IN_TEXT.fullmatch(name) and name != own:
+            raise SessionAccessError("Queries may not refer to other sessions' data")
+        if name in catalog or (following.startswith('(') and _BLOCKED_FUNCTIONS.match(name)):
+            raise SessionAccessError(f"{name} is not available in the SQL Cleaner")
+
+
+class DuckDBConnectionManager:
+    """One DuckDB database per session, each confined to its session's files; sessions get cursors on theirs"""
+
+    def __init__(self, storage=None, spill_dir=None, memory_limit=None, threads=None):
+        self.storage = storage or DUCKDB_STORAGE
+        self.spill_dir = spill_dir or DUCKDB_SPILL_DIR
+        self.memory_limit = DUCKDB_MEMORY_LIMIT if memory_limit is None else memory_limit
+        self.threads = threads or DUCKDB_THREADS
+
+        self._sessions = {}  # session_id -> {'database': connection, 'cursors': [...], 'last_used': float}
+        self._lock = threading.Lock()
+
+    def files_dir(self, session_id):
+        """Directory the session's uploads and generated files must go in for its database to read them"""
+        return session_files_dir(session_id, self.spill_dir)
+
+    def _open_database(self, session_id):
+        """The session's database, with file access limited to its directory and settings locked"""
+        files_dir = self.files_dir(session_id)
+        os.makedirs(files_dir, exist_ok=True)
+        config = {'threads': self.threads}
+        if self.memory_limit:
+            config['memory_limit'] = self.memory_limit
+        path = session_database_path(session_id, self.spill_dir) if self.storage == 'disk' else ':memory:'
+        database = duckdb.connect(path, config=config)
+        database.execute("SET temp_directory = ?", [session_temp_dir(session_id, self.spill_dir)])
+        database.execute("SET allowed_directories = ?", [[files_dir + os.sep]])
+        database.execute("SET enable_external_access = false")
+        database.execute("SET lock_configuration = true")
+        return database
+
+    def connect(self, session_id):
+        """Open a cursor on the session's database, creating the database if needed"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = {'database': self._open_database(session_id), 'cursors': [], 'last_used': time.time()}
+                self._sessions[session_id] = session
+
+            cursor = session['database'].cursor()
+            session['cursors'].append(cursor)
+            session['last_used'] = time.time()
+            return cursor
+
+    def is_open(self, session_id):
+        """True while the session's database is open and its cursors usable"""
+        with self._lock:
+            return session_id in self._sessions
+
+    def touch(self, session_id):
+        """Record activity so release_idle keeps the session"""
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions[session_id]['last_used'] = time.time()
+
+    def release(self, session_id):
+        """Close the session's cursors and database; in memory mode its files go too"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return
+            for cursor in session['cursors']:
+                cursor.close()
+            session['database'].close()
+            if self.storage != 'disk':
+                shutil.rmtree(self.files_dir(session_id), ignore_errors=True)
+            shutil.rmtree(session_temp_dir(session_id, self.spill_dir), ignore_errors=True)
+
+    def release_idle(self, ttl_seconds, now=None):
+        """Release every session idle for longer than ttl_seconds and return their ids"""
+        now = time.time() if now is None else now
+        with self._lock:
+            idle = [sid for sid, session in self._sessions.items() if now - session['last_used'] >= ttl_seconds]
+        for session_id in idle:
+            self.release(session_id)
+        return idle
+
+    def utilisation(self):
+        """Sessions, cursors, memory and storage in use across every session's database"""
+        with self._lock:
+            sessions = len(self._sessions)
+            cursors = sum(len(session['cursors']) for session in self._sessions.values())
+            memory_bytes = temp_bytes = tables = rows = 0
+            for session in self._sessions.values():
+                database = session['database']
+                memory, temp = database.execute(
+                    "SELECT COALESCE(SUM(memory_usage_bytes), 0), COALESCE(SUM(temporary_storage_bytes), 0) "
+                    "FROM duckdb_memory()"
+                ).fetchone()
+                count, size = database.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(estimated_size), 0) FROM duckdb_tables() WHERE NOT internal"
+                ).fetchone()
+                memory_bytes, temp_bytes, tables, rows = memory_bytes + memory, temp_bytes + temp, tables + count, rows + size
+        return {
+            'storage': self.storage,
+            'sessions': sessions,
+            'cursors': cursors,
+            'threads': self.threads,
+            'memory_limit': self.memory_limit or 'default',
+            'memory_mb': memory_bytes / 1024**2,
+            'spilled_mb': temp_bytes / 1024**2,
+            'tables': tables,
+            'rows': rows
+        }
+
+
+def touch_session(session_id, spill_dir=None):
+    """Mark a session's database file and files directory as recently used so the janitor keeps them"""
+    for path in (session_database_path(session_id, spill_dir), session_files_dir(session_id, spill_dir)):
+        if os.path.exists(path):
+            os.utime(path)
+
+
+def cleanup_idle_sessions(spill_dir=None, ttl_seconds=None, now=None):
+    """Delete session database files (and their WAL) and files directories idle for longer than the TTL
+
+    Returns the session ids that were removed.
+    """
+    spill_dir = spill_dir or DUCKDB_SPILL_DIR
+    ttl_seconds = DUCKDB_SESSION_TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+    now = time.time() if now is None else now
+    if not os.path.isdir(spill_dir):
+        return []
+
+    removed = []
+    for name in os.listdir(spill_dir):
+        session_id, extension = os.path.splitext(name[len('session_'):])
+        if not (name.startswith('session_') and extension in ('.duckdb', '.files')):
+            continue
+        path = os.path.join(spill_dir, name)
+        try:
+            if now - os.path.getmtime(path) < ttl_seconds:
+                continue
+            if extension == '.files':
+                shutil.rmtree(path)
+            else:
+                for stale in (path, path + '.wal'):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+        except OSError:
+            continue  # still in use or already removed by another process
+        if session_id not in removed:
+            removed.append(session_id)
+    return removed
+
+
+class SessionJanitor:
+    """Background thread that periodically releases idle sessions and removes their files"""
+
+    def __init__(self, manager=None, spill_dir=None, ttl_seconds=None, interval_seconds=None):
+        self.manager = manager
+        self.spill_dir = spill_dir or (manager.spill_dir if manager is not None else DUCKDB_SPILL_DIR)
+        self.ttl_seconds = DUCKDB_SESSION_TTL_HOURS * 3600 if ttl_seconds is None else ttl_seconds
+        self.interval_seconds = interval_seconds or DUCKDB_CLEANUP_INTERVAL_SECONDS
+        self.removed = 0
+        self.last_run = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='duckdb-session-janitor', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Release idle sessions, sweep the spill directory and return the removed session ids"""
+        if self.manager is not None:
+            self.manager.release_idle(self.ttl_seconds)
+        removed = cleanup_idle_sessions(self.spill_dir, self.ttl_seconds)
+        self.removed += len(removed)
+        self.last_run = time.time()
+        return removed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval_seconds)
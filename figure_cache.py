@@ -0,0 +1,112 @@
+"""Cached Plotly figures for the Visualizations page.
+
+Every rerun (any widget change) used to redo the pandas aggregation and the
+Plotly Express construction of every chart on the page. Figures are now
+stored as their serialized JSON, keyed by the dataset fingerprint, the chart
+type and the chart's parameters, in a process-wide LRU cache bounded by
+bytes. A hit rebuilds the figure from the JSON without validation (it was
+validated when first built), which takes about a millisecond. Charts shown
+next to a table keep the aggregated frame they were drawn from in the same
+entry, so the table needs no recomputation either.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+# Total size of serialized figures kept before evicting the least recently used
+FIGURE_CACHE_MB = int(os.getenv('FIGURE_CACHE_MB', '64'))
+
+
+class FigureCache:
+    """Size-bounded LRU cache of figure JSON (and data) keyed by (data fingerprint, chart, parameters)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached (figure JSON, data) for key (marking it recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload, data=None):
+        """Store figure JSON (and the frame it was drawn from) under key, evicting least recently used
+        figures to stay under max_bytes"""
+        size = len(payload)
+        if data is not None:
+            size += int(data.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = ((payload, data), size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def invalidate(self, data_fingerprint):
+        """Drop every figure drawn from the given data"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == data_fingerprint]:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """Drop every cached figure"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use for display"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'used_mb': self.current_bytes / 1024**2,
+            'max_mb': self.max_bytes / 1024**2
+        }
+
+
+def figure_key(fingerprint, chart, params):
+    """Cache key for a chart of a dataset; params is a dict of the chart's settings"""
+    return (fingerprint, chart, json.dumps(params, sort_keys=True, default=str))
+
+
+def cached_figure(cache, fingerprint, chart, params, build, with_data=False):
+    """The figure for (fingerprint, chart, params), calling build() only on a cache miss
+
+    build should do all of the chart's work (aggregation included) and return
+    a go.Figure. With with_data=True, build returns (figure, data) instead,
+    data being the DataFrame the figure was drawn from, and so does this
+    function; the cached data is shared, so callers must not modify it. With
+    cache=None the figure is always built.
+    """
+    if cache is None:
+        return build()
+    key = figure_key(fingerprint, chart, params)
+    entry = cache.get(key)
+    if entry is None:
+        built = build()
+        fig, data = built if with_data else (built, None)
+        cache.put(key, fig.to_json(), data)
+        return built
+    payload, data = entry
+    fig = go.Figure(json.loads(payload), _validate=False)
+    return (fig, data) if with_data else fig
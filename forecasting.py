@@ -0,0 +1,490 @@
+"""Vectorized forecasting engines for the AI-Enhanced Forecasting page.
+
+Besides the flat-line moving average and simple exponential smoothing, the
+page offers Holt-Winters double (level + trend) and triple (level + trend +
+additive seasonality) smoothing. Its parameters are fitted by grid search on
+one-step-ahead error, with every (alpha, beta, gamma) combination updated
+together as one NumPy vector at each time step.
+
+Batch mode forecasts one series per category (region, plant, ...): the data
+is pivoted into a (series x dates) matrix and every series is fitted in the
+same vectorized pass. Holt-Winters batches too large for one pass are split
+into chunks that run on a process pool when more than one CPU is available.
+
+Exponential smoothing is a first-order linear recurrence,
+level[t] = alpha * x[t] + (1 - alpha) * level[t-1]. Rather than stepping
+through it in Python, the series is split into fixed-size blocks: inside a
+block the recurrence is a scaled cumulative sum, and only the level carried
+between blocks is solved recursively (on a series block-size times shorter).
+Every row of a 2-D input is filtered at once, which is what lets a whole
+grid of alphas be evaluated in a single batched pass.
+"""
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Optional: SciPy's compiled IIR filter is used for the recurrence when installed
+try:
+    from scipy.signal import lfilter
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+# Alphas tried when the smoothing factor is fitted automatically
+ALPHA_GRID = np.round(np.arange(0.05, 0.96, 0.05), 2)
+
+# Smoothing values searched for each Holt-Winters parameter (7**3 combinations with seasonality)
+SMOOTHING_GRID = np.array([0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+
+# Points per row processed at once while fitting (bounds memory to about grid x chunk floats)
+FIT_CHUNK_POINTS = 4_000_000
+
+# Worker processes for batch Holt-Winters split into several chunks (1 keeps everything in-process)
+FORECAST_PROCESSES = int(os.getenv('FORECAST_PROCESSES', str(os.cpu_count() or 1)))
+
+# Largest series x candidates x season-length state fitted in one vectorized chunk
+FORECAST_BATCH_CELLS = int(os.getenv('FORECAST_BATCH_CELLS', '2000000'))
+
+BATCH_METHODS = ['Holt-Winters', 'Exponential Smoothing', 'Moving Average']
+
+# Largest decay growth allowed inside a block before the scaled cumsum could overflow
+_MAX_BLOCK_SCALE = 1e100
+_MAX_BLOCK_SIZE = 1024
+# Decays below this are indistinguishable from zero in float64 but keep blocks longer than one point
+_MIN_DECAY = 1e-18
+
+
+class Forecast:
+    """Point forecast of one method with its parameters, fit time and in-sample accuracy"""
+
+    def __init__(self, method, values, params, actual, fitted, fit_seconds):
+        self.method = method
+        self.values = np.asarray(values, dtype='float64')
+        self.params = params
+        self.fit_seconds = fit_seconds
+        self.metrics = accuracy(actual, fitted)
+
+    @property
+    def mape(self):
+        return self.metrics['mape']
+
+    @property
+    def rmse(self):
+        return self.metrics['rmse']
+
+    def tolist(self):
+        return self.values.tolist()
+
+
+def accuracy(actual, predicted):
+    """MAE, RMSE and MAPE (in %, over non-zero actuals) where both are defined, along the last axis
+
+    Returns floats for 1-D inputs and one value per row for 2-D inputs.
+    """
+    actual = np.asarray(actual, dtype='float64')
+    predicted = np.asarray(predicted, dtype='float64')
+    mask = np.isfinite(actual) & np.isfinite(predicted)
+    errors = np.where(mask, actual - predicted, 0.0)
+    nonzero = mask & (actual != 0)
+    percent = np.abs(np.divide(errors, actual, out=np.zeros_like(errors), where=nonzero))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics = {
+            'mae': np.abs(errors).sum(axis=-1) / mask.sum(axis=-1),
+            'rmse': np.sqrt((errors ** 2).sum(axis=-1) / mask.sum(axis=-1)),
+            'mape': percent.sum(axis=-1) / nonzero.sum(axis=-1) * 100
+        }
+    return {name: float(value) if np.ndim(value) == 0 else value for name, value in metrics.items()}
+
+
+def _block_size(decay):
+    """Largest block for which decay ** -block stays finite and well scaled"""
+    if decay >= 1:
+        return _MAX_BLOCK_SIZE
+    return int(max(1, min(_MAX_BLOCK_SIZE, math.log(_MAX_BLOCK_SCALE) / -math.log(decay))))
+
+
+def linear_recurrence(u, decay, initial):
+    """Solve y[:, t] = u[:, t] + decay * y[:, t-1] for every row, with y[:, -1] = initial
+
+    u is (rows, n); decay and initial are per row. Returns an array like u.
+    """
+    u = np.asarray(u, dtype='float64')
+    decay = np.maximum(np.asarray(decay, dtype='float64').reshape(-1), _MIN_DECAY)
+    initial = np.asarray(initial, dtype='float64').reshape(-1)
+    rows, n = u.shape
+    if n == 0:
+        return u.copy()
+
+    if HAS_SCIPY:
+        out = np.empty_like(u)
+        for row in range(rows):
+            out[row], _ = lfilter([1.0], [1.0, -decay[row]], u[row], zi=[decay[row] * initial[row]])
+        return out
+
+    block = _block_size(float(decay.min()))
+    blocks = -(-n // block)
+    padded = np.zeros((rows, blocks * block))
+    padded[:, :n] = u
+    padded = padded.reshape(rows, blocks, block)
+
+    steps = np.arange(block)
+    d = decay[:, None, None]
+    # Within a block starting from zero: y[i] = d**i * cumsum(u[k] * d**-k)
+    partial = np.cumsum(padded * d ** -steps, axis=2) * d ** steps
+
+    # Level entering each block: the block ends form the same recurrence with decay**block
+    if blocks == 1:
+        entering = initial[:, None]
+    else:
+        carried = linear_recurrence(partial[:, :-1, -1], decay ** block, initial)
+        entering = np.concatenate([initial[:, None], carried], axis=1)
+
+    levels = partial + entering[:, :, None] * d ** (steps + 1)
+    return levels.reshape(rows, -1)[:, :n]
+
+
+def exponential_smoothing_levels(values, alpha):
+    """Smoothed levels of a 1-D series (level[0] = values[0])"""
+    values = np.asarray(values, dtype='float64')
+    if len(values) == 0:
+        return values
+    alpha = float(np.clip(alpha, 1e-6, 1.0))
+    if alpha == 1.0:
+        return values.copy()
+    return linear_recurrence(alpha * values[None, :], 1 - alpha, values[:1])[0]
+
+
+def _observed(series):
+    """The series as float64 with missing values (e.g. gaps left by resampling) dropped"""
+    values = np.asarray(series, dtype='float64')
+    return values[~np.isnan(values)]
+
+
+def fit_alpha(values, grid=ALPHA_GRID, chunk_points=FIT_CHUNK_POINTS):
+    """Pick the alpha with the lowest one-step-ahead squared error, scoring the whole grid in one pass
+
+    Returns (best_alpha, sse) where sse holds the error for every grid value.
+    The series is streamed in chunks with the level carried over, so memory
+    stays bounded by len(grid) * chunk even for 10M-point series. Missing
+    values are skipped.
+    """
+    values = _observed(values)
+    alphas = np.clip(np.asarray(grid, dtype='float64'), 1e-6, 1 - 1e-6)
+    sse = np.zeros(len(alphas))
+    if len(values) < 2:
+        return float(alphas[0]), sse
+
+    level = np.full(len(alphas), values[0])
+    chunk = max(1, chunk_points // len(alphas))
+    for start in range(0, len(values), chunk):
+        x = values[start:start + chunk]
+        levels = linear_recurrence(alphas[:, None] * x[None, :], 1 - alphas, level)
+        # The one-step-ahead forecast for x[t] is the level after x[t-1]
+        previous = np.concatenate([level[:, None], levels[:, :-1]], axis=1)
+        sse += ((x[None, :] - previous) ** 2).sum(axis=1)
+        level = levels[:, -1]
+    return float(alphas[np.argmin(sse)]), sse
+
+
+def fit_moving_average(series, window=7, periods=30):
+    """Moving average Forecast; the one-step prediction is the mean of the previous window
+
+    Missing values are dropped first, so gaps never reach the forecast.
+    """
+    start = time.perf_counter()
+    values = pd.Series(_observed(series))
+    means = values.rolling(window=window).mean()
+    return Forecast('Moving Average', [means.iloc[-1]] * periods, {'window': window},
+                    values, means.shift(1), time.perf_counter() - start)
+
+
+def fit_exponential_smoothing(series, alpha=0.3, periods=30):
+    """Simple exponential smoothing Forecast; alpha='auto' fits it on one-step-ahead error
+
+    Missing values are dropped first, so gaps never reach the forecast.
+    """
+    start = time.perf_counter()
+    values = _observed(series)
+    if alpha == 'auto':
+        alpha, _ = fit_alpha(values)
+    levels = exponential_smoothing_levels(values, alpha)
+    fitted = np.concatenate([[np.nan], levels[:-1]])
+    return Forecast('Exponential Smoothing', [levels[-1]] * periods, {'alpha': alpha},
+                    values, fitted, time.perf_counter() - start)
+
+
+def holt_winters_pass(values, alpha, beta, gamma, season_length=None, keep_history=False):
+    """Run additive Holt-Winters over every series for every parameter candidate at once
+
+    values is (series, n); alpha, beta and gamma broadcast against it to
+    (series, candidates), e.g. (1, grid) to score a grid or (series, 1) for
+    per-series parameters. The loop runs over time only. Returns
+    (sse, history, level, trend, seasonal); history is None unless requested,
+    otherwise a dict of per-step 'fitted' predictions and the 'level', 'trend'
+    and 'season' (seasonal value written at that step) after each step.
+    """
+    m = season_length or 0
+    shape = np.broadcast_shapes((values.shape[0], 1), np.shape(alpha), np.shape(beta), np.shape(gamma))
+    if m:
+        first_season = values[:, :m].mean(axis=1, keepdims=True)
+        level = np.broadcast_to(first_season, shape).copy()
+        trend = np.broadcast_to((values[:, m:2 * m].mean(axis=1, keepdims=True) - first_season) / m, shape).copy()
+        seasonal = np.broadcast_to((values[:, :m] - first_season)[:, None, :], shape + (m,)).copy()
+        first = m
+    else:
+        level = np.broadcast_to(values[:, :1], shape).copy()
+        trend = np.broadcast_to(values[:, 1:2] - values[:, :1], shape).copy()
+        seasonal = np.zeros(shape + (1,))
+        first = 1
+
+    sse = np.zeros(shape)
+    history = None
+    if keep_history:
+        history = {name: np.full(shape + (values.shape[1],), np.nan)
+                   for name in ('fitted', 'level', 'trend', 'season')}
+        history['level'][..., first - 1] = level
+        history['trend'][..., first - 1] = trend
+        history['season'][..., :first] = seasonal if m else 0.0
+    for t in range(first, values.shape[1]):
+        x = values[:, t, None]
+        position = t % m if m else 0
+        season = seasonal[..., position]
+        prediction = level + trend + season
+        sse += (x - prediction) ** 2
+
+        new_level = alpha * (x - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        if m:
+            seasonal[..., position] = gamma * (x - new_level) + (1 - gamma) * season
+        level = new_level
+        if keep_history:
+            history['fitted'][..., t] = prediction
+            history['level'][..., t] = level
+            history['trend'][..., t] = trend
+            history['season'][..., t] = seasonal[..., position]
+    return sse, history, level, trend, seasonal
+
+
+def _parameter_grid(season_length, grid=SMOOTHING_GRID):
+    """Every (alpha, beta, gamma) candidate as three 1-D arrays (gamma is 0 without seasonality)"""
+    gammas = grid if season_length else [0.0]
+    return np.array(list(itertools.product(grid, grid, gammas))).T
+
+
+def _check_holt_winters_length(points, season_length):
+    if season_length and points < 2 * season_length:
+        raise ValueError(f"Seasonality of {season_length} periods needs at least {2 * season_length} points, "
+                         f"got {points}")
+    if points < 3:
+        raise ValueError(f"Holt-Winters needs at least 3 points, got {points}")
+
+
+def fit_holt_winters_matrix(values, periods=30, season_length=None, grid=SMOOTHING_GRID):
+    """Fit Holt-Winters to every row of a (series, n) matrix in one vectorized pass
+
+    Each series gets its own (alpha, beta, gamma) from grid, chosen by the
+    lowest one-step-ahead squared error. Returns (forecasts, params, fitted)
+    with forecasts (series, periods), params a dict of per-series arrays and
+    fitted the one-step predictions (series, n).
+    """
+    values = np.asarray(values, dtype='float64')
+    alpha, beta, gamma = _parameter_grid(season_length, grid)
+    sse = holt_winters_pass(values, alpha[None, :], beta[None, :], gamma[None, :], season_length)[0]
+    best = np.argmin(sse, axis=1)
+    alpha, beta, gamma = alpha[best, None], beta[best, None], gamma[best, None]
+
+    _, history, level, trend, seasonal = holt_winters_pass(values, alpha, beta, gamma, season_length, keep_history=True)
+    steps = np.arange(1, periods + 1)
+    forecasts = level + steps * trend
+    if season_length:
+        forecasts += seasonal[:, 0, (values.shape[1] + steps - 1) % season_length]
+    params = {'alpha': alpha[:, 0], 'beta': beta[:, 0]}
+    if season_length:
+        params['gamma'] = gamma[:, 0]
+    return forecasts, params, history['fitted'][:, 0, :]
+
+
+def fit_holt_winters(series, periods=30, season_length=None, grid=SMOOTHING_GRID):
+    """Holt-Winters Forecast: double smoothing, or triple with additive seasonality of season_length
+
+    alpha, beta and (with seasonality) gamma are chosen from grid by the lowest
+    one-step-ahead squared error, all combinations scored in one pass.
+    Raises ValueError when the series is too short for the requested model.
+    """
+    start = time.perf_counter()
+    values = np.asarray(series, dtype='float64')
+    if np.isnan(values).any():
+        raise ValueError("Holt-Winters needs a series without missing values")
+    _check_holt_winters_length(len(values), season_length)
+
+    forecasts, params, fitted = fit_holt_winters_matrix(values[None, :], periods, season_length, grid)
+    params = {name: float(value[0]) for name, value in params.items()}
+    if season_length:
+        params['season_length'] = season_length
+    method = 'Holt-Winters (triple)' if season_length else 'Holt-Winters (double)'
+    return Forecast(method, forecasts[0], params, values, fitted[0], time.perf_counter() - start)
+
+
+def fit_exponential_smoothing_matrix(values, alpha=0.3, periods=30, grid=ALPHA_GRID):
+    """Simple exponential smoothing for every row of a (series, n) matrix
+
+    alpha='auto' picks each series' alpha from grid, scoring all series x grid
+    rows in one batched recurrence. Returns (forecasts, params, fitted).
+    """
+    values = np.asarray(values, dtype='float64')
+    series, points = values.shape
+    if alpha == 'auto':
+        alphas = np.clip(np.asarray(grid, dtype='float64'), 1e-6, 1 - 1e-6)
+        levels = linear_recurrence((alphas[None, :, None] * values[:, None, :]).reshape(-1, points),
+                                   np.tile(1 - alphas, series), np.repeat(values[:, 0], len(alphas)))
+        levels = levels.reshape(series, len(alphas), points)
+        sse = ((values[:, None, 1:] - levels[:, :, :-1]) ** 2).sum(axis=2)
+        alpha = alphas[np.argmin(sse, axis=1)]
+    else:
+        alpha = np.full(series, float(np.clip(alpha, 1e-6, 1 - 1e-6)))
+
+    levels = linear_recurrence(alpha[:, None] * values, 1 - alpha, values[:, 0])
+    fitted = np.concatenate([np.full((series, 1), np.nan), levels[:, :-1]], axis=1)
+    return np.repeat(levels[:, -1:], periods, axis=1), {'alpha': alpha}, fitted
+
+
+def fit_moving_average_matrix(values, window=7, periods=30):
+    """Moving average for every row of a (series, n) matrix; returns (forecasts, params, fitted)"""
+    means = pd.DataFrame(np.asarray(values, dtype='float64').T).rolling(window=window).mean().to_numpy().T
+    fitted = np.concatenate([np.full((means.shape[0], 1), np.nan), means[:, :-1]], axis=1)
+    return np.repeat(means[:, -1:], periods, axis=1), {'window': np.full(means.shape[0], window)}, fitted
+
+
+def series_matrix(df, date_col, value_col, group_col, freq='D', agg='mean', dates=None):
+    """value_col aggregated per period and group as a wide (periods x groups) DataFrame
+
+    dates can pass an already parsed date column (aligned with df's rows).
+    Missing periods are interpolated within each series so every column is a
+    gap-free series; groups with no values at all are dropped.
+    """
+    dates = pd.to_datetime(df[date_col], errors='coerce') if dates is None else dates
+    frame = pd.DataFrame({'date': np.asarray(dates), 'group': df[group_col].to_numpy(),
+                          'value': df[value_col].to_numpy()})
+    wide = frame.groupby([pd.Grouper(key='date', freq=freq), 'group'], observed=True)['value'].agg(agg).unstack()
+    wide = wide.reindex(pd.date_range(wide.index.min(), wide.index.max(), freq=freq))
+    return wide.dropna(axis=1, how='all').interpolate(limit_direction='both')
+
+
+def _fit_chunk(task):
+    """Fit one chunk of series (runs in a worker process for pooled batches)"""
+    method, values, periods, season_length, window, alpha = task
+    start = time.perf_counter()
+    if method == 'Holt-Winters':
+        output = fit_holt_winters_matrix(values, periods, season_length)
+    elif method == 'Exponential Smoothing':
+        output = fit_exponential_smoothing_matrix(values, alpha, periods)
+    elif method == 'Moving Average':
+        output = fit_moving_average_matrix(values, window, periods)
+    else:
+        raise ValueError(f"Unknown batch forecasting method: {method}")
+    return output + (time.perf_counter() - start,)
+
+
+class BatchForecast:
+    """Forecasts for many series, as a long-format table plus a per-series timing summary"""
+
+    def __init__(self, method, group_col, names, last_date, forecasts, params, metrics, fit_seconds, points, mode,
+                 elapsed, freq='D'):
+        self.method = method
+        self.group_col = group_col
+        self.names = names
+        self.last_date = last_date
+        self.forecasts = forecasts
+        self.params = params
+        self.metrics = metrics
+        self.fit_seconds = fit_seconds
+        self.points = points
+        self.mode = mode
+        self.elapsed = elapsed
+        self.freq = freq
+
+    @property
+    def series_count(self):
+        return len(self.names)
+
+    def long_table(self):
+        """One row per (series, forecast date)"""
+        periods = self.forecasts.shape[1]
+        dates = pd.date_range(self.last_date, periods=periods + 1, freq=self.freq)[1:]
+        return pd.DataFrame({
+            self.group_col: np.repeat(np.asarray(self.names, dtype=object), periods),
+            'Date': np.tile(dates, self.series_count),
+            'Forecast': self.forecasts.ravel(),
+            'Method': self.method
+        })
+
+    def timings(self):
+        """Per-series fit time (a share of its chunk's time when fitted together), accuracy and parameters"""
+        return pd.DataFrame({
+            self.group_col: self.names,
+            'Points': self.points,
+            'Fit (ms)': self.fit_seconds * 1000,
+            'MAPE (%)': self.metrics['mape'],
+            'RMSE': self.metrics['rmse'],
+            'Parameters': [', '.join(f"{name}={values[i]:g}" for name, values in self.params.items())
+                           for i in range(self.series_count)],
+            'Mode': self.mode
+        })
+
+
+def forecast_batch(wide, method='Holt-Winters', periods=30, season_length=None, window=7, alpha=0.3,
+                   group_col='Series', processes=None):
+    """Forecast every column of a wide (dates x series) table, e.g. from series_matrix
+
+    Series are fitted together in vectorized chunks of at most
+    FORECAST_BATCH_CELLS state values; Holt-Winters batches that need several
+    chunks use a pool of FORECAST_PROCESSES workers.
+    """
+    start = time.perf_counter()
+    values = wide.to_numpy(dtype='float64').T
+    series, points = values.shape
+    if method == 'Holt-Winters':
+        _check_holt_winters_length(points, season_length)
+        cells = len(_parameter_grid(season_length)[0]) * max(season_length or 1, 1)
+    elif method == 'Exponential Smoothing':
+        cells = (len(ALPHA_GRID) if alpha == 'auto' else 1) * points
+    else:
+        cells = points
+
+    per_chunk = max(1, FORECAST_BATCH_CELLS // cells)
+    tasks = [(method, values[i:i + per_chunk], periods, season_length, window, alpha)
+             for i in range(0, series, per_chunk)]
+    processes = FORECAST_PROCESSES if processes is None else processes
+    workers = min(processes, len(tasks))
+    if method == 'Holt-Winters' and workers > 1:
+        mode = f'process pool ({workers} workers)'
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_fit_chunk, tasks))
+    else:
+        mode = 'vectorized'
+        outputs = [_fit_chunk(task) for task in tasks]
+
+    forecasts = np.concatenate([output[0] for output in outputs])
+    params = {name: np.concatenate([output[1][name] for output in outputs]) for name in outputs[0][1]}
+    fitted = np.concatenate([output[2] for output in outputs])
+    fit_seconds = np.concatenate([np.full(len(task[1]), output[3] / len(task[1]))
+                                  for task, output in zip(tasks, outputs)])
+    return BatchForecast(
+        method=method,
+        group_col=group_col,
+        names=list(wide.columns),
+        last_date=wide.index[-1],
+        forecasts=forecasts,
+        params=params,
+        metrics=accuracy(values, fitted),
+        fit_seconds=fit_seconds,
+        points=np.full(series, points),
+        mode=mode,
+        elapsed=time.perf_counter() - start,
+        freq=wide.index.freqstr or 'D'
+    )
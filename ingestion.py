@@ -0,0 +1,334 @@
+"""Upload ingestion shared by app.py and sql_csv_cleaner.py.
+
+Streamlit reruns the whole script on every widget change, so parsed uploads
+are cached by a hash of the file content and the parse options. Repeat reruns
+on the same file become a dictionary lookup instead of a full re-parse.
+
+CSV and Parquet files are read by DuckDB rather than pandas: its reader sniffs
+delimiters (the tab-separated tests/data/sales_sample.csv included), runs in
+parallel and can load straight into a table that SQL pages query without ever
+building a DataFrame.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+# Optional: lets DuckDB read uploads straight from memory instead of a spooled file
+try:
+    import fsspec  # noqa: F401
+    HAS_FSSPEC = True
+except ImportError:
+    HAS_FSSPEC = False
+
+# Total memory the parsed-upload cache may hold before evicting old entries
+INGESTION_CACHE_MB = int(os.getenv('INGESTION_CACHE_MB', '512'))
+
+# Where uploads are spooled before DuckDB reads them
+INGESTION_SPOOL_DIR = os.getenv('INGESTION_SPOOL_DIR', tempfile.gettempdir())
+INGESTION_SPOOL = os.getenv('INGESTION_SPOOL', '1') != '0'
+
+# File types DuckDB can ingest natively (everything else goes through pandas)
+DUCKDB_NATIVE_EXTENSIONS = ('.csv', '.tsv', '.txt', '.parquet')
+
+
+def content_fingerprint(data, **options):
+    """Hash of the raw file bytes together with the options used to parse them"""
+    digest = hashlib.blake2b(data, digest_size=16)
+    digest.update(repr(sorted(options.items())).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def frame_nbytes(df):
+    """Deep memory footprint of a DataFrame in bytes"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+class IngestionCache:
+    """Size-bounded LRU cache of parsed uploads keyed by content fingerprint"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Streamlit gives every upload a file_id, so reruns can skip re-hashing
+        self._file_digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached DataFrame for key (marking it recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        """Store df under key, evicting least recently used entries to stay under max_bytes"""
+        size = frame_nbytes(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self):
+        """Drop every cached upload"""
+        with self._lock:
+            self._entries.clear()
+            self._file_digests.clear()
+            self.current_bytes = 0
+
+    def fingerprint(self, uploaded_file, **options):
+        """Content fingerprint of an uploaded file, memoized per Streamlit file_id"""
+        file_id = getattr(uploaded_file, 'file_id', None)
+        memo_key = (file_id, repr(sorted(options.items())))
+        if file_id is not None:
+            with self._lock:
+                if memo_key in self._file_digests:
+                    return self._file_digests[memo_key]
+        digest = content_fingerprint(uploaded_file.getvalue(), **options)
+        if file_id is not None:
+            with self._lock:
+                self._file_digests[memo_key] = digest
+                while len(self._file_digests) > 256:
+                    self._file_digests.popitem(last=False)
+        return digest
+
+    def stats(self):
+        """Hit/miss counters and memory use for display"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'used_mb': self.current_bytes / 1024**2,
+            'max_mb': self.max_bytes / 1024**2
+        }
+
+
+def read_upload(uploaded_file, cache=None, con=None, spool_dir=None, **options):
+    """Parse an uploaded CSV, Parquet or Excel file, reusing the cached result for unchanged content
+
+    When a DuckDB connection is given, CSV and Parquet files are parsed by
+    DuckDB's sniffing reader (spooled to spool_dir, which con must be allowed
+    to read); Excel (and any file when con is None) goes through pandas. Returns (df, from_cache). Cached frames are shared, so
+    callers get a shallow copy and must assign new columns rather than modify
+    values in place.
+    """
+    name = uploaded_file.name.lower()
+    use_duckdb = con is not None and supports_duckdb_ingestion(name) and not options
+    if use_duckdb:
+        kind = 'duckdb'
+    elif name.endswith('.parquet'):
+        kind = 'parquet'
+    elif name.endswith(('.xlsx', '.xls')):
+        kind = 'excel'
+    else:
+        kind = 'csv'
+    options = dict(options, kind=kind)
+
+    key = cache.fingerprint(uploaded_file, **options) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached.copy(deep=False), True
+
+    parse_options = {k: v for k, v in options.items() if k != 'kind'}
+    if use_duckdb:
+        df = read_upload_with_duckdb(con, uploaded_file, spool_dir=spool_dir)
+    else:
+        buffer = BytesIO(uploaded_file.getvalue())
+        if kind == 'csv':
+            df = pd.read_csv(buffer, **parse_options)
+        elif kind == 'parquet':
+            df = pd.read_parquet(buffer, **parse_options)
+        else:
+            df = pd.read_excel(buffer, **parse_options)
+
+    if cache is not None:
+        cache.put(key, df)
+        return df.copy(deep=False), False
+    return df, False
+
+
+def quote_identifier(name):
+    """Quote a table or column name for use in DuckDB SQL"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def release_table_name(con, table_name):
+    """Drop whatever currently owns table_name: a registered DataFrame or a table"""
+    con.unregister(table_name)
+    con.execute(f"DROP TABLE IF EXISTS {quote_identifier(table_name)}")
+
+
+def register_frame(con, table_name, df):
+    """Register a pandas DataFrame under table_name, replacing any earlier table"""
+    release_table_name(con, table_name)
+    con.register(table_name, df)
+
+
+def supports_duckdb_ingestion(file_name):
+    """True when DuckDB can read the file itself (CSV-like or Parquet)"""
+    return file_name.lower().endswith(DUCKDB_NATIVE_EXTENSIONS)
+
+
+class DuckDBUpload:
+    """An upload loaded into a DuckDB table; a DataFrame is only built when asked for"""
+
+    def __init__(self, con, table_name, fingerprint, file_name):
+        self.con = con
+        self.table_name = table_name
+        self.fingerprint = fingerprint
+        self.file_name = file_name
+        self.revision = None
+        self._frame = None
+        self._schema = None
+        self._row_count = None
+        self._overview = None
+
+    @property
+    def table(self):
+        return quote_identifier(self.table_name)
+
+    @property
+    def data_key(self):
+        """Identifies the table's current contents: the file fingerprint until SQL modifies it"""
+        if self.revision is None:
+            return self.fingerprint
+        return f"{self.fingerprint}:{self.revision}"
+
+    def mark_modified(self):
+        """Record that a statement may have changed the table: new data_key, nothing derived kept"""
+        self.revision = uuid.uuid4().hex
+        self._frame = None
+        self._schema = None
+        self._row_count = None
+        self._overview = None
+
+    def schema_frame(self):
+        """Empty DataFrame with the table's columns and dtypes (no rows fetched)"""
+        if self._schema is None:
+            self._schema = self.con.execute(f"SELECT * FROM {self.table} LIMIT 0").fetchdf()
+        return self._schema
+
+    @property
+    def columns(self):
+        return self.schema_frame().columns
+
+    @property
+    def row_count(self):
+        if self._row_count is None:
+            self._row_count = self.con.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        return self._row_count
+
+    def to_pandas(self, keep=True):
+        """The table as a DataFrame, materialized once and reused while keep is True
+
+        keep=False fetches a copy without holding on to it (e.g. for a one-off
+        export) and is free if the DataFrame is already held.
+        """
+        if self._frame is not None:
+            return self._frame
+        frame = self.con.execute(f"SELECT * FROM {self.table}").fetchdf()
+        if keep:
+            self._frame = frame
+        return frame
+
+    def release_pandas(self):
+        """Drop the DataFrame kept by to_pandas(), leaving the data only in DuckDB"""
+        self._frame = None
+
+    def overview(self):
+        """Row, missing-cell and duplicate counts computed inside DuckDB"""
+        if self._overview is not None:
+            return self._overview
+        missing = ' + '.join(f"COUNT(*) - COUNT({quote_identifier(col)})" for col in self.columns) or '0'
+        total, nulls = self.con.execute(f"SELECT COUNT(*), {missing} FROM {self.table}").fetchone()
+        distinct = self.con.execute(f"SELECT COUNT(*) FROM (SELECT DISTINCT * FROM {self.table})").fetchone()[0]
+        self._row_count = total
+        self._overview = {'rows': total, 'columns': len(self.columns), 'missing': int(nulls),
+                          'duplicates': total - distinct}
+        return self._overview
+
+
+def load_into_duckdb(con, uploaded_file, table_name='uploaded_data', spool=INGESTION_SPOOL, spool_dir=None,
+                     fingerprint=None):
+    """Load an uploaded CSV or Parquet file directly into a DuckDB table
+
+    DuckDB's parallel reader sniffs the delimiter, header and column types, so
+    no pandas DataFrame is built. With spool=True (or when fsspec is missing)
+    the bytes are written to a temporary file in spool_dir (default
+    INGESTION_SPOOL_DIR; it must be readable by con) that the reader can split
+    across threads; otherwise DuckDB reads the in-memory buffer.
+    """
+    name = uploaded_file.name.lower()
+    is_parquet = name.endswith('.parquet')
+    reader = 'read_parquet' if is_parquet else 'read_csv_auto'
+    table = quote_identifier(table_name)
+    if fingerprint is None:
+        fingerprint = content_fingerprint(uploaded_file.getvalue(), kind='duckdb')
+
+    release_table_name(con, table_name)
+    if spool or not HAS_FSSPEC:
+        fd, path = tempfile.mkstemp(suffix=os.path.splitext(name)[1], dir=spool_dir or INGESTION_SPOOL_DIR)
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(uploaded_file.getbuffer())
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM {reader}(?)", [path])
+        finally:
+            os.remove(path)
+    else:
+        buffer = BytesIO(uploaded_file.getvalue())
+        relation = con.read_parquet(buffer) if is_parquet else con.read_csv(buffer)
+        relation.create(table_name)
+
+    return DuckDBUpload(con, table_name, fingerprint, uploaded_file.name)
+
+
+def ensure_duckdb_upload(con, uploaded_file, current=None, cache=None, table_name='uploaded_data', spool_dir=None):
+    """Return the DuckDBUpload for uploaded_file, reloading only when its content changed
+
+    current is the handle from the previous rerun; it is reused as long as the
+    file fingerprint and connection match, so reruns never re-read the file.
+    spool_dir is passed on to load_into_duckdb.
+    """
+    if cache is not None:
+        fingerprint = cache.fingerprint(uploaded_file, kind='duckdb')
+    else:
+        fingerprint = content_fingerprint(uploaded_file.getvalue(), kind='duckdb')
+    if (current is not None and current.fingerprint == fingerprint
+            and current.con is con and current.table_name == table_name):
+        return current
+    return load_into_duckdb(con, uploaded_file, table_name, spool_dir=spool_dir, fingerprint=fingerprint)
+
+
+def read_upload_with_duckdb(con, uploaded_file, spool=INGESTION_SPOOL, spool_dir=None):
+    """Parse an upload with DuckDB's reader and return it as a DataFrame
+
+    For pages that need pandas anyway: the parse is parallel and sniffed, and the
+    staging table is dropped once the DataFrame has been fetched.
+    """
+    staging = '_upload_staging'
+    upload = load_into_duckdb(con, uploaded_file, staging, spool=spool, spool_dir=spool_dir)
+    try:
+        return upload.to_pandas()
+    finally:
+        release_table_name(con, staging)
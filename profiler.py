@@ -0,0 +1,302 @@
+"""Single-pass dataset profiling for the EDA and SQL Cleaner statistics views.
+
+The pages used to scan a DataFrame a dozen times per rerun (isnull, count,
+nunique per column, duplicated, describe). Here DuckDB computes every
+per-column statistic and the duplicate-row count in one aggregate query, and
+the profile is cached by dataset fingerprint so reruns do no scanning at all.
+
+Uploads already loaded into DuckDB are profiled in place (profile_table), so
+the SQL Cleaner never builds a DataFrame just to show statistics.
+
+Approximate mode swaps exact distinct counts and quantiles for HyperLogLog
+(approx_count_distinct) and t-digest sketches (approx_quantile), which keeps
+huge tables fast at the cost of a small relative error.
+"""
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from ingestion import quote_identifier
+
+# Number of profiles kept (they are small: a few rows per column)
+PROFILE_CACHE_ENTRIES = int(os.getenv('PROFILE_CACHE_ENTRIES', '32'))
+
+# Above this many rows the pages default to approximate profiling
+APPROX_PROFILE_ROWS = int(os.getenv('APPROX_PROFILE_ROWS', '1000000'))
+
+_QUANTILES = [0.25, 0.5, 0.75]
+_fingerprint_memo = {}
+_fingerprint_lock = threading.Lock()
+
+
+def frame_to_arrow(df):
+    """pyarrow Table for df's columns; object columns mixing types are stringified, NULLs kept"""
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        fixed = df.copy(deep=False)
+        for col in df.columns[df.dtypes == object]:
+            values = df[col]
+            fixed[col] = values.where(values.isna(), values.astype(str)).astype(object)
+        return pa.Table.from_pandas(fixed, preserve_index=False)
+
+
+def _hash_arrow(digest, table):
+    """Feed every column buffer (with its offset and length) into digest"""
+    for column in table.columns:
+        for chunk in column.chunks:
+            digest.update(repr((chunk.offset, len(chunk), str(chunk.type))).encode('utf-8'))
+            for buffer in chunk.buffers():
+                if buffer is not None:
+                    digest.update(buffer)
+            if pa.types.is_dictionary(chunk.type):
+                # buffers() only covers the codes of a dictionary (category) column
+                for buffer in chunk.dictionary.buffers():
+                    if buffer is not None:
+                        digest.update(buffer)
+
+
+def dataset_fingerprint(df, table=None):
+    """Content hash of a DataFrame's values, index, column names and dtypes
+
+    Hashes the raw Arrow buffers rather than hashing values one by one. Memoized
+    per DataFrame object while its shape and dtypes are unchanged, so repeated
+    calls during reruns are free. Pass table when the Arrow form is already built.
+    """
+    layout = (df.shape, tuple(map(str, df.columns)), tuple(map(str, df.dtypes)))
+    with _fingerprint_lock:
+        memo = _fingerprint_memo.get(id(df))
+        if memo is not None and memo[0]() is df and memo[1] == layout:
+            return memo[2]
+
+    digest = hashlib.blake2b(repr(layout).encode('utf-8'), digest_size=16)
+    if isinstance(df.index, pd.RangeIndex):
+        digest.update(repr(df.index).encode('utf-8'))
+    else:
+        digest.update(pd.util.hash_pandas_object(df.index).values.tobytes())
+    _hash_arrow(digest, table if table is not None else frame_to_arrow(df))
+    fingerprint = digest.hexdigest()
+
+    key = id(df)
+    with _fingerprint_lock:
+        _fingerprint_memo[key] = (weakref.ref(df, lambda _, key=key: _fingerprint_memo.pop(key, None)),
+                                  layout, fingerprint)
+    return fingerprint
+
+
+def _column_kind(dtype):
+    """Coarse type family used for the feature counts"""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_numeric_dtype(dtype):
+        return 'numeric'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    return 'categorical'
+
+
+class DataProfile:
+    """Everything the statistics views show about one dataset"""
+
+    def __init__(self, rows, dtypes, non_null, distinct, duplicates, numeric_stats, memory_bytes,
+                 sample_values, approximate, elapsed):
+        self.rows = rows
+        self.dtypes = dtypes
+        self.non_null = non_null
+        self.distinct = distinct
+        self.duplicates = duplicates
+        self.numeric_stats = numeric_stats
+        self.memory_bytes = memory_bytes
+        self.sample_values = sample_values
+        self.approximate = approximate
+        self.elapsed = elapsed
+
+    @property
+    def columns(self):
+        return list(self.dtypes.index)
+
+    @property
+    def nulls(self):
+        return self.rows - self.non_null
+
+    @property
+    def missing_cells(self):
+        return int(self.nulls.sum())
+
+    @property
+    def memory_mb(self):
+        return self.memory_bytes / 1024**2
+
+    def kind_counts(self):
+        """Number of numeric, categorical, boolean and datetime columns"""
+        kinds = pd.Series([_column_kind(dtype) for dtype in self.dtypes], dtype=object)
+        return {kind: int((kinds == kind).sum()) for kind in ('numeric', 'categorical', 'boolean', 'datetime')}
+
+    def column_info(self):
+        """Per-column type, null and distinct counts"""
+        return pd.DataFrame({
+            'Column': self.columns,
+            'Data Type': self.dtypes.astype(str).values,
+            'Non-Null Count': self.non_null.values,
+            'Null Count': self.nulls.values,
+            'Null %': (self.nulls / self.rows * 100).round(2).values if self.rows else 0.0,
+            'Unique Values': self.distinct.values,
+            'Sample Values': [self.sample_values.get(col, '[]') for col in self.columns]
+        })
+
+    def describe(self):
+        """describe()-style summary of the numeric columns"""
+        return self.numeric_stats
+
+
+class ProfileCache:
+    """LRU cache of DataProfiles keyed by (dataset fingerprint, approximate)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            profile = self._entries.get(key)
+            if profile is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return profile
+
+    def put(self, key, profile):
+        with self._lock:
+            self._entries[key] = profile
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _profile_query(df, approximate, source='profiled', text_bytes=False):
+    """One aggregate SELECT computing every statistic over source
+
+    df only supplies the column names and dtypes (an empty frame will do).
+    With text_bytes the query also sums the byte length of the text columns,
+    for estimating the size of a table that is not in pandas.
+    """
+    quantile_fn = 'approx_quantile' if approximate else 'quantile_cont'
+
+    select = ['COUNT(*)']
+    numeric = []
+    text = []
+    for col in df.columns:
+        name = quote_identifier(col)
+        select.append(f"COUNT({name})")
+        select.append(f"approx_count_distinct({name})" if approximate else f"COUNT(DISTINCT {name})")
+        if _column_kind(df[col].dtype) == 'numeric':
+            numeric.append(col)
+            select += [f"AVG({name})", f"STDDEV_SAMP({name})", f"MIN({name})",
+                       f"{quantile_fn}({name}, {_QUANTILES})", f"MAX({name})"]
+        elif text_bytes and pd.api.types.is_object_dtype(df[col].dtype):
+            text.append(col)
+
+    # Rows with the same hash of every column are duplicates (NULLs hash alike, as in pandas).
+    # Kept exact in approximate mode too: HLL error on a near-unique count swamps the duplicates.
+    select.append(f"COUNT(DISTINCT hash({', '.join(quote_identifier(col) for col in df.columns)}))")
+    select += [f"COALESCE(SUM(strlen(CAST({quote_identifier(col)} AS VARCHAR))), 0)" for col in text]
+    return f"SELECT {', '.join(select)} FROM {source}", numeric
+
+
+def _run_profile(con, source, schema, approximate, text_bytes=False):
+    """Statistics of source as DataProfile fields (and the text byte total when text_bytes)"""
+    sql, numeric = _profile_query(schema, approximate, source, text_bytes)
+    values = list(con.execute(sql).fetchone())
+    head = con.execute(f"SELECT * FROM {source} LIMIT 1000").fetchdf()
+
+    rows = values.pop(0)
+    non_null, distinct, stats = {}, {}, {}
+    for col in schema.columns:
+        non_null[col] = values.pop(0)
+        distinct[col] = values.pop(0)
+        if col in numeric:
+            mean, std, low, quartiles, high = values[:5]
+            del values[:5]
+            stats[col] = [non_null[col], mean, std, low, *(quartiles or [None] * 3), high]
+    unique_rows = values.pop(0)
+
+    fields = {
+        'rows': rows,
+        'dtypes': schema.dtypes,
+        'non_null': pd.Series(non_null, dtype='int64'),
+        'distinct': pd.Series(distinct, dtype='int64'),
+        'duplicates': max(rows - unique_rows, 0),
+        'numeric_stats': pd.DataFrame(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+                                      dtype='float64'),
+        'sample_values': {col: str(head[col].dropna().head(3).tolist()) for col in head.columns},
+        'approximate': approximate
+    }
+    return fields, int(sum(values))
+
+
+def profile_dataframe(df, approximate=False, cache=None, fingerprint=None):
+    """Profile df in a single DuckDB pass over its Arrow form, reusing a cached profile for unchanged data"""
+    start = time.perf_counter()
+    table = None
+    if cache is not None:
+        if fingerprint is None:
+            table = frame_to_arrow(df)
+            fingerprint = dataset_fingerprint(df, table)
+        key = (fingerprint, approximate)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if table is None:
+        table = frame_to_arrow(df)
+    with duckdb.connect(':memory:') as con:
+        con.register('profiled', table)
+        fields, _ = _run_profile(con, 'profiled', df, approximate)
+
+    profile = DataProfile(memory_bytes=int(df.memory_usage(deep=True).sum()),
+                          elapsed=time.perf_counter() - start, **fields)
+    if cache is not None:
+        cache.put(key, profile)
+    return profile
+
+
+def _estimated_nbytes(schema, rows, text_bytes):
+    """Arrow-equivalent size of a table: fixed-width values, validity bitmaps, string offsets and bytes"""
+    total = text_bytes
+    for dtype in schema.dtypes:
+        width = dtype.itemsize if isinstance(dtype, np.dtype) and dtype.kind != 'O' else 4  # offsets
+        total += rows * width + rows // 8
+    return total
+
+
+def profile_table(con, table_name, schema, approximate=False, cache=None, fingerprint=None):
+    """Profile a DuckDB table in place (one aggregate query, no DataFrame), caching by fingerprint
+
+    schema is an empty DataFrame with the table's columns and dtypes. The
+    memory figure is an estimate of the table's size in Arrow form.
+    """
+    start = time.perf_counter()
+    key = (fingerprint, approximate)
+    if cache is not None and fingerprint is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    fields, text_bytes = _run_profile(con, quote_identifier(table_name), schema, approximate, text_bytes=True)
+    profile = DataProfile(memory_bytes=_estimated_nbytes(schema, fields['rows'], text_bytes),
+                          elapsed=time.perf_counter() - start, **fields)
+    if cache is not None and fingerprint is not None:
+        cache.put(key, profile)
+    return profile
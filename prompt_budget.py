@@ -0,0 +1,104 @@
+"""Token estimates and column ranking for fitting dataset summaries into AI prompts.
+
+Describing every column of a wide dataset (a statistics row, dtype, null
+count and sample values each) produced prompts of tens of thousands of
+tokens, and latency and cost grow with them. Columns are ranked by how
+informative they are likely to be, and the summary keeps the best-ranked
+ones that fit a token budget. Tokens are estimated from characters, which
+needs no tokenizer or network round-trip.
+
+A column's score is its completeness (share of non-null values) times the
+mean of its spread and its relevance:
+
+- spread: for numeric columns, the percentile of the coefficient of
+  variation among the numeric columns (constant columns score 0); for other
+  columns, 1 when they can be grouped by (a few distinct values) and less
+  when they are constant or nearly unique, like identifiers;
+- relevance: for numeric columns, the absolute correlation with the target
+  column; 0.5 for other columns.
+
+Columns named in the user's question always rank first, then the target.
+"""
+import math
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from compaction import CATEGORY_MAX_RATIO
+from correlation import CORRELATION_SAMPLE_ROWS, correlation_matrix
+
+# Rough characters per token of Gemini's tokenizer for tables of numbers and English text
+CHARS_PER_TOKEN = float(os.getenv('CHARS_PER_TOKEN', '4'))
+
+
+def estimate_tokens(text):
+    """Estimated token count of text"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def mentioned_columns(columns, question):
+    """Columns whose names appear in question as whole words (case-insensitive), in column order"""
+    if not question:
+        return []
+    return [col for col in columns
+            if re.search(rf'(?<!\w){re.escape(str(col))}(?!\w)', question, re.IGNORECASE)]
+
+
+def _numeric_spread(stats):
+    """Percentile of each numeric column's coefficient of variation (0 for constant columns)"""
+    std = stats.loc['std'].abs().fillna(0.0)
+    mean = stats.loc['mean'].abs()
+    variation = (std / mean.where(mean > 0)).fillna(np.inf)  # spread around a zero mean is maximal
+    variation[std == 0] = 0.0
+    spread = variation.rank(pct=True)
+    spread[std == 0] = 0.0
+    return spread
+
+
+def _other_spread(profile, col):
+    distinct = profile.distinct[col]
+    non_null = profile.non_null[col]
+    if distinct <= 1:
+        return 0.0
+    if pd.api.types.is_datetime64_any_dtype(profile.dtypes[col]) or distinct <= CATEGORY_MAX_RATIO * non_null:
+        return 1.0
+    return 0.25
+
+
+def column_scores(df, profile, target=None, priority=()):
+    """Informativeness score of every column of df, best first (a Series indexed by column)
+
+    profile is df's DataProfile. target is the numeric column relevance is
+    measured against (default: the first numeric priority column, else the
+    first non-constant numeric column). Priority columns rank above all
+    others, and the target above all but those.
+    """
+    stats = profile.numeric_stats
+    numeric = list(stats.columns)
+    priority = [col for col in priority if col in df.columns]
+    if target is None:
+        varying = [col for col in numeric if stats.at['std', col] > 0]
+        target = next((col for col in priority if col in numeric), varying[0] if varying else None)
+
+    relevance = pd.Series(0.5, index=df.columns, dtype='float64')
+    if numeric:
+        relevance[numeric] = 0.0
+    if target is not None and target in numeric and len(numeric) > 1:
+        matrix = correlation_matrix(df, numeric, sample_rows=CORRELATION_SAMPLE_ROWS).matrix
+        relevance[numeric] = matrix[target].abs().fillna(0.0).to_numpy()
+    if target is not None:
+        relevance[target] = 1.0
+
+    spread = pd.Series({col: _other_spread(profile, col) for col in df.columns if col not in numeric},
+                       dtype='float64')
+    if numeric:
+        spread = pd.concat([spread, _numeric_spread(stats)])
+    completeness = profile.non_null / max(profile.rows, 1)
+
+    scores = completeness[df.columns] * (spread[df.columns] + relevance[df.columns]) / 2
+    scores[priority] += 2.0  # above any unprompted column (scores are at most 1)
+    if target is not None:
+        scores[target] += 1.0  # relevance is measured against it, so it is always described
+    return scores.sort_values(ascending=False, kind='stable')
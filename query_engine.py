@@ -0,0 +1,313 @@
+"""SQL execution for the SQL Cleaner pages.
+
+Pressing "Execute Query" reruns the same SQL against the same uploaded data
+over and over. Results of read-only queries over `uploaded_data` are cached
+process-wide, keyed by the normalised SQL text and the fingerprint of the
+uploaded data, so repeats are served without touching DuckDB. Users can also
+modify `uploaded_data` (DELETE, UPDATE, ...): any statement that is not
+read-only is reported on its result, and callers then move the upload to a
+new data key (DuckDBUpload.mark_modified) so older results are never served.
+
+Results are kept as pyarrow Tables, which DuckDB hands over without copying
+and st.dataframe renders directly. A pandas DataFrame is only built for the
+views and exports that need one.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+import duckdb
+import pyarrow.csv as pa_csv
+
+from ingestion import quote_identifier
+
+# Total memory the query result cache may hold before evicting old results
+QUERY_CACHE_MB = int(os.getenv('QUERY_CACHE_MB', '256'))
+
+# The only table whose contents the data fingerprint describes
+CACHEABLE_TABLES = {'uploaded_data'}
+
+_READ_ONLY_STATEMENTS = ('select', 'with', 'from', 'values', 'table', '(')
+_VOLATILE_FUNCTIONS = re.compile(
+    r'\b(random|uuid|gen_random_uuid|setseed|nextval|now|current_timestamp|current_date|'
+    r'current_time|get_current_time|today|currval|getvariable|current_setting)\b'
+    r'|\busing\s+sample\b|\btablesample\b'  # a fresh random sample on every run
+)
+_SQL_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|--[^\n]*|/\*.*?\*/|\s+""", re.S)
+_STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+# EXPLAIN ANALYZE runs the statement it explains (even with ANALYZE false)
+_EXPLAIN = re.compile(r"^explain\s*(?:\((?P<options>[^)]*)\))?\s*(?P<analyze>analy[sz]e\b)?")
+
+
+def normalize_sql(sql):
+    """Canonical form of a query: comments dropped, whitespace collapsed, unquoted text lower-cased"""
+    parts = []
+    position = 0
+    for match in _SQL_TOKENS.finditer(sql):
+        if match.start() > position:
+            parts.append(sql[position:match.start()].lower())
+        if match.group(1):
+            parts.append(match.group(1))
+        elif parts and not parts[-1].endswith(' '):
+            parts.append(' ')
+        position = match.end()
+    parts.append(sql[position:].lower())
+    return ''.join(parts).strip().rstrip(';').strip()
+
+
+_parser = duckdb.connect(':memory:')  # empty, used only to parse SQL (opening one takes ~20 ms)
+_parser_lock = threading.Lock()
+
+
+def _table_references(node, tables, functions, ctes):
+    """Collect base tables, table functions and CTE names from a serialized SELECT"""
+    if isinstance(node, dict):
+        if node.get('type') == 'BASE_TABLE':
+            tables.append((node.get('catalog_name', ''), node.get('schema_name', ''), node.get('table_name', '')))
+        elif node.get('type') == 'TABLE_FUNCTION':
+            functions.append(node)
+        for entry in node.get('cte_map', {}).get('map', []):
+            ctes.add(entry.get('key'))
+        for value in node.values():
+            _table_references(value, tables, functions, ctes)
+    elif isinstance(node, list):
+        for value in node:
+            _table_references(value, tables, functions, ctes)
+
+
+def is_cacheable(normalized_sql):
+    """True for single deterministic SELECTs whose every table reference is uploaded_data
+
+    Table functions (read_csv, range, duckdb_tables(), ...) and references to
+    other tables, catalogs or schemas read data the fingerprint does not
+    describe, so queries using them always run.
+    """
+    code = _STRING_LITERALS.sub("''", normalized_sql)
+    if not code.startswith(_READ_ONLY_STATEMENTS) or ';' in code or _VOLATILE_FUNCTIONS.search(code):
+        return False
+    with _parser_lock:
+        parsed = json.loads(_parser.execute("SELECT json_serialize_sql(?)", [normalized_sql]).fetchone()[0])
+    if parsed.get('error'):
+        return False
+    tables, functions, ctes = [], [], set()
+    _table_references(parsed['statements'], tables, functions, ctes)
+    if functions:
+        return False
+    return all(not catalog and not schema and (name in CACHEABLE_TABLES or name in ctes)
+               for catalog, schema, name in tables)
+
+
+def _explain_is_read_only(sql):
+    """True unless the EXPLAIN analyzes, and so runs, a statement that is not read-only"""
+    normalized = normalize_sql(sql)
+    explain = _EXPLAIN.match(normalized)
+    if explain is None:
+        return False
+    if explain.group('analyze') or re.search(r'\banaly[sz]e\b', explain.group('options') or ''):
+        return is_read_only(normalized[explain.end():])
+    return True
+
+
+def is_read_only(sql):
+    """True when every statement in sql is a query or a plain EXPLAIN (so no table can have changed)"""
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error:
+        return False
+    return all(statement.type.name == 'SELECT'
+               or (statement.type.name == 'EXPLAIN' and _explain_is_read_only(statement.query))
+               for statement in statements)
+
+
+def fetch_arrow(cursor):
+    """Fetch a DuckDB result as a pyarrow Table (to_arrow_table replaced fetch_arrow_table in DuckDB 1.4)"""
+    fetch = getattr(cursor, 'to_arrow_table', None) or cursor.fetch_arrow_table
+    return fetch()
+
+
+class QueryResult:
+    """Rows returned by a query as a pyarrow Table, together with how they were obtained"""
+
+    def __init__(self, table, elapsed, from_cache=False, lookup_seconds=0.0, modified_data=False):
+        self.table = table
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+        self.lookup_seconds = lookup_seconds
+        self.modified_data = modified_data
+        self._frame = None
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    @property
+    def columns(self):
+        return self.table.column_names
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    @property
+    def null_count(self):
+        return sum(column.null_count for column in self.table.columns)
+
+    def _scratch(self):
+        """Private DuckDB connection with the result registered as 'result'"""
+        con = duckdb.connect(':memory:')
+        con.register('result', self.table)
+        return con
+
+    def duplicate_count(self):
+        """Number of fully duplicated rows, counted by DuckDB on the Arrow data"""
+        with self._scratch() as con:
+            return con.execute(
+                "SELECT COUNT(*) - (SELECT COUNT(*) FROM (SELECT DISTINCT * FROM result)) FROM result"
+            ).fetchone()[0]
+
+    def to_pandas(self):
+        """Convert to a DataFrame on first use and reuse it afterwards"""
+        if self._frame is None:
+            self._frame = self.table.to_pandas()
+        return self._frame
+
+    def to_csv(self):
+        """CSV bytes written straight from the Arrow data"""
+        buffer = BytesIO()
+        pa_csv.write_csv(self.table, buffer)
+        return buffer.getvalue()
+
+    def to_json(self):
+        """JSON array of records written by DuckDB from the Arrow data"""
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            with self._scratch() as con:
+                con.execute(f"COPY result TO '{path}' (FORMAT JSON, ARRAY true)")
+            with open(path, 'rb') as handle:
+                return handle.read()
+        finally:
+            os.remove(path)
+
+
+class QueryCache:
+    """Size-bounded LRU cache of query results keyed by (normalised SQL, data fingerprint)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached QueryResult for key (marking it recently used) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        """Store result under key, evicting least recently used results to stay under max_bytes"""
+        size = result.nbytes
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def invalidate(self, data_fingerprint):
+        """Drop every result computed from the given data (e.g. after a new upload replaced it)"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == data_fingerprint]:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use for display"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'used_mb': self.current_bytes / 1024**2,
+            'max_mb': self.max_bytes / 1024**2
+        }
+
+
+def execute_query(con, sql, data_fingerprint=None, cache=None):
+    """Run sql on con, serving repeats of cacheable queries from cache
+
+    data_fingerprint identifies the contents of uploaded_data; without it (or a
+    cache) the query always runs. result.modified_data is True when sql was
+    not read-only: the caller must then stop using data_fingerprint.
+    """
+    start = time.perf_counter()
+    key = None
+    if cache is not None and data_fingerprint is not None:
+        normalized = normalize_sql(sql)
+        if is_cacheable(normalized):
+            key = (normalized, data_fingerprint)
+            cached = cache.get(key)
+            if cached is not None:
+                lookup_seconds = time.perf_counter() - start
+                return QueryResult(cached.table, cached.elapsed, True, lookup_seconds)
+
+    start = time.perf_counter()
+    table = fetch_arrow(con.execute(sql))
+    result = QueryResult(table, time.perf_counter() - start, modified_data=not is_read_only(sql))
+    if key is not None:
+        # Arrow tables are immutable, so the cache and the caller can share one
+        cache.put(key, QueryResult(table, result.elapsed))
+    return result
+
+
+def _page_filter(columns, filter_column=None, filter_text=None):
+    """WHERE clause and parameters for a case-insensitive 'contains' filter"""
+    if not filter_text:
+        return '', []
+    targets = [filter_column] if filter_column else columns
+    checks = [f"CAST({quote_identifier(col)} AS VARCHAR) ILIKE ?" for col in targets]
+    return "WHERE " + " OR ".join(checks), [f"%{filter_text}%"] * len(checks)
+
+
+def count_rows(con, source, columns, filter_column=None, filter_text=None):
+    """Rows in source that pass the filter"""
+    where, params = _page_filter(columns, filter_column, filter_text)
+    return con.execute(f"SELECT COUNT(*) FROM {source} {where}", params).fetchone()[0]
+
+
+def fetch_page(con, source, columns, page=1, page_size=100, sort_by=None, descending=False,
+               filter_column=None, filter_text=None):
+    """One page of rows from source as a pyarrow Table, filtered and sorted inside DuckDB
+
+    source is any FROM-clause expression (a quoted table name or a subquery);
+    only page_size rows ever leave the database, however large it is.
+    """
+    where, params = _page_filter(columns, filter_column, filter_text)
+    order = ''
+    if sort_by:
+        order = f"ORDER BY {quote_identifier(sort_by)} {'DESC' if descending else 'ASC'} NULLS LAST"
+    sql = f"SELECT * FROM {source} {where} {order} LIMIT ? OFFSET ?"
+    return fetch_arrow(con.execute(sql, params + [page_size, (page - 1) * page_size]))
@@ -0,0 +1,59 @@
+"""Paginated table viewer shared by app.py and sql_csv_cleaner.py.
+
+Instead of shipping a whole table to the browser with st.dataframe, the
+viewer asks DuckDB for one page at a time. Sorting and filtering run as SQL,
+so the payload stays at one page however many rows the table has.
+"""
+import math
+
+import streamlit as st
+
+from ingestion import quote_identifier
+from query_engine import count_rows, fetch_page
+
+PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+
+def render_paginated_table(con, table_name=None, arrow_table=None, key='pager', max_rows=None, height=400):
+    """Browse a DuckDB table (table_name) or a query result (arrow_table) page by page
+
+    Arrow results are registered on the session's cursor without copying.
+    max_rows caps how many rows can be browsed, like a LIMIT on the source.
+    """
+    if arrow_table is not None:
+        table_name = f"_{key}_rows"
+        con.register(table_name, arrow_table)
+    source = quote_identifier(table_name)
+    if max_rows:
+        source = f"(SELECT * FROM {source} LIMIT {int(max_rows)})"
+    columns = [column[0] for column in con.execute(f"SELECT * FROM {source} LIMIT 0").description]
+
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 1, 1])
+    with col1:
+        filter_column = st.selectbox("Filter column", ["All columns"] + columns, key=f"{key}_filter_column")
+    with col2:
+        filter_text = st.text_input("Contains", key=f"{key}_filter_text", placeholder="Type to filter rows")
+    with col3:
+        sort_by = st.selectbox("Sort by", ["(original order)"] + columns, key=f"{key}_sort_by")
+    with col4:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+    with col5:
+        page_size = st.selectbox("Rows / page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    filter_column = None if filter_column == "All columns" else filter_column
+    sort_by = None if sort_by == "(original order)" else sort_by
+
+    total = count_rows(con, source, columns, filter_column, filter_text)
+    pages = max(1, math.ceil(total / page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = 1
+    page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+
+    rows = fetch_page(con, source, columns, page, page_size, sort_by, descending, filter_column, filter_text)
+    st.dataframe(rows, use_container_width=True, height=height)
+
+    first = (page - 1) * page_size + 1 if total else 0
+    last = first + rows.num_rows - 1 if total else 0
+    st.caption(f"Page {page:,} of {pages:,} · rows {first:,}–{last:,} of {total:,}"
+               + (" matching the filter" if filter_text else ""))
@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import duckdb
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -8,6 +7,21 @@ from io import BytesIO, StringIO
 import numpy as np
 from datetime import datetime
 import json
+from ingestion import IngestionCache, INGESTION_CACHE_MB, ensure_duckdb_upload
+from query_engine import QueryCache, QUERY_CACHE_MB, execute_query
+from result_viewer import render_paginated_table
+from binning import histogram, histogram_figure, histogram_trace
+from profiler import APPROX_PROFILE_ROWS, PROFILE_CACHE_ENTRIES, ProfileCache, profile_table
+from duckdb_sessions import (
+    DUCKDB_STORAGE,
+    DuckDBConnectionManager,
+    SessionJanitor,
+    check_session_sql,
+    is_session_token,
+    new_session_token,
+    session_id_for_token,
+    touch_session,
+)
 
 # Page config
 st.set_page_config(
@@ -44,14 +58,54 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session state
-if 'con' not in st.session_state:
-    st.session_state.con = duckdb.connect(':memory:')
+if 'session_id' not in st.session_state:
+    # In disk mode the session's secret token travels in the URL so a reconnect reopens the same
+    # database file; the id that names the database is a hash of it, so a leaked id opens nothing
+    requested_token = st.query_params.get('session')
+    if DUCKDB_STORAGE == 'disk' and is_session_token(requested_token):
+        st.session_state.session_token = requested_token
+    else:
+        st.session_state.session_token = new_session_token()
+    st.session_state.session_id = session_id_for_token(st.session_state.session_token)
 if 'query_history' not in st.session_state:
     st.session_state.query_history = []
-if 'original_df' not in st.session_state:
-    st.session_state.original_df = None
-if 'cleaned_df' not in st.session_state:
-    st.session_state.cleaned_df = None
+if 'cleaned_result' not in st.session_state:
+    st.session_state.cleaned_result = None
+
+@st.cache_resource
+def get_ingestion_cache():
+    """Process-wide cache of parsed uploads, shared by every session"""
+    return IngestionCache(INGESTION_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_query_cache():
+    """Process-wide cache of SQL Cleaner query results"""
+    return QueryCache(QUERY_CACHE_MB * 1024**2)
+
+@st.cache_resource
+def get_profile_cache():
+    """Process-wide cache of dataset profiles keyed by dataset fingerprint"""
+    return ProfileCache(PROFILE_CACHE_ENTRIES)
+
+@st.cache_resource
+def get_duckdb_manager():
+    """Process-wide manager of the sessions' DuckDB databases (one per session)"""
+    return DuckDBConnectionManager()
+
+@st.cache_resource
+def get_session_janitor():
+    """Background job that releases idle sessions and deletes their database files"""
+    return SessionJanitor(get_duckdb_manager()).start()
+
+# Reopen the session's cursor on first run, or after the janitor released it as idle
+duckdb_manager = get_duckdb_manager()
+if 'con' not in st.session_state or not duckdb_manager.is_open(st.session_state.session_id):
+    st.session_state.con = duckdb_manager.connect(st.session_state.session_id)
+duckdb_manager.touch(st.session_state.session_id)
+get_session_janitor()
+touch_session(st.session_state.session_id, duckdb_manager.spill_dir)
+if DUCKDB_STORAGE == 'disk':
+    st.query_params['session'] = st.session_state.session_token
 
 # Advanced SQL Templates
 ADVANCED_SQL_TEMPLATES = {
@@ -376,19 +430,19 @@ def create_visualizations(original_df, cleaned_df=None):
                 )
                 
                 fig.add_trace(
-                    go.Histogram(x=original_df[selected_col].dropna(), name="Original", marker_color='indianred'),
+                    histogram_trace(histogram(original_df[selected_col]), name="Original", color='indianred'),
                     row=1, col=1
                 )
                 
                 fig.add_trace(
-                    go.Histogram(x=cleaned_df[selected_col].dropna(), name="Cleaned", marker_color='lightseagreen'),
+                    histogram_trace(histogram(cleaned_df[selected_col]), name="Cleaned", color='lightseagreen'),
                     row=1, col=2
                 )
                 
                 fig.update_layout(height=400, showlegend=True)
                 st.plotly_chart(fig, use_container_width=True)
             else:
-                fig = px.histogram(original_df, x=selected_col, title=f"Distribution of {selected_col}")
+                fig = histogram_figure(original_df[selected_col], f"Distribution of {selected_col}", x_label=selected_col)
                 st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No numeric columns found in the dataset")
@@ -449,7 +503,7 @@ def main():
         
         # Upload section
         st.subheader("📁 Data Upload")
-        uploaded_file = st.file_uploader("Upload CSV File", type=['csv'])
+        uploaded_file = st.file_uploader("Upload CSV File", type=['csv', 'parquet'])
         
         # Sample data
         if st.button("📊 Load Sample Dataset"):
@@ -489,6 +543,18 @@ def main():
         
         st.divider()
         
+        with st.expander("🦆 DuckDB Engine"):
+            usage = get_duckdb_manager().utilisation()
+            col1, col2 = st.columns(2)
+            col1.metric("Sessions", usage['sessions'])
+            col2.metric("Threads / session", usage['threads'])
+            col1.metric("Memory", f"{usage['memory_mb']:.1f} MB")
+            col2.metric("Spilled", f"{usage['spilled_mb']:.1f} MB")
+            st.caption(f"Storage: {usage['storage']} · limit {usage['memory_limit']} per session · "
+                       f"{usage['tables']} tables, {usage['rows']:,} rows")
+        
+        st.divider()
+        
         # Tips
         st.subheader("💡 Quick Tips")
         st.markdown("""
@@ -503,11 +569,31 @@ def main():
     if uploaded_file:
         # Load CSV
         try:
-            df = pd.read_csv(uploaded_file)
-            st.session_state.original_df = df.copy()
-            
-            # Register with DuckDB
-            st.session_state.con.register('uploaded_data', df)
+            # DuckDB reads the file into 'uploaded_data' itself; reruns reuse the table
+            upload = ensure_duckdb_upload(
+                st.session_state.con,
+                uploaded_file,
+                current=st.session_state.get('upload'),
+                cache=get_ingestion_cache(),
+                spool_dir=duckdb_manager.files_dir(st.session_state.session_id)
+            )
+            previous_upload = st.session_state.get('upload')
+            if previous_upload is not None and previous_upload.fingerprint != upload.fingerprint:
+                # Results computed from the replaced file can never be hit again
+                get_query_cache().invalidate(previous_upload.data_key)
+                st.session_state.cleaned_result = None
+            st.session_state.upload = upload
+            overview = upload.overview()
+            # Templates only need the column names and dtypes; statistics are computed in DuckDB
+            schema = upload.schema_frame()
+            profile = profile_table(
+                st.session_state.con,
+                upload.table_name,
+                schema,
+                approximate=overview['rows'] > APPROX_PROFILE_ROWS,
+                cache=get_profile_cache(),
+                fingerprint=upload.data_key
+            )
             
             # Data overview
             st.success(f"✅ File uploaded successfully: **{uploaded_file.name}**")
@@ -515,16 +601,15 @@ def main():
             # Metrics
             col1, col2, col3, col4, col5 = st.columns(5)
             with col1:
-                st.metric("📊 Total Rows", f"{len(df):,}")
+                st.metric("📊 Total Rows", f"{overview['rows']:,}")
             with col2:
-                st.metric("📋 Columns", len(df.columns))
+                st.metric("📋 Columns", overview['columns'])
             with col3:
-                st.metric("❌ Missing Values", f"{df.isnull().sum().sum():,}")
+                st.metric("❌ Missing Values", f"{overview['missing']:,}")
             with col4:
-                st.metric("🔄 Duplicates", f"{df.duplicated().sum():,}")
+                st.metric("🔄 Duplicates", f"{overview['duplicates']:,}")
             with col5:
-                memory_usage = df.memory_usage(deep=True).sum() / 1024**2
-                st.metric("💾 Size", f"{memory_usage:.2f} MB")
+                st.metric("💾 Size", f"{uploaded_file.size / 1024**2:.2f} MB")
             
             # Tabs for organization
             tab1, tab2, tab3 = st.tabs(["🔧 Data Cleaning", "📊 Visualizations", "📋 Data Preview"])
@@ -560,20 +645,20 @@ def main():
                         if "{column}" in template_sql or "{columns}" in template_sql:
                             selected_columns = st.multiselect(
                                 "Select columns:",
-                                df.columns.tolist(),
+                                schema.columns.tolist(),
                                 help="Choose columns for the operation"
                             )
                     
                     with col2:
                         if "{order_col}" in template_sql or "{order_column}" in template_sql:
-                            order_column = st.selectbox("Order by:", df.columns.tolist())
+                            order_column = st.selectbox("Order by:", schema.columns.tolist())
                         
                         if "{group_by_column}" in template_sql:
-                            group_column = st.selectbox("Group by:", df.columns.tolist())
+                            group_column = st.selectbox("Group by:", schema.columns.tolist())
                     
                     with col3:
                         if "{numeric_column}" in template_sql:
-                            numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+                            numeric_cols = schema.select_dtypes(include=[np.number]).columns.tolist()
                             if numeric_cols:
                                 numeric_column = st.selectbox("Numeric column:", numeric_cols)
                         
@@ -585,7 +670,7 @@ def main():
                     default_query = "SELECT * FROM uploaded_data LIMIT 100"
                 else:
                     if ADVANCED_SQL_TEMPLATES[selected_template].get("dynamic"):
-                        default_query = generate_dynamic_sql(selected_template, df)
+                        default_query = generate_dynamic_sql(selected_template, schema)
                     else:
                         default_query = ADVANCED_SQL_TEMPLATES[selected_template]["sql"]
                         
@@ -634,8 +719,14 @@ def main():
                     try:
                         with st.spinner("🔄 Executing SQL query..."):
                             # Execute
-                            result = st.session_state.con.execute(sql_query).fetchdf()
-                            st.session_state.cleaned_df = result
+                            # Refuse SQL that reaches outside this session's own database and files
+                            check_session_sql(st.session_state.con, sql_query, st.session_state.session_id)
+                            result = execute_query(st.session_state.con, sql_query, upload.data_key, get_query_cache())
+                            st.session_state.cleaned_result = result
+                            if result.modified_data:
+                                # uploaded_data may have changed: results cached for its old contents no longer apply
+                                get_query_cache().invalidate(upload.data_key)
+                                upload.mark_modified()
                             
                             # Add to history
                             if sql_query not in st.session_state.query_history:
@@ -652,49 +743,52 @@ def main():
                             
                             # Success message
                             st.success("✅ Query executed successfully!")
+                            if result.from_cache:
+                                st.caption(f"⚡ Cache hit: served in {result.lookup_seconds * 1000:.1f} ms "
+                                           f"(the query took {result.elapsed * 1000:.0f} ms when it ran)")
+                            else:
+                                st.caption(f"⏱️ Cache miss: query ran in {result.elapsed * 1000:.0f} ms")
                             
                             # Results metrics
                             col1, col2, col3, col4 = st.columns(4)
                             with col1:
-                                st.metric("Result Rows", f"{len(result):,}")
+                                st.metric("Result Rows", f"{result.num_rows:,}")
                             with col2:
-                                removed = len(df) - len(result)
+                                removed = overview['rows'] - result.num_rows
                                 st.metric("Rows Changed", f"{removed:,}", delta=f"{removed}")
                             with col3:
                                 st.metric("Columns", len(result.columns))
                             with col4:
-                                change_pct = ((len(result) / len(df)) * 100) if len(df) > 0 else 0
+                                change_pct = ((result.num_rows / overview['rows']) * 100) if overview['rows'] > 0 else 0
                                 st.metric("Data Retained", f"{change_pct:.1f}%")
                             
-                            # Preview results
-                            st.subheader("📊 Query Results Preview")
-                            st.dataframe(result.head(limit_results), use_container_width=True)
-                            
                             # Data quality comparison
                             st.subheader("📈 Data Quality Comparison")
                             
+                            result_duplicates = result.duplicate_count()
+                            original_mb = profile.memory_mb
                             comparison_data = {
                                 'Metric': ['Total Rows', 'Total Columns', 'Missing Values', 'Duplicate Rows', 'Memory (MB)'],
                                 'Original': [
-                                    f"{len(df):,}",
-                                    len(df.columns),
-                                    f"{df.isnull().sum().sum():,}",
-                                    f"{df.duplicated().sum():,}",
-                                    f"{df.memory_usage(deep=True).sum() / 1024**2:.2f}"
+                                    f"{overview['rows']:,}",
+                                    overview['columns'],
+                                    f"{overview['missing']:,}",
+                                    f"{overview['duplicates']:,}",
+                                    f"{original_mb:.2f}"
                                 ],
                                 'Cleaned': [
-                                    f"{len(result):,}",
+                                    f"{result.num_rows:,}",
                                     len(result.columns),
-                                    f"{result.isnull().sum().sum():,}",
-                                    f"{result.duplicated().sum():,}",
-                                    f"{result.memory_usage(deep=True).sum() / 1024**2:.2f}"
+                                    f"{result.null_count:,}",
+                                    f"{result_duplicates:,}",
+                                    f"{result.nbytes / 1024**2:.2f}"
                                 ],
                                 'Change': [
-                                    f"{len(result) - len(df):,}",
-                                    len(result.columns) - len(df.columns),
-                                    f"{result.isnull().sum().sum() - df.isnull().sum().sum():,}",
-                                    f"{result.duplicated().sum() - df.duplicated().sum():,}",
-                                    f"{(result.memory_usage(deep=True).sum() - df.memory_usage(deep=True).sum()) / 1024**2:.2f}"
+                                    f"{result.num_rows - overview['rows']:,}",
+                                    len(result.columns) - overview['columns'],
+                                    f"{result.null_count - overview['missing']:,}",
+                                    f"{result_duplicates - overview['duplicates']:,}",
+                                    f"{result.nbytes / 1024**2 - original_mb:.2f}"
                                 ]
                             }
                             
@@ -707,7 +801,7 @@ def main():
                             col1, col2, col3, col4 = st.columns(4)
                             
                             with col1:
-                                csv = result.to_csv(index=False)
+                                csv = result.to_csv()
                                 st.download_button(
                                     "📥 CSV",
                                     data=csv,
@@ -719,8 +813,8 @@ def main():
                             with col2:
                                 buffer = BytesIO()
                                 with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                                    result.to_excel(writer, index=False, sheet_name='Cleaned Data')
-                                    df.to_excel(writer, index=False, sheet_name='Original Data')
+                                    result.to_pandas().to_excel(writer, index=False, sheet_name='Cleaned Data')
+                                    upload.to_pandas(keep=False).to_excel(writer, index=False, sheet_name='Original Data')
                                 
                                 st.download_button(
                                     "📥 Excel",
@@ -741,7 +835,7 @@ def main():
                             
                             with col4:
                                 # JSON export
-                                json_data = result.to_json(orient='records', indent=2)
+                                json_data = result.to_json()
                                 st.download_button(
                                     "📥 JSON",
                                     data=json_data,
@@ -753,31 +847,41 @@ def main():
                     except Exception as e:
                         st.error(f"❌ Error executing query: {str(e)}")
                         st.info("💡 Tip: Check your SQL syntax and ensure table name is 'uploaded_data'")
+                
+                # Browse the latest result page by page (survives reruns triggered by the pager)
+                if st.session_state.cleaned_result is not None:
+                    st.subheader("📊 Query Results Preview")
+                    render_paginated_table(
+                        st.session_state.con,
+                        arrow_table=st.session_state.cleaned_result.table,
+                        key="result_rows",
+                        max_rows=limit_results
+                    )
             
             with tab2:
-                # Visualizations
-                if st.session_state.cleaned_df is not None:
-                    create_visualizations(st.session_state.original_df, st.session_state.cleaned_df)
+                # Visualizations (the only view that needs the upload as a DataFrame, so it is opt-in)
+                if st.toggle("Load data for charts", key="cleaner_charts",
+                             help=f"Copies the {overview['rows']:,} uploaded rows from DuckDB into pandas"):
+                    if st.session_state.cleaned_result is not None:
+                        create_visualizations(upload.to_pandas(), st.session_state.cleaned_result.to_pandas())
+                    else:
+                        create_visualizations(upload.to_pandas())
                 else:
-                    create_visualizations(st.session_state.original_df)
+                    upload.release_pandas()
             
             with tab3:
                 # Data preview tabs
                 preview_tab1, preview_tab2, preview_tab3 = st.tabs(["Original Data", "Column Details", "Data Profile"])
                 
                 with preview_tab1:
-                    st.dataframe(df, use_container_width=True)
+                    render_paginated_table(st.session_state.con, 'uploaded_data', key="original_rows")
                 
                 with preview_tab2:
                     # Column information
-                    col_info = pd.DataFrame({
-                        'Column': df.columns,
-                        'Type': df.dtypes.astype(str),
-                        'Non-Null': df.count().values,
-                        'Null Count': df.isnull().sum().values,
-                        'Null %': (df.isnull().sum() / len(df) * 100).round(2).values,
-                        'Unique': [df[col].nunique() for col in df.columns],
-                        'Sample Values': [str(df[col].dropna().head(3).tolist()[:3]) for col in df.columns]
+                    col_info = profile.column_info().rename(columns={
+                        'Data Type': 'Type',
+                        'Non-Null Count': 'Non-Null',
+                        'Unique Values': 'Unique'
                     })
                     st.dataframe(col_info, use_container_width=True, hide_index=True)
                 
@@ -785,6 +889,7 @@ def main():
                     # Data profiling
                     st.markdown("#### Data Profile Summary")
                     
+                    kinds = profile.kind_counts()
                     profile_data = {
                         'Characteristic': [
                             'Total Records',
@@ -800,17 +905,17 @@ def main():
                             'Total Memory'
                         ],
                         'Value': [
-                            f"{len(df):,}",
-                            len(df.columns),
-                            len(df.select_dtypes(include=[np.number]).columns),
-                            len(df.select_dtypes(include=['object']).columns),
-                            len(df.select_dtypes(include=['bool']).columns),
-                            len(df.select_dtypes(include=['datetime64']).columns),
-                            f"{df.isnull().sum().sum():,}",
-                            f"{(df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100):.2f}%",
-                            f"{df.duplicated().sum():,}",
-                            f"{(df.duplicated().sum() / len(df) * 100):.2f}%",
-                            f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB"
+                            f"{profile.rows:,}",
+                            len(profile.columns),
+                            kinds['numeric'],
+                            kinds['categorical'],
+                            kinds['boolean'],
+                            kinds['datetime'],
+                            f"{profile.missing_cells:,}",
+                            f"{(profile.missing_cells / (profile.rows * len(profile.columns)) * 100):.2f}%",
+                            f"{profile.duplicates:,}",
+                            f"{(profile.duplicates / profile.rows * 100):.2f}%",
+                            f"{profile.memory_mb:.2f} MB"
                         ]
                     }
                     
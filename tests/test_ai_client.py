@@ -0,0 +1,142 @@
+"""Tests for the streamed AI requests (ai_client) and the persistent reply cache (ai_cache)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_cache  # noqa: E402
+from ai_cache import AIResponseCache, response_key  # noqa: E402
+from ai_client import (  # noqa: E402
+    AIRequest,
+    AIRequestCancelled,
+    AIRequestTimeout,
+    FakeGenerativeModel,
+    generate_text,
+)
+
+
+class FailingModel:
+    """Model whose request fails, either before streaming or after the first chunk"""
+
+    def __init__(self, after_first_chunk=False):
+        self.model_name = 'failing-model'
+        self.after_first_chunk = after_first_chunk
+
+    async def generate_content_async(self, prompt, stream=False):
+        if not self.after_first_chunk:
+            raise RuntimeError("quota exceeded")
+        return self._stream()
+
+    async def _stream(self):
+        yield FakeChunk('partial ')
+        raise RuntimeError("connection reset")
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+def test_chunks_arrive_in_order():
+    model = FakeGenerativeModel(reply='one two three four', delay=0.001)
+    request = AIRequest(model, 'prompt', timeout=5)
+
+    assert list(request.chunks()) == ['one ', 'two ', 'three ', 'four']
+    assert request.text == 'one two three four'
+    assert request.done
+    assert request.first_chunk_seconds <= request.elapsed
+    assert model.prompts == ['prompt']
+
+
+def test_generate_text_returns_the_whole_reply():
+    assert generate_text(FakeGenerativeModel(reply='a short reply', delay=0.001), 'prompt', timeout=5) == 'a short reply'
+
+
+def test_slow_reply_times_out():
+    request = AIRequest(FakeGenerativeModel(reply='too slow to arrive', delay=1.0), 'prompt', timeout=0.05)
+
+    with pytest.raises(AIRequestTimeout):
+        list(request.chunks())
+    assert request.text == ''
+
+
+def test_cancel_stops_the_stream():
+    request = AIRequest(FakeGenerativeModel(reply='word ' * 100, delay=0.01), 'prompt', timeout=5)
+    chunks = request.chunks()
+
+    assert next(chunks) == 'word '
+    request.cancel()
+    with pytest.raises(AIRequestCancelled):
+        for _ in chunks:
+            pass
+    assert len(request.parts) < 100
+
+
+def test_model_error_is_raised_to_the_caller():
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        list(AIRequest(FailingModel(), 'prompt', timeout=5).chunks())
+
+
+def test_error_mid_stream_keeps_the_received_text():
+    request = AIRequest(FailingModel(after_first_chunk=True), 'prompt', timeout=5)
+
+    with pytest.raises(RuntimeError, match="connection reset"):
+        list(request.chunks())
+    assert request.text == 'partial '
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AIResponseCache(str(tmp_path / 'ai_cache.sqlite3'), ttl_seconds=60, max_bytes=1024**2)
+
+
+def test_cache_miss_then_hit(cache):
+    key = response_key('fake-model', 'insights', None, 'fingerprint', 'prompt')
+
+    assert cache.get(key) is None
+    cache.put(key, 'the reply', model='fake-model', template='insights')
+    assert cache.get(key) == 'the reply'
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_key_covers_every_part():
+    key = response_key('fake-model', 'chat', 'question', 'fingerprint', 'prompt')
+
+    assert key == response_key('fake-model', 'chat', 'question', 'fingerprint', 'prompt')
+    assert key != response_key('other-model', 'chat', 'question', 'fingerprint', 'prompt')
+    assert key != response_key('fake-model', 'report', 'question', 'fingerprint', 'prompt')
+    assert key != response_key('fake-model', 'chat', 'another question', 'fingerprint', 'prompt')
+    assert key != response_key('fake-model', 'chat', 'question', 'other data', 'prompt')
+    assert key != response_key('fake-model', 'chat', 'question', 'fingerprint', 'another prompt')
+
+
+def test_cache_entries_expire_after_the_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ai_cache.time, 'time', lambda: now[0])
+    key = response_key('fake-model', 'insights', None, 'fingerprint', 'prompt')
+    cache.put(key, 'the reply')
+
+    now[0] += 59
+    assert cache.get(key) == 'the reply'
+    now[0] += 2
+    assert cache.get(key) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ai_cache.time, 'time', lambda: now[0])
+    cache = AIResponseCache(str(tmp_path / 'ai_cache.sqlite3'), ttl_seconds=60, max_bytes=10)
+    for key, reply in [('old', 'aaaaa'), ('recent', 'bbbbb')]:
+        cache.put(key, reply)
+        now[0] += 1
+    cache.get('old')
+    now[0] += 1
+    cache.put('new', 'ccccc')
+
+    assert cache.get('recent') is None
+    assert cache.get('old') == 'aaaaa'
+    assert cache.get('new') == 'ccccc'
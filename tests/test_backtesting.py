@@ -0,0 +1,116 @@
+"""Tests for the rolling-origin backtests (backtesting)."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import BacktestCache, backtest  # noqa: E402
+from forecasting import fit_alpha, fit_exponential_smoothing, holt_winters_pass  # noqa: E402
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(3)
+    return 100 + rng.normal(0, 1, 120).cumsum() + 5 * np.sin(np.arange(120) * 2 * np.pi / 7)
+
+
+def test_cutoffs_run_from_min_train_to_the_last_full_horizon(values):
+    result = backtest(values, 'Moving Average', horizon=5, step=3, min_train=20, window=4)
+
+    np.testing.assert_array_equal(result.cutoffs, np.arange(20, 116, 3))
+    assert result.cutoffs[-1] + 5 <= len(values)
+    for cutoff, actual, forecast in zip(result.cutoffs, result.actual, result.forecasts):
+        np.testing.assert_array_equal(actual, values[cutoff:cutoff + 5])
+        np.testing.assert_allclose(forecast, [values[cutoff - 4:cutoff].mean()] * 5)
+
+
+def test_last_cutoff_leaves_exactly_one_horizon(values):
+    result = backtest(values, 'Moving Average', horizon=10, step=1, min_train=110)
+    np.testing.assert_array_equal(result.cutoffs, [110])
+
+
+def test_min_train_defaults_to_a_third_and_covers_the_method(values):
+    assert backtest(values, 'Moving Average', horizon=5).cutoffs[0] == 40
+    assert backtest(values, 'Moving Average', horizon=5, min_train=2, window=9).cutoffs[0] == 9
+    assert backtest(values, 'Holt-Winters', horizon=5, min_train=3, season_length=12).cutoffs[0] == 24
+
+
+def test_series_too_short_or_with_gaps_is_refused(values):
+    with pytest.raises(ValueError):
+        backtest(values[:20], 'Moving Average', horizon=10, min_train=15)
+    gappy = values.copy()
+    gappy[50] = np.nan
+    with pytest.raises(ValueError):
+        backtest(gappy, 'Moving Average')
+    with pytest.raises(ValueError):
+        backtest(values, 'Naive')
+
+
+def test_exponential_smoothing_matches_a_refit_at_every_cutoff(values):
+    result = backtest(values, 'Exponential Smoothing', horizon=4, step=7, alpha=0.3)
+    for cutoff, forecast in zip(result.cutoffs, result.forecasts):
+        np.testing.assert_allclose(forecast, fit_exponential_smoothing(values[:cutoff], 0.3, periods=4).values)
+
+
+def test_fitted_parameters_only_see_data_before_the_first_cutoff(values):
+    result = backtest(values, 'Exponential Smoothing', horizon=4, alpha='auto')
+    assert result.params['alpha'] == fit_alpha(values[:result.cutoffs[0]])[0]
+
+    changed_future = values.copy()
+    changed_future[result.cutoffs[0]:] *= 3
+    assert backtest(changed_future, 'Holt-Winters', horizon=4, season_length=7).params == \
+        backtest(values, 'Holt-Winters', horizon=4, season_length=7).params
+
+
+@pytest.mark.parametrize('season_length', [None, 7])
+def test_holt_winters_matches_a_pass_up_to_each_cutoff(values, season_length):
+    horizon = 9  # longer than a season, so the seasonal index wraps
+    result = backtest(values, 'Holt-Winters', horizon=horizon, step=5, season_length=season_length)
+    alpha, beta, gamma = (np.array([[result.params.get(name, 0.0)]]) for name in ('alpha', 'beta', 'gamma'))
+    steps = np.arange(1, horizon + 1)
+
+    for cutoff, forecast in zip(result.cutoffs, result.forecasts):
+        _, _, level, trend, seasonal = holt_winters_pass(values[None, :cutoff], alpha, beta, gamma, season_length)
+        expected = level[0, 0] + steps * trend[0, 0]
+        if season_length:
+            expected += seasonal[0, 0, (cutoff + steps - 1) % season_length]
+        np.testing.assert_allclose(forecast, expected, rtol=1e-10)
+
+
+def test_cache_key_holds_only_the_parameters_the_method_uses(values):
+    cache = BacktestCache(max_entries=8)
+
+    assert not backtest(values, 'Exponential Smoothing', alpha=0.3, window=7, cache=cache).from_cache
+    assert backtest(values, 'Exponential Smoothing', alpha=0.3, window=30, season_length=7, cache=cache).from_cache
+    assert not backtest(values, 'Exponential Smoothing', alpha=0.5, cache=cache).from_cache
+
+    assert not backtest(values, 'Moving Average', window=7, alpha=0.3, cache=cache).from_cache
+    assert backtest(values, 'Moving Average', window=7, alpha=0.9, cache=cache).from_cache
+    assert cache.hits == 2 and cache.misses == 3
+
+
+def test_cache_key_covers_the_series_and_the_folds(values):
+    cache = BacktestCache(max_entries=8)
+    first = backtest(values, 'Moving Average', horizon=5, cache=cache)
+
+    assert not backtest(values + 1, 'Moving Average', horizon=5, cache=cache).from_cache
+    assert not backtest(values, 'Moving Average', horizon=6, cache=cache).from_cache
+    assert not backtest(values, 'Moving Average', horizon=5, step=2, cache=cache).from_cache
+    assert not backtest(values, 'Moving Average', horizon=5, min_train=50, cache=cache).from_cache
+
+    again = backtest(values.tolist(), 'Moving Average', horizon=5, cache=cache)
+    assert again.from_cache
+    np.testing.assert_array_equal(again.forecasts, first.forecasts)
+    assert again.mape == first.mape
+
+
+def test_cache_evicts_the_least_recently_used(values):
+    cache = BacktestCache(max_entries=2)
+    for window in (3, 4, 5):
+        backtest(values, 'Moving Average', window=window, cache=cache)
+
+    assert not backtest(values, 'Moving Average', window=3, cache=cache).from_cache
+    assert backtest(values, 'Moving Average', window=5, cache=cache).from_cache
@@ -0,0 +1,101 @@
+"""Tests for the pre-binned histograms and box plots (binning)."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from binning import (  # noqa: E402
+    box_figure,
+    box_stats,
+    histogram,
+    histogram_figure,
+    histogram_with_box_figure,
+)
+
+
+@pytest.fixture
+def values():
+    rng = np.random.default_rng(11)
+    return np.concatenate([rng.normal(50, 10, 20_000), rng.normal(200, 5, 50)])
+
+
+def test_histogram_matches_numpy(values):
+    hist = histogram(values, bins=40)
+    counts, edges = np.histogram(values, bins=40)
+
+    np.testing.assert_array_equal(hist.counts, counts)
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_allclose(hist.centers, (edges[:-1] + edges[1:]) / 2)
+    np.testing.assert_allclose(hist.widths, np.diff(edges))
+    assert hist.total == len(values) == hist.counts.sum()
+
+
+def test_histogram_auto_bins_are_capped(values):
+    auto_bins = len(np.histogram_bin_edges(values, bins='auto')) - 1
+    assert len(histogram(values, max_bins=15).counts) == 15
+    assert len(histogram(values, max_bins=auto_bins).counts) == auto_bins
+    assert len(histogram(values[:100]).counts) == len(np.histogram_bin_edges(values[:100], bins='auto')) - 1
+
+
+def test_histogram_drops_missing_and_infinite_values():
+    hist = histogram(pd.Series([1.0, None, 2.0, np.inf, 3.0, -np.inf, 'text']), bins=3)
+    assert hist.total == 3
+    np.testing.assert_array_equal(hist.counts, [1, 1, 1])
+
+
+def test_histogram_of_an_empty_column():
+    hist = histogram(pd.Series([np.nan, None], dtype='float64'))
+    assert hist.total == 0 and hist.counts.sum() == 0
+
+
+def test_box_stats_match_the_loop(values):
+    stats = box_stats(values, max_outliers=10 ** 6)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = [value for value in values if low <= value <= high]
+    outliers = [value for value in values if value < low or value > high]
+
+    assert (stats.q1, stats.median, stats.q3) == pytest.approx((q1, median, q3))
+    assert stats.lower_fence == min(inside) and stats.upper_fence == max(inside)
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.count == len(values)
+    assert stats.outlier_count == len(outliers)
+    assert sorted(stats.outliers) == sorted(outliers)
+
+
+def test_box_outlier_sample_is_capped_but_keeps_the_extremes(values):
+    stats = box_stats(values, max_outliers=20)
+    full = box_stats(values, max_outliers=10 ** 6)
+
+    assert len(stats.outliers) == 20
+    assert stats.outlier_count == full.outlier_count > 20
+    assert stats.outliers.min() == full.outliers.min() and stats.outliers.max() == full.outliers.max()
+    assert set(stats.outliers) <= set(full.outliers)
+    np.testing.assert_array_equal(stats.outliers, box_stats(values, max_outliers=20).outliers)
+
+
+def test_box_stats_of_an_empty_column():
+    stats = box_stats([])
+    assert stats.count == 0 and stats.outlier_count == 0 and np.isnan(stats.median)
+
+
+def test_figure_payload_does_not_grow_with_the_rows():
+    rng = np.random.default_rng(0)
+    small = rng.normal(0, 1, 10_000)
+    large = rng.normal(0, 1, 1_000_000)
+
+    for build in (histogram_figure, box_figure, histogram_with_box_figure):
+        small_bytes = len(build(small, 'title').to_json())
+        large_bytes = len(build(large, 'title').to_json())
+        assert large_bytes < 100_000, build.__name__
+        assert large_bytes < 3 * small_bytes, build.__name__
+
+
+def test_box_figure_notes_the_sampled_outliers(values):
+    fig = box_figure(np.concatenate([values, np.linspace(1000, 2000, 600)]), 'title')
+    assert "500 of" in fig.layout.annotations[0].text
+    assert len(fig.data[1].y) == 500
@@ -0,0 +1,101 @@
+"""Tests for the correlation matrices and strongest pairs (correlation) against pandas."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from correlation import correlation_matrix, top_correlations  # noqa: E402
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(2)
+    base = rng.normal(0, 1, 5000)
+    return pd.DataFrame({
+        'sales': 1000 + 50 * base + rng.normal(0, 10, 5000),
+        'profit': 10 * base + rng.normal(0, 20, 5000),
+        'returns': -3 * base + rng.normal(0, 5, 5000),
+        'noise': rng.normal(0, 1, 5000),
+        'skewed': np.exp(base),
+        'count': rng.integers(0, 100, 5000),
+        'label': rng.choice(['a', 'b'], 5000),
+    })
+
+
+@pytest.fixture
+def gappy(frame):
+    rng = np.random.default_rng(3)
+    gappy = frame.copy()
+    for col in ['sales', 'profit', 'returns', 'noise', 'skewed']:
+        gappy.loc[rng.random(len(gappy)) < 0.15, col] = np.nan
+    return gappy
+
+
+@pytest.mark.parametrize('dtype, tolerance', [('float32', 1e-5), ('float64', 1e-12)])
+def test_pearson_matches_pandas(frame, dtype, tolerance):
+    result = correlation_matrix(frame, dtype=dtype)
+    expected = frame.select_dtypes(include=[np.number]).corr()
+
+    assert list(result.matrix.columns) == list(expected.columns)
+    np.testing.assert_allclose(result.matrix, expected, atol=tolerance)
+
+
+def test_pearson_over_pairwise_complete_rows_matches_pandas(gappy):
+    result = correlation_matrix(gappy, dtype='float64')
+    np.testing.assert_allclose(result.matrix, gappy.select_dtypes(include=[np.number]).corr(), atol=1e-10)
+
+
+def test_spearman_matches_pandas(frame):
+    result = correlation_matrix(frame, method='spearman')
+    np.testing.assert_allclose(result.matrix, frame.select_dtypes(include=[np.number]).corr('spearman'), atol=1e-5)
+
+
+def test_constant_and_empty_columns_have_no_correlation(frame):
+    frame = frame.assign(constant=7.0, empty=np.nan)
+    matrix = correlation_matrix(frame, ['sales', 'constant', 'empty']).matrix
+
+    assert matrix.loc['sales', 'sales'] == 1.0
+    assert matrix.loc[['constant', 'empty']].isna().all().all()
+    assert matrix[['constant', 'empty']].isna().all().all()
+
+
+def test_sampled_estimate_is_close(frame):
+    result = correlation_matrix(frame, sample_rows=2000, seed=1)
+
+    assert result.sampled and result.rows_used == 2000 and result.total_rows == 5000
+    np.testing.assert_allclose(result.matrix, frame.select_dtypes(include=[np.number]).corr(), atol=0.1)
+    assert not correlation_matrix(frame, sample_rows=10_000).sampled
+
+
+def test_unknown_method_is_refused(frame):
+    with pytest.raises(ValueError):
+        correlation_matrix(frame, method='kendall')
+
+
+def naive_top_pairs(matrix, k):
+    """The original nested loop: every pair, sorted by absolute correlation"""
+    pairs = []
+    for i in range(len(matrix.columns)):
+        for j in range(i + 1, len(matrix.columns)):
+            value = matrix.iloc[i, j]
+            if np.isfinite(value):
+                pairs.append((matrix.columns[i], matrix.columns[j], value))
+    pairs.sort(key=lambda pair: abs(pair[2]), reverse=True)
+    return pairs[:k]
+
+
+@pytest.mark.parametrize('k', [1, 5, 10, 100])
+def test_top_correlations_match_the_loop(gappy, k):
+    matrix = gappy.assign(constant=1.0).select_dtypes(include=[np.number]).corr()
+    top = top_correlations(matrix, k)
+
+    assert list(top.columns) == ['Variable 1', 'Variable 2', 'Correlation']
+    assert list(top.itertuples(index=False, name=None)) == naive_top_pairs(matrix, k)
+
+
+def test_top_correlations_without_pairs():
+    assert top_correlations(pd.DataFrame([[1.0]], index=['a'], columns=['a'])).empty
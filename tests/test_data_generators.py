@@ -0,0 +1,94 @@
+"""Tests for the vectorized sample data generators (data_generators) against the original loops."""
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import data_generators  # noqa: E402
+import legacy_generators  # noqa: E402
+
+DATASETS = ['sales', 'healthcare', 'finance', 'industry_agnostic',
+            'manufacturing', 'operations', 'government']
+
+ROWS = 5000
+
+
+@pytest.fixture(scope='module', params=DATASETS)
+def generated(request):
+    """(dataset, legacy frame, vectorized frame) for the same number of rows"""
+    dataset = request.param
+    random.seed(0)
+    legacy = getattr(legacy_generators, f'generate_{dataset}_data_df')(ROWS)
+    vectorized = getattr(data_generators, f'generate_{dataset}_data_df')(ROWS, seed=0)
+    return dataset, legacy, vectorized
+
+
+def test_schema_matches_the_loops(generated):
+    _, legacy, vectorized = generated
+    assert list(vectorized.columns) == list(legacy.columns)
+    for col in legacy.columns:
+        assert vectorized[col].dtype == legacy[col].dtype, col
+        assert pd.api.types.infer_dtype(vectorized[col], skipna=True) == \
+            pd.api.types.infer_dtype(legacy[col], skipna=True), col
+
+
+def test_null_rates_match_the_loops(generated):
+    _, legacy, vectorized = generated
+    difference = (vectorized.isna().mean() - legacy.isna().mean()).abs()
+    assert difference.max() < 0.03, difference.idxmax()
+
+
+def test_categorical_values_match_the_loops(generated):
+    _, legacy, vectorized = generated
+    for col in legacy.columns:
+        expected = set(legacy[col].dropna().map(repr))
+        if len(expected) <= 60:
+            assert set(vectorized[col].dropna().map(repr)) == expected, col
+
+
+def test_duplicate_share_matches_the_loops(generated):
+    dataset, legacy, vectorized = generated
+    if dataset in data_generators.STREAMING_DATASETS:
+        assert abs(len(vectorized) - len(legacy)) / ROWS < 0.01
+    else:
+        assert len(vectorized) == len(legacy) == ROWS
+
+
+def test_seed_makes_the_data_reproducible():
+    first = data_generators.generate_operations_data_df(500, seed=3)
+    pd.testing.assert_frame_equal(first, data_generators.generate_operations_data_df(500, seed=3))
+    assert not first.equals(data_generators.generate_operations_data_df(500, seed=4))
+
+
+def test_chunks_continue_the_record_ids():
+    chunks = list(data_generators.iter_sample_chunks('manufacturing', 2500, chunk_size=1000, seed=0))
+    assert len(chunks) == 3
+
+    ids = pd.concat(chunks)['batch_id'].drop_duplicates()
+    expected = data_generators.generate_manufacturing_data_df(2500, seed=0)['batch_id'].drop_duplicates()
+    assert len(ids) == 2500
+    assert ids.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+def test_written_file_holds_every_row(tmp_path, file_format):
+    path = str(tmp_path / f'government.{file_format}')
+    done = []
+    written = data_generators.write_sample_data('government', 2500, path, file_format, chunk_size=1000, seed=0,
+                                                on_chunk=done.append)
+
+    frame = pd.read_csv(path) if file_format == 'csv' else pd.read_parquet(path)
+    assert len(frame) == written >= 2500
+    assert list(frame.columns) == list(data_generators.generate_government_data_df(10, seed=0).columns)
+    assert done == [1000, 2000, 2500]
+
+
+def test_industry_datasets_are_capped(monkeypatch):
+    monkeypatch.setattr(data_generators, 'MAX_GENERATED_ROWS', 100)
+    assert data_generators.generate_government_data_df(5000, seed=0)['case_id'].nunique() == 100
@@ -0,0 +1,104 @@
+"""Tests for the token-budgeted dataset summaries of the AI prompts (dataset_summary)."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset_summary import SummaryCache, summarize_dataset  # noqa: E402
+from profiler import ProfileCache  # noqa: E402
+from prompt_budget import estimate_tokens  # noqa: E402
+
+# Profiles are shared between the tests, as the app shares them between pages
+PROFILES = ProfileCache(max_entries=8)
+
+
+def summarize(df, **options):
+    return summarize_dataset(df, profile_cache=PROFILES, **options)
+
+
+@pytest.fixture(scope='module')
+def wide():
+    rng = np.random.default_rng(4)
+    n = 500
+    columns = {'date': pd.date_range('2024-01-01', periods=n, freq='D')}
+    for i in range(120):
+        columns[f'metric_{i:03d}'] = rng.normal(100, 1 + i, n)
+    for i in range(40):
+        columns[f'label_{i:02d}'] = rng.choice(['alpha', 'beta', 'gamma'], n)
+    return pd.DataFrame(columns)
+
+
+def summary_tokens(summary):
+    return sum(estimate_tokens(text) for text in (summary.statistics, summary.dtypes, summary.missing, summary.sample))
+
+
+@pytest.mark.parametrize('token_budget', [300, 1000, 2000, 5000])
+def test_summary_fits_its_token_budget(wide, token_budget):
+    summary = summarize(wide, max_columns=200, token_budget=token_budget)
+
+    assert summary.tokens == summary_tokens(summary)
+    assert summary.tokens <= token_budget
+    assert summary.truncated
+    assert summary.shown_columns == [col for col in wide.columns if col in summary.shown_columns]
+
+
+def test_budget_is_used_nearly_in_full(wide):
+    # One more column would not have fitted: the budget is not left mostly unused
+    summary = summarize(wide, max_columns=200, token_budget=2000)
+    assert summary.tokens > 2000 * 0.8
+    more = summarize(wide, max_columns=len(summary.shown_columns) + 1, token_budget=10 ** 6)
+    assert more.tokens > 2000
+
+
+def test_larger_budgets_describe_more_columns(wide):
+    shown = [len(summarize(wide, max_columns=200, token_budget=budget).shown_columns)
+             for budget in (300, 1000, 2000, 5000)]
+    assert shown == sorted(shown) and shown[0] < shown[-1]
+
+
+def test_at_least_one_column_is_described(wide):
+    summary = summarize(wide, token_budget=1)
+    assert len(summary.shown_columns) == 1
+
+
+def test_column_cap_and_notes(wide):
+    summary = summarize(wide, max_columns=10, token_budget=10 ** 6)
+
+    assert len(summary.shown_columns) == 10
+    assert summary.column_note() == f"(describing the 10 most informative of {len(wide.columns)} columns)"
+    assert summary.column_list().endswith(f", ... and {len(wide.columns) - 10} more")
+    assert summary.numeric_columns == [col for col in summary.shown_columns if col.startswith('metric_')]
+    assert len(summary.all_numeric_columns) == 120
+
+
+def test_small_dataset_is_described_in_full():
+    df = pd.DataFrame({'region': ['North', 'South', 'North'], 'sales': [1.0, 2.5, 4.0]})
+    summary = summarize(df)
+
+    assert not summary.truncated and summary.column_note() == ''
+    assert summary.shown_columns == ['region', 'sales']
+    assert summary.rows == 3
+    assert (summary.first_min, summary.first_max) == ('North', 'South')
+    assert 'sales' in summary.statistics and 'region' in summary.sample
+
+
+def test_priority_columns_are_always_described(wide):
+    summary = summarize(wide, max_columns=200, token_budget=300, priority=('label_39', 'metric_000'))
+    assert {'label_39', 'metric_000'} <= set(summary.shown_columns)
+    assert summary.tokens <= 300
+
+
+def test_summaries_are_cached_per_dataset_and_settings(wide):
+    cache = SummaryCache(max_entries=4)
+    first = summarize(wide, cache=cache)
+
+    assert summarize(wide, cache=cache) is first
+    assert summarize(wide, cache=cache, priority=('label_00',)) is not first
+    assert summarize(wide, cache=cache, token_budget=500) is not first
+    changed = wide.assign(metric_000=wide['metric_000'] + 1)
+    assert summarize(changed, cache=cache) is not first
+    assert cache.hits == 1 and cache.misses == 4
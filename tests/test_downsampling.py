@@ -0,0 +1,121 @@
+"""Tests for the point-budget downsampling of the time series charts (downsampling)."""
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downsampling import downsample, lttb_indices, minmax_indices, use_webgl  # noqa: E402
+
+
+def naive_lttb(x, y, budget):
+    """Largest-Triangle-Three-Buckets as published, one bucket and one candidate at a time"""
+    n = len(y)
+    every = (n - 2) / (budget - 2)
+    selected = [0]
+    for bucket in range(budget - 2):
+        start, stop = int(math.floor(bucket * every)) + 1, int(math.floor((bucket + 1) * every)) + 1
+        next_start, next_stop = stop, min(int(math.floor((bucket + 2) * every)) + 1, n)
+        if bucket == budget - 3:
+            next_start, next_stop = n - 1, n
+        mean_x = sum(x[next_start:next_stop]) / (next_stop - next_start)
+        mean_y = sum(y[next_start:next_stop]) / (next_stop - next_start)
+        a = selected[-1]
+        best, best_area = start, -1.0
+        for i in range(start, stop):
+            area = abs((x[a] - mean_x) * (y[i] - y[a]) - (x[a] - x[i]) * (mean_y - y[a]))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(5)
+    y = rng.normal(0, 1, 10_000).cumsum()
+    y[[1234, 7777]] = [250.0, -250.0]  # spikes the min/max buckets must keep
+    return np.arange(len(y), dtype='float64'), y
+
+
+@pytest.mark.parametrize('budget', [3, 10, 101, 2000])
+def test_lttb_matches_the_published_loop(series, budget):
+    x, y = series
+    np.testing.assert_array_equal(lttb_indices(x, y, budget), naive_lttb(x, y, budget))
+
+
+def test_lttb_keeps_the_endpoints_and_one_point_per_bucket(series):
+    x, y = series
+    kept = lttb_indices(x, y, 500)
+
+    assert len(kept) == 500
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert (np.diff(kept) > 0).all()
+    assert {1234, 7777} <= set(kept)
+
+
+def test_lttb_on_datetimes_and_gaps(series):
+    _, y = series
+    y = y.copy()
+    y[100:200] = np.nan
+    dates = pd.date_range('2020-01-01', periods=len(y), freq='min').to_numpy()
+
+    kept = lttb_indices(dates, y, 300)
+    assert len(kept) == 300 and (np.diff(kept) > 0).all()
+
+
+def test_lttb_with_budget_too_small_or_too_large():
+    x = np.arange(10.0)
+    np.testing.assert_array_equal(lttb_indices(x, x, 20), np.arange(10))
+    np.testing.assert_array_equal(lttb_indices(x, x, 2), [0, 9])
+
+
+@pytest.mark.parametrize('budget', [4, 50, 1001])
+def test_minmax_keeps_every_bucket_extreme(series, budget):
+    _, y = series
+    kept = minmax_indices(y, budget)
+
+    assert len(kept) <= budget
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert {int(np.argmin(y)), int(np.argmax(y))} <= set(kept)
+    # Every point lies within the range of the kept points of its own bucket
+    size = -(-len(y) // max(1, (budget - 2) // 2))
+    for start in range(0, len(y), size):
+        bucket = y[start:start + size]
+        in_bucket = kept[(kept >= start) & (kept < start + size)]
+        assert y[in_bucket].min() == bucket.min() and y[in_bucket].max() == bucket.max()
+
+
+def test_minmax_ignores_missing_values():
+    y = np.array([np.nan, 1.0, 5.0, np.nan, -2.0, 3.0, np.nan, 0.0, 4.0, np.nan])
+    kept = minmax_indices(y, 4)
+    assert {2, 4} <= set(kept)
+
+
+@pytest.mark.parametrize('mode', ['LTTB', 'Min/Max'])
+def test_downsample_cuts_to_the_range_before_the_budget(mode):
+    frame = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=20_000, freq='h'),
+                          'value': np.sin(np.arange(20_000) / 50.0)})
+    frame['rolling'] = frame['value'].rolling(24).mean()
+
+    subset, total = downsample(frame, 'date', 'value', budget=1000, mode=mode)
+    assert total == 20_000 and len(subset) <= 1000
+    assert subset['date'].is_monotonic_increasing
+    pd.testing.assert_frame_equal(subset, frame.loc[subset.index])  # whole rows, other columns included
+
+    window = (pd.Timestamp('2024-03-01'), pd.Timestamp('2024-03-10'))
+    subset, total = downsample(frame, 'date', 'value', budget=1000, mode=mode, x_range=window)
+    assert total == 9 * 24 + 1
+    assert len(subset) == total  # narrow enough to draw at full resolution
+    assert subset['date'].min() == window[0] and subset['date'].max() == window[1]
+
+
+def test_webgl_switch():
+    assert use_webgl(6000, 'Auto', threshold=5000)
+    assert not use_webgl(5000, 'Auto', threshold=5000)
+    assert use_webgl(10, 'WebGL') and not use_webgl(10 ** 6, 'SVG')
@@ -0,0 +1,168 @@
+"""Tests for per-session DuckDB isolation (duckdb_sessions)."""
+import os
+import sys
+import time
+
+import duckdb
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duckdb_sessions import (  # noqa: E402
+    DuckDBConnectionManager,
+    SessionAccessError,
+    check_session_sql,
+    cleanup_idle_sessions,
+    is_session_id,
+    is_session_token,
+    new_session_token,
+    session_database_path,
+    session_id_for_token,
+)
+
+
+@pytest.fixture(params=['memory', 'disk'])
+def sessions(request, tmp_path):
+    """A manager with two open sessions; the victim has a table and a file in its directory"""
+    manager = DuckDBConnectionManager(storage=request.param, spill_dir=str(tmp_path), threads=1)
+    victim = session_id_for_token(new_session_token())
+    attacker = session_id_for_token(new_session_token())
+    victim_con = manager.connect(victim)
+    victim_con.execute("CREATE TABLE uploaded_data AS SELECT 'victim secret' AS secret")
+    with open(os.path.join(manager.files_dir(victim), 'sales_sample.csv'), 'w') as handle:
+        handle.write("secret\nvictim secret\n")
+    yield manager, victim, attacker, manager.connect(attacker)
+    for session_id in (victim, attacker):
+        manager.release(session_id)
+
+
+def attacks(manager, victim):
+    files = manager.files_dir(victim)
+    return [
+        "SELECT sql FROM sqlite_master",
+        "SELECT * FROM sqlite_schema",
+        "SELECT * FROM pg_tables",
+        "SELECT * FROM pg_catalog.pg_class",
+        "SELECT * FROM information_schema.tables",
+        "SELECT * FROM duckdb_tables()",
+        "SELECT * FROM duckdb_settings()",
+        "SELECT * FROM pragma_database_list",
+        f"SELECT * FROM session_{victim}.uploaded_data",
+        f'SELECT * FROM "session_{victim}".main.uploaded_data',
+        f"SELECT * FROM read_csv('{files}/sales_sample.csv')",
+        f"SELECT * FROM read_text('{session_database_path(victim, manager.spill_dir)}')",
+        f"ATTACH '{session_database_path(victim, manager.spill_dir)}' AS stolen",
+        f"ATTACH ':memory:' AS session_{victim}",
+        "USE memory",
+        f"USE session_{victim}",
+        "SET enable_external_access = true",
+        "PRAGMA show_tables",
+        "PRAGMA database_list",
+        "CALL pragma_version()",
+        "SELECT * FROM query('SELECT * FROM sqlite_master')",
+        f"SELECT 'session_{victim}' AS name",
+        "SELECT 1; ATTACH ':memory:' AS other",
+        "COPY uploaded_data TO 'out.csv'",
+        "LOAD httpfs",
+    ]
+
+
+def test_attacks_are_refused(sessions):
+    manager, victim, attacker, con = sessions
+    for sql in attacks(manager, victim):
+        with pytest.raises(SessionAccessError):
+            check_session_sql(con, sql, attacker)
+
+
+def test_database_keeps_other_sessions_out_without_the_check(sessions):
+    manager, victim, attacker, con = sessions
+    for sql in attacks(manager, victim):
+        try:
+            rows = con.execute(sql).fetchall()
+        except duckdb.Error:
+            continue
+        assert 'victim secret' not in repr(rows), sql
+
+
+def test_file_access_is_limited_to_the_session_directory(sessions):
+    manager, victim, attacker, con = sessions
+    with pytest.raises(duckdb.PermissionException):
+        con.execute(f"SELECT * FROM read_csv('{manager.files_dir(victim)}/sales_sample.csv')")
+    with pytest.raises(duckdb.PermissionException):
+        con.execute(f"SELECT * FROM read_csv('{manager.spill_dir}/*/*.csv')")
+    with pytest.raises(duckdb.Error):
+        con.execute("SET allowed_directories = ['/']")
+
+    own = os.path.join(manager.files_dir(attacker), 'own.csv')
+    with open(own, 'w') as handle:
+        handle.write("value\n1\n2\n")
+    assert con.execute("SELECT SUM(value) FROM read_csv_auto(?)", [own]).fetchone()[0] == 3
+
+
+def test_own_tables_still_work(sessions):
+    manager, victim, attacker, con = sessions
+    statements = [
+        "CREATE TABLE uploaded_data AS SELECT range AS id, range % 3 AS views FROM range(10)",
+        "SELECT views, COUNT(*) FROM uploaded_data GROUP BY views",
+        "WITH c AS (SELECT * FROM uploaded_data WHERE id > 5) SELECT COUNT(*) FROM c",
+        "UPDATE uploaded_data SET views = 0 WHERE id = 1",
+        "DELETE FROM uploaded_data WHERE id = 9",
+        "SELECT * FROM uploaded_data WHERE CAST(id AS VARCHAR) LIKE '%session%'",
+        "EXPLAIN SELECT * FROM uploaded_data",
+        "DESCRIBE uploaded_data",
+    ]
+    for sql in statements:
+        check_session_sql(con, sql, attacker)
+        con.execute(sql)
+    assert con.execute("SELECT COUNT(*) FROM uploaded_data").fetchone()[0] == 9
+
+
+def test_sessions_do_not_share_tables(sessions):
+    manager, victim, attacker, con = sessions
+    con.execute("CREATE TABLE uploaded_data AS SELECT 'attacker' AS secret")
+    assert con.execute("SELECT secret FROM uploaded_data").fetchall() == [('attacker',)]
+    assert manager.connect(victim).execute("SELECT secret FROM uploaded_data").fetchall() == [('victim secret',)]
+
+
+def test_session_id_is_a_one_way_hash_of_the_token():
+    token = new_session_token()
+    session_id = session_id_for_token(token)
+
+    assert is_session_token(token) and is_session_id(session_id)
+    assert session_id == session_id_for_token(token)
+    assert session_id != session_id_for_token(new_session_token())
+    assert not is_session_token(session_id)
+    assert token not in session_id
+
+
+def test_disk_session_survives_a_release(tmp_path):
+    manager = DuckDBConnectionManager(storage='disk', spill_dir=str(tmp_path), threads=1)
+    session_id = session_id_for_token(new_session_token())
+    manager.connect(session_id).execute("CREATE TABLE uploaded_data AS SELECT 42 AS answer")
+    manager.release(session_id)
+
+    assert manager.connect(session_id).execute("SELECT answer FROM uploaded_data").fetchone()[0] == 42
+    manager.release(session_id)
+
+
+def test_memory_session_files_are_removed_on_release(tmp_path):
+    manager = DuckDBConnectionManager(storage='memory', spill_dir=str(tmp_path), threads=1)
+    session_id = session_id_for_token(new_session_token())
+    manager.connect(session_id)
+    assert os.path.isdir(manager.files_dir(session_id))
+
+    manager.release(session_id)
+    assert not manager.is_open(session_id)
+    assert not os.path.exists(manager.files_dir(session_id))
+
+
+def test_cleanup_removes_idle_session_files(tmp_path):
+    manager = DuckDBConnectionManager(storage='disk', spill_dir=str(tmp_path), threads=1)
+    session_id = session_id_for_token(new_session_token())
+    manager.connect(session_id).execute("CREATE TABLE uploaded_data AS SELECT 1 AS x")
+    manager.release(session_id)
+
+    assert cleanup_idle_sessions(str(tmp_path), ttl_seconds=3600) == []
+    assert cleanup_idle_sessions(str(tmp_path), ttl_seconds=3600, now=time.time() + 7200) == [session_id]
+    assert not os.path.exists(session_database_path(session_id, str(tmp_path)))
+    assert not os.path.exists(manager.files_dir(session_id))
@@ -0,0 +1,214 @@
+"""Tests for the forecasting methods (forecasting)."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import forecasting  # noqa: E402
+from forecasting import (  # noqa: E402
+    ALPHA_GRID,
+    exponential_smoothing_levels,
+    fit_alpha,
+    fit_exponential_smoothing,
+    fit_holt_winters,
+    fit_holt_winters_matrix,
+    fit_moving_average,
+    linear_recurrence,
+)
+
+
+def naive_recurrence(u, decay, initial):
+    out = np.empty_like(u)
+    for row in range(u.shape[0]):
+        previous = initial[row]
+        for t in range(u.shape[1]):
+            previous = out[row, t] = u[row, t] + decay[row] * previous
+    return out
+
+
+def naive_levels(values, alpha):
+    levels = [values[0]]
+    for value in values[1:]:
+        levels.append(alpha * value + (1 - alpha) * levels[-1])
+    return np.array(levels)
+
+
+def naive_sse(values, alpha):
+    levels = naive_levels(values, alpha)
+    return float(((values[1:] - levels[:-1]) ** 2).sum())
+
+
+def naive_holt_winters(values, alpha, beta, gamma, season_length, periods):
+    """Textbook additive Holt-Winters, one point at a time: (forecasts, sse, fitted)"""
+    m = season_length or 0
+    if m:
+        level = float(np.mean(values[:m]))
+        trend = (float(np.mean(values[m:2 * m])) - level) / m
+        seasonal = list(values[:m] - level)
+        first = m
+    else:
+        level, trend, seasonal, first = values[0], values[1] - values[0], [0.0], 1
+    sse, fitted = 0.0, [np.nan] * len(values)
+    for t in range(first, len(values)):
+        season = seasonal[t % m] if m else 0.0
+        fitted[t] = level + trend + season
+        sse += (values[t] - fitted[t]) ** 2
+        new_level = alpha * (values[t] - season) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        if m:
+            seasonal[t % m] = gamma * (values[t] - new_level) + (1 - gamma) * season
+        level = new_level
+    n = len(values)
+    forecasts = [level + k * trend + (seasonal[(n + k - 1) % m] if m else 0.0) for k in range(1, periods + 1)]
+    return np.array(forecasts), sse, np.array(fitted)
+
+
+@pytest.fixture
+def noisy_series():
+    rng = np.random.default_rng(7)
+    return pd.Series(100 + rng.normal(0, 1, 200).cumsum())
+
+
+@pytest.fixture(params=[False, True], ids=['numpy', 'scipy'])
+def recurrence_engine(request, monkeypatch):
+    """Run the test with the blocked-cumsum recurrence and, when installed, SciPy's lfilter"""
+    if request.param:
+        pytest.importorskip('scipy.signal')
+    monkeypatch.setattr(forecasting, 'HAS_SCIPY', request.param)
+    return request.param
+
+
+def test_linear_recurrence_matches_the_loop(recurrence_engine):
+    rng = np.random.default_rng(1)
+    decay = np.array([0.0, 1e-20, 0.05, 0.5, 0.95, 0.999])
+    u = rng.normal(0, 1, (len(decay), 3000))  # several blocks for every decay
+    initial = rng.normal(0, 10, len(decay))
+
+    expected = naive_recurrence(u, np.maximum(decay, forecasting._MIN_DECAY), initial)
+    np.testing.assert_allclose(linear_recurrence(u, decay, initial), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_linear_recurrence_of_an_empty_series(recurrence_engine):
+    assert linear_recurrence(np.empty((2, 0)), [0.5, 0.5], [1.0, 2.0]).shape == (2, 0)
+
+
+@pytest.mark.parametrize('alpha', [0.05, 0.3, 0.95, 1.0])
+def test_smoothing_levels_match_the_loop(recurrence_engine, noisy_series, alpha):
+    values = noisy_series.to_numpy()
+    np.testing.assert_allclose(exponential_smoothing_levels(values, alpha), naive_levels(values, alpha), rtol=1e-10)
+
+
+def test_fit_alpha_scores_the_grid_like_the_loop(recurrence_engine, noisy_series):
+    values = noisy_series.to_numpy()
+    expected = np.array([naive_sse(values, alpha) for alpha in ALPHA_GRID])
+
+    best, sse = fit_alpha(values)
+    np.testing.assert_allclose(sse, expected, rtol=1e-9)
+    assert best == ALPHA_GRID[np.argmin(expected)]
+
+    # Streaming the series in small chunks carries the level over exactly
+    best_chunked, sse_chunked = fit_alpha(values, chunk_points=len(ALPHA_GRID) * 7)
+    np.testing.assert_allclose(sse_chunked, expected, rtol=1e-9)
+    assert best_chunked == best
+
+
+def test_fit_alpha_on_too_short_series():
+    for values in ([], [5.0], [np.nan, 5.0, np.nan]):
+        best, sse = fit_alpha(values)
+        assert best == ALPHA_GRID[0]
+        assert not sse.any()
+
+
+def test_exponential_smoothing_forecast_is_the_last_level(recurrence_engine, noisy_series):
+    values = noisy_series.to_numpy()
+    forecast = fit_exponential_smoothing(noisy_series, alpha=0.3, periods=5)
+
+    np.testing.assert_allclose(forecast.values, [naive_levels(values, 0.3)[-1]] * 5)
+    assert forecast.params == {'alpha': 0.3}
+    assert forecast.rmse == pytest.approx(np.sqrt(naive_sse(values, 0.3) / (len(values) - 1)))
+
+
+def test_gaps_are_dropped_before_fitting(noisy_series):
+    gappy = noisy_series.copy()
+    gappy.iloc[[20, 21, 150]] = np.nan  # periods a resample with "Leave gaps" leaves empty
+    observed = gappy.dropna()
+
+    for fit, kwargs in [(fit_moving_average, {'window': 7}),
+                        (fit_exponential_smoothing, {'alpha': 0.3}),
+                        (fit_exponential_smoothing, {'alpha': 'auto'})]:
+        with_gaps = fit(gappy, periods=2, **kwargs)
+        without = fit(observed, periods=2, **kwargs)
+        assert np.isfinite(with_gaps.values).all()
+        np.testing.assert_allclose(with_gaps.values, without.values)
+        assert with_gaps.params == without.params
+        assert np.isfinite(with_gaps.mape) and np.isfinite(with_gaps.rmse)
+
+    assert fit_alpha(gappy)[0] == fit_alpha(observed)[0]
+    assert np.isfinite(fit_alpha(gappy)[1]).all()
+
+
+@pytest.mark.parametrize('season_length', [None, 7])
+def test_holt_winters_matches_the_loop(noisy_series, season_length):
+    values = noisy_series.to_numpy()
+    grid = np.array([0.2, 0.5])
+    forecast = fit_holt_winters(values, periods=10, season_length=season_length, grid=grid)
+
+    candidates = [(a, b, g) for a in grid for b in grid for g in (grid if season_length else [0.0])]
+    results = {params: naive_holt_winters(values, *params, season_length, 10) for params in candidates}
+    best = min(results, key=lambda params: results[params][1])
+    expected, _, fitted = results[best]
+
+    assert (forecast.params['alpha'], forecast.params['beta']) == best[:2]
+    assert forecast.params.get('gamma', 0.0) == best[2]
+    np.testing.assert_allclose(forecast.values, expected, rtol=1e-10)
+    valid = ~np.isnan(fitted)
+    assert forecast.rmse == pytest.approx(np.sqrt(np.mean((values[valid] - fitted[valid]) ** 2)))
+
+
+def test_double_smoothing_extends_a_straight_line():
+    forecast = fit_holt_winters(5 + 2.0 * np.arange(30), periods=4)
+    np.testing.assert_allclose(forecast.values, 5 + 2.0 * np.arange(30, 34))
+    assert forecast.method == 'Holt-Winters (double)'
+
+
+@pytest.mark.parametrize('points', [70, 73, 76])
+def test_seasonal_forecast_continues_the_pattern_in_phase(points):
+    pattern = np.array([3.0, -1.0, 4.0, -1.5, 5.0, -9.0, -0.5])
+    values = 100 + pattern[np.arange(points) % 7]  # the series does not end on a season boundary
+    forecast = fit_holt_winters(values, periods=10, season_length=7)
+
+    np.testing.assert_allclose(forecast.values, 100 + pattern[np.arange(points, points + 10) % 7], atol=1e-9)
+    assert forecast.method == 'Holt-Winters (triple)'
+    assert forecast.params['season_length'] == 7
+
+
+def test_batch_fit_matches_separate_fits(noisy_series):
+    rows = np.vstack([noisy_series.to_numpy(), noisy_series.to_numpy()[::-1], np.linspace(0, 50, 200)])
+    forecasts, params, _ = fit_holt_winters_matrix(rows, periods=5, season_length=7)
+
+    for row, values in enumerate(rows):
+        single = fit_holt_winters(values, periods=5, season_length=7)
+        np.testing.assert_allclose(forecasts[row], single.values)
+        assert {name: params[name][row] for name in ('alpha', 'beta', 'gamma')} == \
+            {name: single.params[name] for name in ('alpha', 'beta', 'gamma')}
+
+
+@pytest.mark.parametrize('points, season_length', [(2, None), (13, 7), (3, 2)])
+def test_holt_winters_refuses_series_too_short(points, season_length):
+    with pytest.raises(ValueError):
+        fit_holt_winters(np.arange(points, dtype='float64'), season_length=season_length)
+
+
+def test_holt_winters_accepts_two_full_seasons():
+    assert len(fit_holt_winters(np.arange(14, dtype='float64'), periods=3, season_length=7).values) == 3
+
+
+def test_holt_winters_refuses_missing_values(noisy_series):
+    gappy = noisy_series.copy()
+    gappy.iloc[10] = np.nan
+    with pytest.raises(ValueError):
+        fit_holt_winters(gappy)
@@ -0,0 +1,80 @@
+"""Tests for the token estimates and column ranking of the AI prompts (prompt_budget)."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiler import profile_dataframe  # noqa: E402
+from prompt_budget import CHARS_PER_TOKEN, column_scores, estimate_tokens, mentioned_columns  # noqa: E402
+
+COLUMNS = ['id', 'sales', 'sales_total', 'Region', 'unit price ($)', 'c++ score', 2024]
+
+
+@pytest.mark.parametrize('question, expected', [
+    ("Which region has the highest sales?", ['sales', 'Region']),
+    ("What drives SALES_TOTAL?", ['sales_total']),
+    ("sales_total vs sales", ['sales', 'sales_total']),
+    ("Is unit price ($) related to the c++ score?", ['unit price ($)', 'c++ score']),
+    ("Did paid orders grow?", []),  # 'id' inside other words
+    ("Compare regions and salesperson results", []),
+    ("Show the id column", ['id']),
+    ("How did 2024 go?", [2024]),
+    ("", []),
+    (None, []),
+])
+def test_mentioned_columns_match_whole_words(question, expected):
+    assert mentioned_columns(COLUMNS, question) == expected
+
+
+def test_mentioned_columns_keep_column_order():
+    assert mentioned_columns(['b', 'a'], "a then b") == ['b', 'a']
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens('') == 0
+    assert estimate_tokens('x') == 1
+    assert estimate_tokens('x' * int(CHARS_PER_TOKEN * 10)) == 10
+
+
+@pytest.fixture
+def dataset():
+    rng = np.random.default_rng(0)
+    n = 2000
+    signal = rng.normal(0, 1, n)
+    return pd.DataFrame({
+        'order_id': [f'O{i:05d}' for i in range(n)],
+        'region': rng.choice(['North', 'South', 'East', 'West'], n),
+        'sales': 100 + 10 * signal,
+        'profit': 5 * signal + rng.normal(0, 1, n),
+        'noise': rng.normal(5, 1, n),
+        'constant': 1.0,
+        'sparse': np.where(rng.random(n) < 0.9, np.nan, rng.normal(0, 1, n)),
+    })
+
+
+def test_scores_rank_informative_columns_first(dataset):
+    scores = column_scores(dataset, profile_dataframe(dataset))
+
+    assert list(scores.index[:2]) == ['sales', 'profit']  # the target, then what correlates with it
+    assert scores['region'] > scores['order_id']  # groupable text above identifiers
+    assert scores['noise'] > scores['sparse'] > scores['constant'] == 0.0
+    assert scores.is_monotonic_decreasing
+
+
+def test_priority_columns_rank_above_everything(dataset):
+    scores = column_scores(dataset, profile_dataframe(dataset), priority=('noise', 'order_id', 'missing'))
+
+    assert list(scores.index[:2]) == ['noise', 'order_id']
+    assert scores.drop(['noise', 'order_id']).max() <= 1.0
+    # Relevance is now measured against the prompted numeric column, which sales does not track
+    assert scores['sales'] < column_scores(dataset, profile_dataframe(dataset))['sales'] - 1.0
+
+
+def test_explicit_target(dataset):
+    scores = column_scores(dataset, profile_dataframe(dataset), target='profit')
+    assert scores.index[0] == 'profit'
+    assert scores['sales'] > scores['noise']
@@ -0,0 +1,159 @@
+"""Tests for the cached SQL execution of the SQL Cleaner pages (query_engine)."""
+import os
+import sys
+from io import BytesIO
+
+import duckdb
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingestion import load_into_duckdb  # noqa: E402
+from query_engine import (  # noqa: E402
+    QueryCache,
+    execute_query,
+    is_cacheable,
+    is_read_only,
+    normalize_sql,
+)
+
+
+class Upload(BytesIO):
+    """Stand-in for Streamlit's UploadedFile"""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+@pytest.fixture
+def upload(tmp_path):
+    con = duckdb.connect(':memory:')
+    csv = b"id,region,sales\n" + b"".join(f"{i},{'north' if i % 2 else 'south'},{i * 10}\n".encode()
+                                          for i in range(1, 101))
+    return load_into_duckdb(con, Upload(csv, 'sales.csv'), spool=True, spool_dir=str(tmp_path))
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT * FROM uploaded_data",
+    "select region, sum(sales) from uploaded_data group by region",
+    "FROM uploaded_data WHERE region = 'north'",
+    "WITH north AS (SELECT * FROM uploaded_data WHERE region = 'north') SELECT COUNT(*) FROM north",
+    "WITH a AS (SELECT * FROM uploaded_data), b AS (SELECT * FROM a) SELECT * FROM b",
+    "SELECT * FROM uploaded_data WHERE region IN (SELECT region FROM uploaded_data LIMIT 1)",
+    "SELECT 'random() now()' AS label FROM uploaded_data",
+    "(SELECT id FROM uploaded_data) UNION ALL (SELECT id FROM uploaded_data)",
+])
+def test_deterministic_queries_over_the_upload_are_cacheable(sql):
+    assert is_cacheable(normalize_sql(sql))
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT * FROM other_table",
+    "SELECT * FROM main.uploaded_data",
+    "SELECT * FROM memory.main.uploaded_data",
+    "WITH uploaded AS (SELECT * FROM other_table) SELECT * FROM uploaded",
+    "SELECT * FROM range(10)",
+    "SELECT * FROM read_csv('sales.csv')",
+    "SELECT * FROM duckdb_tables()",
+    "SELECT * FROM uploaded_data, generate_series(1, 3)",
+    "SELECT random() FROM uploaded_data",
+    "SELECT *, now() FROM uploaded_data",
+    "SELECT * FROM uploaded_data WHERE id = nextval('ids')",
+    "SELECT * FROM uploaded_data USING SAMPLE 10",
+    "SELECT * FROM uploaded_data TABLESAMPLE 10%",
+    "SELECT * FROM uploaded_data; DELETE FROM uploaded_data",
+    "DELETE FROM uploaded_data",
+    "EXPLAIN SELECT * FROM uploaded_data",
+    "SELEC * FROM uploaded_data",
+])
+def test_other_queries_are_not_cacheable(sql):
+    assert not is_cacheable(normalize_sql(sql))
+
+
+@pytest.mark.parametrize('sql, read_only', [
+    ("SELECT * FROM uploaded_data", True),
+    ("WITH a AS (SELECT 1) SELECT * FROM a", True),
+    ("DESCRIBE uploaded_data", True),
+    ("EXPLAIN SELECT * FROM uploaded_data", True),
+    ("EXPLAIN DELETE FROM uploaded_data", True),
+    ("EXPLAIN (FORMAT json) UPDATE uploaded_data SET sales = 0", True),
+    ("EXPLAIN ANALYZE SELECT * FROM uploaded_data", True),
+    ("EXPLAIN ANALYZE DELETE FROM uploaded_data", False),
+    ("explain /* plan */ analyse update uploaded_data set sales = 0", False),
+    ("EXPLAIN (ANALYZE false) DELETE FROM uploaded_data", False),
+    ("DELETE FROM uploaded_data", False),
+    ("CREATE TABLE copy AS SELECT * FROM uploaded_data", False),
+    ("SELECT 1; DROP TABLE uploaded_data", False),
+    ("not sql at all", False),
+])
+def test_read_only_statements(sql, read_only):
+    assert is_read_only(sql) == read_only
+
+
+def test_explain_leaves_the_data_and_the_cache_alone(upload):
+    cache = QueryCache(max_bytes=1024**2)
+    sql = "SELECT region, SUM(sales) AS sales FROM uploaded_data GROUP BY region ORDER BY region"
+    execute_query(upload.con, sql, upload.data_key, cache)
+
+    explained = execute_query(upload.con, "EXPLAIN DELETE FROM uploaded_data", upload.data_key, cache)
+    assert not explained.modified_data
+    assert upload.con.execute("SELECT COUNT(*) FROM uploaded_data").fetchone()[0] == 100
+    assert execute_query(upload.con, sql, upload.data_key, cache).from_cache
+
+
+def test_repeats_are_served_from_the_cache(upload):
+    cache = QueryCache(max_bytes=1024**2)
+    first = execute_query(upload.con, "SELECT region, COUNT(*) FROM uploaded_data GROUP BY region", upload.data_key,
+                          cache)
+    again = execute_query(upload.con, "select region, count(*)\n  from uploaded_data -- again\n group by region",
+                          upload.data_key, cache)
+
+    assert not first.from_cache and again.from_cache
+    assert again.table.equals(first.table)
+    assert cache.stats()['hits'] == 1
+
+
+def test_volatile_and_table_function_queries_always_run(upload):
+    cache = QueryCache(max_bytes=1024**2)
+    for sql in ["SELECT random() AS r FROM uploaded_data LIMIT 1", "SELECT * FROM range(3)"]:
+        execute_query(upload.con, sql, upload.data_key, cache)
+        assert not execute_query(upload.con, sql, upload.data_key, cache).from_cache
+    assert cache.stats()['entries'] == 0
+
+
+def test_modifying_statement_moves_the_upload_to_a_new_key(upload):
+    cache = QueryCache(max_bytes=1024**2)
+    count = "SELECT COUNT(*) AS n FROM uploaded_data"
+    assert execute_query(upload.con, count, upload.data_key, cache).table.column('n')[0].as_py() == 100
+
+    old_key = upload.data_key
+    result = execute_query(upload.con, "DELETE FROM uploaded_data WHERE region = 'north'", upload.data_key, cache)
+    assert result.modified_data
+    cache.invalidate(upload.data_key)
+    upload.mark_modified()
+
+    assert upload.data_key != old_key
+    assert upload.fingerprint in upload.data_key
+    assert cache.stats()['entries'] == 0
+    after = execute_query(upload.con, count, upload.data_key, cache)
+    assert not after.from_cache
+    assert after.table.column('n')[0].as_py() == 50
+    assert upload.row_count == 50
+
+    # Every later modification gets a key of its own
+    modified_key = upload.data_key
+    upload.mark_modified()
+    assert upload.data_key not in (old_key, modified_key)
+
+
+def test_cache_evicts_to_stay_under_its_size(upload):
+    probe = execute_query(upload.con, "SELECT * FROM uploaded_data WHERE id <= 50", upload.data_key)
+    cache = QueryCache(max_bytes=int(probe.nbytes * 2.5))
+    for limit in (50, 51, 52):
+        execute_query(upload.con, f"SELECT * FROM uploaded_data WHERE id <= {limit}", upload.data_key, cache)
+
+    assert cache.stats()['entries'] == 2
+    assert cache.current_bytes <= cache.max_bytes
+    assert not execute_query(upload.con, "SELECT * FROM uploaded_data WHERE id <= 50", upload.data_key,
+                             cache).from_cache
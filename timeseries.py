@@ -0,0 +1,201 @@
+"""Time series preparation shared by the Visualizations, Trend Analysis and Forecasting pages.
+
+Those pages used to call pd.to_datetime on the date column and write it back
+into the session DataFrame on every rerun, then sort the whole frame and
+group by the raw timestamp (so second-resolution timestamps gave a barely
+aggregated series). Here the date column is parsed once per dataset and
+cached with its sort order, and each page asks for a compact series resampled
+to a chosen frequency and aggregation, with gaps (periods without any rows)
+filled by an explicit rule. The source DataFrame is never modified.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from profiler import dataset_fingerprint
+
+# Number of parsed date columns and prepared series kept
+TIMESERIES_CACHE_ENTRIES = int(os.getenv('TIMESERIES_CACHE_ENTRIES', '32'))
+
+# Label -> pandas offset alias
+FREQUENCIES = {'Daily': 'D', 'Weekly': 'W', 'Monthly': 'MS'}
+
+# Frequency label for charts that plot every row in date order (no aggregation)
+RAW_FREQUENCY = 'Raw (every row)'
+
+AGGREGATIONS = ['mean', 'sum', 'median', 'min', 'max', 'count']
+
+# Label -> fill rule for periods without any rows
+GAP_FILLS = {
+    'Linear interpolation': 'interpolate',
+    'Forward fill': 'ffill',
+    'Zero': 'zero',
+    'Leave gaps': 'none'
+}
+
+# Seasonal cycle length in periods for each frequency (None where the cycle is shorter than a period)
+SEASON_LENGTHS = {
+    'D': {'Weekly': 7, 'Yearly': 365},
+    'W': {'Weekly': None, 'Yearly': 52},
+    'MS': {'Weekly': None, 'Yearly': 12}
+}
+
+
+def date_columns(df):
+    """Columns that hold dates: datetime dtypes and columns named like a date or timestamp"""
+    return [col for col in df.columns
+            if pd.api.types.is_datetime64_any_dtype(df[col])
+            or 'date' in str(col).lower() or 'timestamp' in str(col).lower()]
+
+
+def season_length_for(freq, seasonality):
+    """Periods per seasonal cycle at freq, or None for no (or an unrepresentable) seasonality"""
+    return SEASON_LENGTHS.get(freq, {}).get(seasonality)
+
+
+class PreparedSeries:
+    """A date column and a value column resampled to one row per period"""
+
+    def __init__(self, data, date_col, value_col, freq, agg, fill, raw_rows, gaps, elapsed):
+        self.data = data
+        self.date_col = date_col
+        self.value_col = value_col
+        self.freq = freq
+        self.agg = agg
+        self.fill = fill
+        self.raw_rows = raw_rows
+        self.gaps = gaps
+        self.elapsed = elapsed
+
+    @property
+    def values(self):
+        return self.data[self.value_col]
+
+    @property
+    def dates(self):
+        return self.data[self.date_col]
+
+    def future_dates(self, periods):
+        """The next `periods` period starts after the last one"""
+        return pd.date_range(self.dates.iloc[-1], periods=periods + 1, freq=self.freq)[1:]
+
+
+class TimeSeriesCache:
+    """LRU cache of parsed date columns and prepared series, keyed by dataset fingerprint"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def parse_dates(df, date_col, cache=None, fingerprint=None):
+    """(dates, order): date_col as datetime64 (unparseable values NaT) and the positions sorting it
+
+    Cached per (dataset fingerprint, column), so reruns never parse or sort again.
+    """
+    key = None
+    if cache is not None:
+        key = ('dates', fingerprint or dataset_fingerprint(df), date_col)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    column = df[date_col]
+    if pd.api.types.is_datetime64_any_dtype(column):
+        dates = column.reset_index(drop=True)
+    elif isinstance(column.dtype, pd.CategoricalDtype):
+        # Compacted text: parse each distinct value once and map the codes
+        parsed = pd.DatetimeIndex(pd.to_datetime(column.cat.categories.astype(object), errors='coerce', format='mixed'))
+        dates = pd.Series(parsed.take(column.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT), name=date_col)
+    else:
+        dates = pd.to_datetime(column, errors='coerce', format='mixed').reset_index(drop=True)
+    entry = (dates, np.argsort(dates.to_numpy(), kind='stable'))
+    if key is not None:
+        cache.put(key, entry)
+    return entry
+
+
+def sorted_by_date(df, date_col, columns, cache=None, fingerprint=None):
+    """date_col (parsed) plus columns, in date order, as a new small DataFrame"""
+    dates, order = parse_dates(df, date_col, cache, fingerprint)
+    frame = pd.DataFrame({date_col: dates.to_numpy()[order]})
+    for col in columns:
+        if col != date_col:
+            frame[col] = df[col].to_numpy()[order]
+    return frame.dropna(subset=[date_col])
+
+
+def _fill_gaps(values, fill):
+    if fill == 'zero':
+        return values.fillna(0)
+    if fill == 'ffill':
+        return values.ffill()
+    if fill == 'interpolate':
+        return values.interpolate(method='time', limit_direction='both')
+    return values
+
+
+def prepare_series(df, date_col, value_col, freq='D', agg='mean', fill='interpolate', cache=None,
+                   fingerprint=None):
+    """value_col aggregated per period of freq, with empty periods filled by the fill rule
+
+    Returns a PreparedSeries whose data has one row per period between the
+    first and last date: (date_col, value_col) columns like a groupby result.
+    freq=None keeps every row in date order instead (no aggregation or filling).
+    """
+    key = None
+    if cache is not None:
+        fingerprint = fingerprint or dataset_fingerprint(df)
+        key = ('series', fingerprint, date_col, value_col, freq, agg, fill)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    start = time.perf_counter()
+    if freq is None:
+        data = sorted_by_date(df, date_col, [value_col], cache, fingerprint)
+        prepared = PreparedSeries(data, date_col, value_col, None, 'none', 'none', len(data), 0,
+                                  time.perf_counter() - start)
+        if key is not None:
+            cache.put(key, prepared)
+        return prepared
+
+    dates, _ = parse_dates(df, date_col, cache, fingerprint)
+    values = pd.Series(df[value_col].to_numpy(), index=pd.DatetimeIndex(dates.to_numpy()))
+    values = values[values.index.notna()]
+    resampler = values.resample(freq)
+    aggregated = resampler.agg(agg).astype('float64')
+    observed = resampler.size() > 0
+    aggregated = aggregated.where(observed)
+    gaps = int((~observed).sum())
+
+    data = _fill_gaps(aggregated, fill).rename_axis(date_col).rename(value_col).reset_index()
+    prepared = PreparedSeries(data, date_col, value_col, freq, agg, fill, len(values), gaps,
+                              time.perf_counter() - start)
+    if key is not None:
+        cache.put(key, prepared)
+    return prepared